@@ -0,0 +1,130 @@
+import os
+import time
+
+from PySide2.QtCore import (Qt, QRectF)
+from PySide2.QtGui import (QColor, QImage, QPainter, QTextOption)
+
+from BatchRender import PoolJob
+from PaintBrush import PaintBrush
+import SoundAnalysis
+
+# Frequency and spectrum lists of the file being compared, set once in each worker.
+_track = None
+
+
+def initializeWorker(freqlist, spectlist):
+    """
+    Sets up a worker process for offscreen rendering and keeps the shared analysis, so it
+    is sent to each worker once rather than with every algorithm.
+    """
+    global _track
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    import HeadlessRender
+    HeadlessRender.ensureApplication()
+    _track = (freqlist, spectlist)
+
+
+def thumbnailJob(algorithm, width, height, backgroundcolor, detailerror, seed=None):
+    """
+    Draws one algorithm over the shared analysis in a worker process and returns the
+    thumbnail as PNG data.
+    """
+    import HeadlessRender
+    from ImageUtils import pngBytes
+    painter = HeadlessRender.HeadlessPainter()
+    painter.freqlist, painter.SpectList = _track
+    painter.paintbrush.seed = seed
+    painter.draw(algorithm)
+    return pngBytes(painter.rasterize(width, height, QColor(backgroundcolor), detailerror))
+
+
+class AlgorithmGrid(PoolJob):
+    """
+    Renders one wav file with every algorithm for a side by side comparison.  The file is
+    analyzed once in the calling process and the frequency track is handed to a process
+    pool, where each algorithm draws into its own offscreen thumbnail, so choosing a style
+    costs one analysis instead of one per algorithm.  Algorithms that need a larger chunk
+    size than the analysis was made with are left out.  Like BatchRender the grid is
+    polled for progress and can be cancelled.
+    """
+
+    columns = 4
+    labelHeight = 20
+
+    def __init__(self, filename, chunk, width, height, backgroundcolor, detailerror=0, workers=None,
+                 seed=None, algorithms=None):
+        if algorithms is None:
+            algorithms = range(1, len(PaintBrush.algorithmNames) + 1)
+        self.algorithms = [a for a in algorithms if chunk >= PaintBrush.minimumChunkSize(a)]
+        self.skipped = [a for a in algorithms if chunk < PaintBrush.minimumChunkSize(a)]
+        super().__init__(self.algorithms, workers)
+        self.filename = filename
+        self.chunk = chunk
+        self.width = width
+        self.height = height
+        self.backgroundcolor = backgroundcolor
+        self.detailerror = detailerror
+        self.seed = seed
+
+    def start(self):
+        """
+        Analyzes the file and submits every algorithm to the worker processes.
+        """
+        self.startTime = time.perf_counter()
+        freqlist, spectlist, samplingfreq = SoundAnalysis.analyzeWav(self.filename, self.chunk)
+        self.startPool(initializeWorker, (freqlist, spectlist))
+        self.futures = [self.executor.submit(thumbnailJob, a, self.width, self.height, self.backgroundcolor,
+                                             self.detailerror, self.seed)
+                        for a in self.algorithms]
+        # Cancelled while the file was being analyzed.
+        if self.cancelled:
+            self.cancel()
+
+    def results(self):
+        """
+        Returns a list of (algorithm, thumbnail QImage or None, error message or None) for
+        the algorithms that finished.
+        """
+        return [(algorithm, None if data is None else QImage.fromData(data, "PNG"), error)
+                for algorithm, data, error in super().results()]
+
+    def cells(self, results):
+        """
+        Returns the results with the skipped algorithms, which have no image and the chunk
+        size they need as the error, in algorithm order.
+        """
+        cells = [(a, None, "needs a chunk size of " + str(PaintBrush.minimumChunkSize(a))) for a in self.skipped]
+        return sorted(cells + list(results), key=lambda cell: cell[0])
+
+    def image(self, results):
+        """
+        Arranges the thumbnails of results in a grid of columns with the name of each
+        algorithm below its thumbnail.  Skipped and failed algorithms get an empty cell with
+        the reason.
+        """
+        cells = self.cells(results)
+        rows = max(1, (len(cells) + self.columns - 1) // self.columns)
+        cellHeight = self.height + self.labelHeight
+
+        grid = QImage(self.columns * self.width, rows * cellHeight, QImage.Format_ARGB32_Premultiplied)
+        grid.fill(QColor(Qt.gray))
+        # The text is placed with a QTextOption, the alignment flags overload of drawText
+        # overflows with some PySide2 builds.
+        center = QTextOption(Qt.AlignCenter)
+        center.setWrapMode(QTextOption.WordWrap)
+        qp = QPainter()
+        qp.begin(grid)
+        for i, (algorithm, image, error) in enumerate(cells):
+            x = i % self.columns * self.width
+            y = i // self.columns * cellHeight
+            if image is not None:
+                qp.drawImage(x, y, image)
+            else:
+                qp.fillRect(x, y, self.width, self.height, QColor(self.backgroundcolor))
+                qp.setPen(QColor(Qt.darkGray))
+                qp.drawText(QRectF(x, y, self.width, self.height), error, center)
+            qp.setPen(QColor(Qt.black))
+            qp.drawText(QRectF(x, y + self.height, self.width, self.labelHeight),
+                        str(algorithm) + ". " + PaintBrush.algorithmNames[algorithm - 1], center)
+        qp.end()
+        return grid
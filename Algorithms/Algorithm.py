@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class Algorithm:
+    """
+    Base class of the painting algorithms.  An algorithm adds the primitives for one
+    chunk of frequency data at a time to the render list of its PaintBrush with draw and,
+    if it has a closed form, returns those of a whole track at once with drawTrack.  The
+    state kept between chunks is an instance of the nested State class, which lists its
+    fields in __slots__, and reset starts it over.
+    """
+
+    # Smallest chunk size the algorithm can be drawn with.
+    minimumChunkSize = 1024
+    # True if drawTrack is implemented.
+    hasTrack = False
+
+    class State:
+        __slots__ = ()
+
+    def __init__(self, brush):
+        self.brush = brush
+        self.reset()
+
+    def reset(self):
+        self.state = self.State()
+
+    def draw(self, data, pos, spect):
+        raise NotImplementedError
+
+    def drawTrack(self, freqlist, spectlist):
+        """
+        Returns the primitives for the whole frequency and spectrum lists as a batch for
+        the render list, the same as calling draw for every chunk in turn, and leaves the
+        state as draw would.  Returns None if there is no track version.
+        """
+        return None
+
+    # Filled squares at the points of a track in the colors of the rows of rgb.
+    def trackSquares(self, x, y, rgb):
+        brush = self.brush
+        return brush.makeRectangles(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True,
+                                    brush.trackColorsF(rgb[:, 0], rgb[:, 1], rgb[:, 2]))
+
+
+class LineTrail(Algorithm):
+    """
+    Algorithm drawing a line from the last point to a new point every chunk, with a
+    running counter for the angle and the number of chunks drawn for templates.
+    """
+
+    class State:
+        __slots__ = ('x', 'y', 'counter', 'step')
+
+        def __init__(self):
+            self.x = 0
+            self.y = 0
+            self.counter = 0
+            self.step = 0
+
+    def addLine(self, x, y, col):
+        brush = self.brush
+        brush.rl.add(brush.makeLine(self.state.x, self.state.y, x, y, col))
+        self.state.x = x
+        self.state.y = y
+
+    def trackCounter(self, count):
+        counter = self.brush.trackCounter(self.state.counter, 0.1, count)
+        self.state.counter = counter[-1]
+        return counter
+
+    # Connects the points of a track to each other and to the last point drawn.
+    def trackLines(self, x, y, cols):
+        x1 = np.concatenate(([self.state.x], x[:-1]))
+        y1 = np.concatenate(([self.state.y], y[:-1]))
+        self.state.x = x[-1]
+        self.state.y = y[-1]
+        return self.brush.makeLines(x1, y1, x, y, cols)
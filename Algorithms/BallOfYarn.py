@@ -0,0 +1,32 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import LineTrail
+
+
+class BallOfYarn(LineTrail):
+    """
+    Lines between points whose angle and distance are both set by the frequency.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        theta = data[0] % np.pi * 2
+        amp = data[0] % 1
+
+        x = np.cos(theta) * amp
+        y = np.sin(theta) * amp
+
+        col = QColor()
+        col.setRgb((pos % 155) + 100, 100, (data[0] % 155) + 100, 255)
+        self.addLine(x, y, col)
+
+    def drawTrack(self, freqlist, spectlist):
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        pos = np.arange(len(freqlist))
+        theta = first % np.pi * 2
+        amp = first % 1
+
+        cols = self.brush.trackColors((pos % 155) + 100, 100, (first % 155) + 100)
+        return self.trackLines(np.cos(theta) * amp, np.sin(theta) * amp, cols)
@@ -0,0 +1,48 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+
+
+class CirculatingSquares(Algorithm):
+    """
+    Squares along a spiral, colored by the level of the average frequency.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        col = QColor()
+        avg = (data[0] + data[1]) / 2
+
+        x = pos / 1000 * np.cos(5 * pos / 1000 * 2 * np.pi)
+        y = pos / 1000 * np.sin(5 * pos / 1000 * 2 * np.pi)
+
+        if avg > 326:
+            col.setRgbF(1, 0, 0, 1)
+            # brush.rl.add(brush.makePoint(x,y,col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+        elif 250 < avg <= 325:
+            col.setRgbF(avg / 1000, 1, avg / 2000, 1)
+            # brush.rl.add(brush.makePoint(x,y,col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+        else:
+            col.setRgbF(0, 0, 0, 1)
+            # brush.rl.add(brush.makePoint(x, y, col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+
+    def drawTrack(self, freqlist, spectlist):
+        avg = np.array([(d[0] + d[1]) / 2 for d in freqlist], dtype=float)
+        pos = np.arange(len(freqlist))
+
+        x = pos / 1000 * np.cos(5 * pos / 1000 * 2 * np.pi)
+        y = pos / 1000 * np.sin(5 * pos / 1000 * 2 * np.pi)
+
+        rgb = np.zeros((len(avg), 3))
+        rgb[avg > 326] = (1, 0, 0)
+        middle = (250 < avg) & (avg <= 325)
+        rgb[middle, 0] = avg[middle] / 1000
+        rgb[middle, 1] = 1
+        rgb[middle, 2] = avg[middle] / 2000
+        return self.trackSquares(x, y, rgb)
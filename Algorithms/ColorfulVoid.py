@@ -0,0 +1,90 @@
+from PySide2.QtGui import (QColor)
+
+from Algorithms.Algorithm import Algorithm
+from ColorMap import TRIANGLEHUES
+from Geometry import TriangleArray
+from Shape import Shape
+
+
+class ColorfulVoid(Algorithm):
+    """
+    A square whose corners are pulled towards the next corner every chunk, by less the
+    louder the chunk is, leaving a spiral of triangles.  Once it has shrunk to the
+    center the triangles are drawn again in turn, as instances of shapes made once per
+    triangle.
+    """
+
+    minimumChunkSize = 16384
+
+    # The lines are gray, the hue of a color with no saturation does not matter.
+    lineColor = QColor(200, 200, 200)
+
+    class State:
+        # corners holds x1, y1, ..., x4, y4 and replay the group of triangles drawn last
+        # once the square has shrunk.  shapes maps a triangle index to its replay shape.
+        __slots__ = ('corners', 'replay', 'triangles', 'shapes')
+
+        def __init__(self):
+            self.corners = [1, 1, 1, -1, -1, -1, -1, 1]
+            self.replay = 0
+            self.triangles = TriangleArray()
+            self.shapes = {}
+
+    # The triangle with index i and its edges from the first corner.
+    def shape(self, i):
+        shape = self.state.shapes.get(i)
+        if shape is None:
+            T = self.state.triangles[i].tolist()
+            shape = self.state.shapes[i] = Shape([T], [[T[0], T[1]], [T[0], T[2]]])
+        return shape
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        state = self.state
+        c = state.corners
+
+        TriCol = TRIANGLEHUES.color(data[0] * 10)
+        LineCol = self.lineColor
+
+        Distance = pow(pow(c[0], 2) + pow(c[1], 2), .5)
+
+        if (Distance > 0.05):
+
+            if (spect >= 200000):
+                WeightedFreqVal = 15.0
+            elif (spect <= 10000):
+                WeightedFreqVal = 30
+            else:
+                WeightedFreqVal = ((((spect - 10000) / 190000) * 15) + 15)
+
+            Newx1 = (((WeightedFreqVal * c[0]) + c[6]) / (WeightedFreqVal + 1))
+            Newy1 = (((WeightedFreqVal * c[1]) + c[7]) / (WeightedFreqVal + 1))
+            Newx2 = (((WeightedFreqVal * c[2]) + c[0]) / (WeightedFreqVal + 1))
+            Newy2 = (((WeightedFreqVal * c[3]) + c[1]) / (WeightedFreqVal + 1))
+            Newx3 = (((WeightedFreqVal * c[4]) + c[2]) / (WeightedFreqVal + 1))
+            Newy3 = (((WeightedFreqVal * c[5]) + c[3]) / (WeightedFreqVal + 1))
+            Newx4 = (((WeightedFreqVal * c[6]) + c[4]) / (WeightedFreqVal + 1))
+            Newy4 = (((WeightedFreqVal * c[7]) + c[5]) / (WeightedFreqVal + 1))
+
+            brush.rl.add(brush.makeTriangle(c[0], c[1], Newx1, Newy1, Newx2, Newy2, True, TriCol))
+            brush.rl.add(brush.makeTriangle(c[2], c[3], Newx2, Newy2, Newx3, Newy3, True, TriCol))
+            brush.rl.add(brush.makeTriangle(c[4], c[5], Newx3, Newy3, Newx4, Newy4, True, TriCol))
+            brush.rl.add(brush.makeTriangle(c[6], c[7], Newx4, Newy4, Newx1, Newy1, True, TriCol))
+
+            brush.rl.add(brush.makeLine(c[0], c[1], c[2], c[3], LineCol))
+            brush.rl.add(brush.makeLine(c[2], c[3], c[4], c[5], LineCol))
+            brush.rl.add(brush.makeLine(c[4], c[5], c[6], c[7], LineCol))
+            brush.rl.add(brush.makeLine(c[6], c[7], c[0], c[1], LineCol))
+
+            state.triangles.append([[c[0], c[1]], [Newx1, Newy1], [Newx2, Newy2]])
+            state.triangles.append([[c[2], c[3]], [Newx2, Newy2], [Newx3, Newy3]])
+            state.triangles.append([[c[4], c[5]], [Newx3, Newy3], [Newx4, Newy4]])
+            state.triangles.append([[c[6], c[7]], [Newx4, Newy4], [Newx1, Newy1]])
+
+            state.corners = [Newx1, Newy1, Newx2, Newy2, Newx3, Newy3, Newx4, Newy4]
+        else:
+            state.replay += 1
+            if (state.replay * 4 >= len(state.triangles)):
+                state.replay = 1
+            for i in range(((state.replay - 1) * 4), (state.replay * 4)):
+                brush.rl.add(brush.makeInstance(self.shape(i), TriCol, LineCol))
@@ -0,0 +1,34 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import LineTrail
+
+
+class Dynamite(LineTrail):
+    """
+    Lines between points on a circle at the running angle, at a distance set by the
+    frequency.  The color follows the chunk position.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        self.state.counter += 0.1
+        theta = self.state.counter % np.pi * 2
+        amp = data[0] % 1
+
+        x = np.cos(theta) * amp
+        y = np.sin(theta) * amp
+
+        col = QColor()
+        col.setRgb(200, (pos % 200) + 55, (data[0] % 100) + 55, 255)
+        self.addLine(x, y, col)
+
+    def drawTrack(self, freqlist, spectlist):
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        pos = np.arange(len(freqlist))
+        theta = self.trackCounter(len(first)) % np.pi * 2
+        amp = first % 1
+
+        cols = self.brush.trackColors(200, (pos % 200) + 55, (first % 100) + 55)
+        return self.trackLines(np.cos(theta) * amp, np.sin(theta) * amp, cols)
@@ -0,0 +1,38 @@
+from itertools import repeat
+
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+
+
+class FrequencyDots(Algorithm):
+    """
+    A red dot for every chunk at the average frequency, left to right over the file.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        numfreq = len(brush.fl)
+        maxfreq = 2000
+        x = 2 * pos / numfreq - 1
+        y = data[0] / maxfreq * 2
+
+        col = QColor()
+        col.setRgbF(1, 0, 0, 1)
+        y = (sum(data) / len(data)) / maxfreq
+
+        brush.rl.add(brush.makeCircle(x, y - 0.5, 0.01, True, col))
+
+    def drawTrack(self, freqlist, spectlist):
+        brush = self.brush
+        numfreq = len(brush.fl)
+        maxfreq = 2000
+        x = 2 * np.arange(len(freqlist)) / numfreq - 1
+        y = np.array([sum(d) / len(d) for d in freqlist]) / maxfreq
+
+        col = QColor()
+        col.setRgbF(1, 0, 0, 1)
+        return brush.makeCircles(x, y - 0.5, 0.01, True, repeat(col))
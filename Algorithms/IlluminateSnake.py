@@ -0,0 +1,142 @@
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+from ColorMap import RBGWHEEL
+
+
+class IlluminateSnake(Algorithm):
+    """
+    Two trails of glows, discs that fade out from the center, one per channel, going
+    round at different speeds and colored by the frequency relative to the highest one
+    so far.  The glow size follows the spectrum.
+    """
+
+    hasTrack = True
+
+    class State:
+        __slots__ = ('angle', 'radius', 'rotation', 'first', 'maxfreq', 'maxfreq2', 'radius2')
+
+        def __init__(self):
+            self.angle = 3.14159265359
+            self.radius = .025
+            self.rotation = .1
+            self.first = True
+            self.maxfreq = 0
+            self.maxfreq2 = 0
+            self.radius2 = .025
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        state = self.state
+        if (state.first):
+            state.maxfreq = data[0]
+        else:
+            if (data[0] > state.maxfreq):
+                state.maxfreq = data[0]
+
+        if len(data) > 1:
+            if (state.first):
+                state.maxfreq2 = data[1]
+            else:
+                if (data[0] > state.maxfreq2):
+                    state.maxfreq2 = data[0]
+            if state.maxfreq2 > 0:
+                Freq2 = int((data[1] / state.maxfreq2) * 1530)
+            else:
+                Freq2 = 0
+
+        if state.maxfreq > 0:
+            Freq = int((data[0] / state.maxfreq) * 1530)
+        else:
+            Freq = 0
+
+        if (spect >= 200000):
+            Radius = .2
+        elif (spect <= 10000):
+            Radius = .1
+        else:
+            Radius = ((((spect - 10000) / 190000) * .1) + .1)
+
+        P1x = state.radius * np.cos((state.angle * .5) + state.rotation)
+        P1y = state.radius * np.sin((state.angle * .5) + state.rotation)
+        P2x = state.radius2 * np.cos((state.angle * 1.5) + state.rotation)
+        P2y = state.radius2 * np.sin((state.angle * 1.5) + state.rotation)
+
+        brush.rl.add(brush.makeGlow(P1x, P1y, Radius, 10, RBGWHEEL.color(Freq)))
+        if len(data) > 1:
+            brush.rl.add(brush.makeGlow(P2x, P2y, Radius, 10, RBGWHEEL.color(Freq2)))
+
+        if (state.radius > 1):
+            state.radius = 1
+        elif (state.radius < 1):
+            state.radius += .05
+
+        if (state.radius2 > .5):
+            state.radius2 = .5
+        elif (state.radius2 < .5):
+            state.radius2 += .025
+
+        state.rotation += .1
+
+        if (state.first):
+            state.first = False
+
+    # Values of a radius that goes up by step every chunk until it is limit, as draw
+    # changes it, for count chunks from value, and the value after them.
+    def ramp(self, value, step, limit, count):
+        values = []
+        while len(values) < count and value != limit:
+            values.append(value)
+            if value > limit:
+                value = limit
+            else:
+                value += step
+        values.extend([value] * (count - len(values)))
+        return np.array(values, dtype=float), value
+
+    def drawTrack(self, freqlist, spectlist):
+        brush = self.brush
+        state = self.state
+        count = len(freqlist)
+        if count == 0:
+            return []
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        second = np.array([d[1] for d in freqlist if len(d) > 1], dtype=float)
+        stereo = np.array([len(d) > 1 for d in freqlist])
+        spect = np.asarray(spectlist, dtype=float)
+
+        # Highest frequencies so far.  The second channel is colored relative to the
+        # highest of its first value and the first channel after it, as in draw.
+        highest = first.copy()
+        highest[0] = first[0] if state.first else max(state.maxfreq, first[0])
+        highest = np.maximum.accumulate(highest)
+        highest2 = first[stereo]
+        if len(highest2) > 0:
+            highest2[0] = second[0] if state.first and stereo[0] else max(state.maxfreq2, highest2[0])
+            highest2 = np.maximum.accumulate(highest2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            freq = np.where(highest > 0, (first / highest) * 1530, 0)
+            freq2 = np.where(highest2 > 0, (second / highest2) * 1530, 0)
+
+        Radius = np.where(spect >= 200000, .2, np.where(spect <= 10000, .1, (((spect - 10000) / 190000) * .1) + .1))
+        radius, state.radius = self.ramp(state.radius, .05, 1, count)
+        radius2, state.radius2 = self.ramp(state.radius2, .025, .5, count)
+        rotation = np.add.accumulate(np.concatenate(([state.rotation], np.full(count, .1))))
+        state.rotation = float(rotation[-1])
+        rotation = rotation[:-1]
+
+        glows = brush.makeGlows(radius * np.cos((state.angle * .5) + rotation),
+                                radius * np.sin((state.angle * .5) + rotation), Radius, 10,
+                                brush.mapColors(RBGWHEEL, freq))
+        glows.extend(brush.makeGlows((radius2 * np.cos((state.angle * 1.5) + rotation))[stereo],
+                                     (radius2 * np.sin((state.angle * 1.5) + rotation))[stereo], Radius[stereo], 10,
+                                     brush.mapColors(RBGWHEEL, freq2)))
+
+        state.first = False
+        state.maxfreq = float(highest[-1])
+        if len(highest2) > 0:
+            state.maxfreq2 = float(highest2[-1])
+
+        # The glow of the second channel follows that of the first in each chunk.
+        order = np.argsort(np.concatenate((2 * np.arange(count), 2 * np.nonzero(stereo)[0] + 1)), kind='stable')
+        return list(map(glows.__getitem__, order.tolist()))
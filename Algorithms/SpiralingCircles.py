@@ -0,0 +1,40 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+from GeometryTemplates import SPIRALINGCIRCLES
+
+
+class SpiralingCircles(Algorithm):
+    """
+    Circles going round on rings that get smaller as the ring counter goes up to 7 pi,
+    then start over on the outer ring.  The centers come from a template table indexed
+    by the number of chunks drawn.
+    """
+
+    hasTrack = True
+
+    class State:
+        __slots__ = ('step',)
+
+        def __init__(self):
+            self.step = 0
+
+    def draw(self, data, pos, spect):
+        x, y, drawn = SPIRALINGCIRCLES.row(self.state.step)
+        self.state.step += 1
+
+        if drawn:
+            col = QColor()
+            col.setRgb((spect % 155) + 100, 75, (data[0] % 75) + 180, 255)
+            self.brush.rl.add(self.brush.makeCircle(x, y, 0.05, True, col))
+
+    def drawTrack(self, freqlist, spectlist):
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        spect = np.asarray(spectlist, dtype=float)
+        centers = SPIRALINGCIRCLES.rows(self.state.step, len(first))
+        self.state.step += len(first)
+
+        draw = centers[:, 2] != 0
+        cols = self.brush.trackColors((spect[draw] % 155) + 100, 75, (first[draw] % 75) + 180)
+        return self.brush.makeCircles(centers[draw, 0], centers[draw, 1], 0.05, True, cols)
@@ -0,0 +1,29 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import LineTrail
+from GeometryTemplates import EPICYCLOID
+
+
+class Spirograph(LineTrail):
+    """
+    Lines along an epicycloid colored by the frequency and spectrum.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        x, y = EPICYCLOID.row(self.state.step)
+        self.state.step += 1
+
+        col = QColor()
+        col.setRgb(50, (spect % 155) + 100, (data[0] % 155) + 100, 255)
+        self.addLine(x, y, col)
+
+    def drawTrack(self, freqlist, spectlist):
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        spect = np.asarray(spectlist, dtype=float)
+        xy = EPICYCLOID.rows(self.state.step, len(first))
+        self.state.step += len(first)
+        cols = self.brush.trackColors(50, (spect % 155) + 100, (first % 155) + 100)
+        return self.trackLines(xy[:, 0], xy[:, 1], cols)
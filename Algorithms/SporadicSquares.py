@@ -0,0 +1,55 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+
+
+class SporadicSquares(Algorithm):
+    """
+    Squares at random places, colored by the level of the average frequency.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        col = QColor()
+        avg = (data[0] + data[1]) / 2
+
+        # x = np.cos(pos/len(brush.fl)*2*np.pi)
+        # y = np.sin(pos / len(brush.fl) * 2 * np.pi)
+
+        # x = pos/len(brush.fl) * np.cos(pos/len(brush.fl)*2*np.pi)
+        # y = pos/len(brush.fl) * np.sin(pos / len(brush.fl) * 2 * np.pi)
+
+        x = brush.random.random() * 2 - 1
+        y = brush.random.random() * 2 - 1
+
+        if avg > 300:
+            col.setRgbF(1, 0, 0, 1)
+            # brush.rl.add(brush.makePoint(x,y,col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+        elif 201 < avg <= 299:
+            col.setRgbF(0.5, 0, 0, 1)
+            # brush.rl.add(brush.makePoint(x,y,col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+        elif 150 < avg <= 200:
+            col.setRgbF(0, 1, 0, 1)
+            # brush.rl.add(brush.makePoint(x,y,col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+        else:
+            col.setRgbF(0, 0, 0, 1)
+            # brush.rl.add(brush.makePoint(x, y, col))
+            brush.rl.add(brush.makeRectangle(x - 0.05, y + 0.05, x + 0.05, y - 0.05, True, col))
+
+    def drawTrack(self, freqlist, spectlist):
+        avg = np.array([(d[0] + d[1]) / 2 for d in freqlist], dtype=float)
+
+        # Two draws per chunk in the same order as draw.
+        xy = self.brush.random.randoms(2 * len(avg)).reshape(-1, 2) * 2 - 1
+
+        rgb = np.zeros((len(avg), 3))
+        rgb[avg > 300] = (1, 0, 0)
+        rgb[(201 < avg) & (avg <= 299)] = (0.5, 0, 0)
+        rgb[(150 < avg) & (avg <= 200)] = (0, 1, 0)
+        return self.trackSquares(xy[:, 0], xy[:, 1], rgb)
@@ -0,0 +1,29 @@
+from PySide2.QtGui import (QColor)
+import numpy as np
+
+from Algorithms.Algorithm import LineTrail
+from GeometryTemplates import LISSAJOUS
+
+
+class Symmetry3D(LineTrail):
+    """
+    Lines along a Lissajous curve colored by the frequency and spectrum.
+    """
+
+    hasTrack = True
+
+    def draw(self, data, pos, spect):
+        x, y = LISSAJOUS.row(self.state.step)
+        self.state.step += 1
+
+        col = QColor()
+        col.setRgb(175, (spect % 200) + 55, (data[0] % 100) + 155, 255)
+        self.addLine(x, y, col)
+
+    def drawTrack(self, freqlist, spectlist):
+        first = np.array([d[0] for d in freqlist], dtype=float)
+        spect = np.asarray(spectlist, dtype=float)
+        xy = LISSAJOUS.rows(self.state.step, len(first))
+        self.state.step += len(first)
+        cols = self.brush.trackColors(175, (spect % 200) + 55, (first % 100) + 155)
+        return self.trackLines(xy[:, 0], xy[:, 1], cols)
@@ -0,0 +1,180 @@
+import numpy as np
+
+from Algorithms.Algorithm import Algorithm
+from ColorMap import TRIANGLEHUES
+from Geometry import EdgeArray, TriangleArray, triangleCrossesEdges
+from Shape import Shape
+
+
+class TriangleStacker(Algorithm):
+    """
+    Grows a mesh of triangles out from a small one in the center.  Every chunk a new
+    triangle, as high as the spectrum says, is stood on a random free edge if it stays
+    inside the image and crosses no other triangle.  When no edge is left the triangles
+    are drawn again in turn, as instances of shapes made once per triangle.
+
+    The triangles and edges of the mesh are kept in contiguous arrays.  The edges are
+    indexed by a uniform grid spatial hash, so a new triangle is only checked against the
+    edges near it, in one vectorized call, and by a map that gives the triangle an edge
+    belongs to directly.  At most maxAttempts edges are tried per
+    chunk, so each chunk costs about the same however large the mesh is.
+    """
+
+    minimumChunkSize = 16384
+
+    # Side of the grid cells of the spatial hash in real coordinates, a bit more than the
+    # usual edge length.
+    cellSize = 0.1
+    # Free edges tried per chunk before waiting for the next chunk.
+    maxAttempts = 16
+
+    class State:
+        # lines are the free edges.  edgeIndex maps each edge of the mesh, as the sorted
+        # pair of its end points, to its index in edges, parents holds the index of the
+        # last triangle with each edge and grid maps a cell to the indices of the edges
+        # whose bounding box touches it.  shapes maps a triangle index to its replay shape.
+        __slots__ = ('start', 'replay', 'triangles', 'lines', 'edges', 'edgeIndex', 'parents', 'grid', 'shapes')
+
+        def __init__(self):
+            self.start = True
+            self.replay = 0
+            self.triangles = TriangleArray()
+            self.lines = []
+            self.edges = EdgeArray()
+            self.edgeIndex = {}
+            self.parents = []
+            self.grid = {}
+            self.shapes = {}
+
+    def edgeKey(self, A, B):
+        A = tuple(A)
+        B = tuple(B)
+        return (A, B) if A <= B else (B, A)
+
+    # The grid cells touched by the bounding box of points.
+    def cells(self, *points):
+        size = self.cellSize
+        x1 = int(min(p[0] for p in points) // size)
+        x2 = int(max(p[0] for p in points) // size)
+        y1 = int(min(p[1] for p in points) // size)
+        y2 = int(max(p[1] for p in points) // size)
+        return [(x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+    def shape(self, i):
+        shape = self.state.shapes.get(i)
+        if shape is None:
+            shape = self.state.shapes[i] = Shape([self.state.triangles[i].tolist()])
+        return shape
+
+    def addTriangle(self, Triangle):
+        state = self.state
+        index = state.triangles.append(Triangle)
+        for A, B in ((Triangle[0], Triangle[1]), (Triangle[1], Triangle[2]), (Triangle[2], Triangle[0])):
+            key = self.edgeKey(A, B)
+            edge = state.edgeIndex.get(key)
+            if edge is None:
+                edge = state.edgeIndex[key] = state.edges.append(key)
+                state.parents.append(index)
+                for cell in self.cells(A, B):
+                    state.grid.setdefault(cell, []).append(edge)
+            else:
+                state.parents[edge] = index
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        state = self.state
+
+        TriCol = TRIANGLEHUES.color(data[0] * 10)
+
+        if (state.start):
+            Point1 = [0, .05]
+            Point2 = [(pow(3, (1 / 2)) / 40), (-1 / 40)]
+            Point3 = [((pow(3, (1 / 2)) / 40) * -1), (-1 / 40)]
+            Line1 = [Point1, Point2]
+            Line2 = [Point2, Point3]
+            Line3 = [Point3, Point1]
+            Triangle = [Point1, Point2, Point3]
+            state.lines.append(Line1)
+            state.lines.append(Line2)
+            state.lines.append(Line3)
+            self.addTriangle(Triangle)
+            brush.rl.add(
+                brush.makeTriangle(Triangle[0][0], Triangle[0][1], Triangle[1][0], Triangle[1][1], Triangle[2][0],
+                                   Triangle[2][1], True, TriCol))
+            state.start = False
+        else:
+            if len(state.lines) > 0:
+                if (spect >= 200000):
+                    Height = .08
+                elif (spect <= 10000):
+                    Height = .02
+                else:
+                    Height = ((((spect - 10000) / 190000) * .06) + .02)
+                Attempts = 0
+                while Attempts < self.maxAttempts and len(state.lines) > 0:
+                    Attempts += 1
+                    # Tried edges are used up whether or not a triangle fits on them, the
+                    # last edge takes the place of the one picked.
+                    LineIndex = brush.random.randrange(len(state.lines))
+                    Line = state.lines[LineIndex]
+                    state.lines[LineIndex] = state.lines[-1]
+                    state.lines.pop()
+
+                    MidPoint = [((Line[0][0] + Line[1][0]) / 2), ((Line[0][1] + Line[1][1]) / 2)]
+                    Parent = state.parents[state.edgeIndex[self.edgeKey(Line[0], Line[1])]]
+                    UsedTri = state.triangles[Parent].tolist()
+                    if (UsedTri[0][0] == UsedTri[1][0]) or (UsedTri[0][1] == UsedTri[1][1]):
+                        Line1 = [UsedTri[1], UsedTri[2]]
+                        Line2 = [UsedTri[2], UsedTri[0]]
+                    elif (UsedTri[1][0] == UsedTri[2][0]) or (UsedTri[1][1] == UsedTri[2][1]):
+                        Line1 = [UsedTri[0], UsedTri[1]]
+                        Line2 = [UsedTri[2], UsedTri[0]]
+                    else:
+                        Line1 = [UsedTri[0], UsedTri[1]]
+                        Line2 = [UsedTri[1], UsedTri[2]]
+                    Line1Normal = -1 / ((Line1[1][1] - Line1[0][1]) / (Line1[1][0] - Line1[0][0]))
+                    Line1MidPoint = [((Line1[0][0] + Line1[1][0]) / 2), ((Line1[0][1] + Line1[1][1]) / 2)]
+                    Line2Normal = -1 / ((Line2[1][1] - Line2[0][1]) / (Line2[1][0] - Line2[0][0]))
+                    Line2MidPoint = [((Line2[0][0] + Line2[1][0]) / 2), ((Line2[0][1] + Line2[1][1]) / 2)]
+                    XPos = (((-1 * Line2Normal * Line2MidPoint[0]) + Line2MidPoint[1] + (
+                            Line1Normal * Line1MidPoint[0]) - Line1MidPoint[1]) / (Line1Normal - Line2Normal))
+                    YPos = Line1Normal * (XPos - Line1MidPoint[0]) + Line1MidPoint[1]
+                    TriPoint = [XPos, YPos]
+                    DeltaX = MidPoint[0] - TriPoint[0]
+                    DeltaY = MidPoint[1] - TriPoint[1]
+                    Distance = pow((pow(DeltaX, 2) + pow(DeltaY, 2)), .5)
+                    Ratio = (Height + Distance) / Distance
+                    Point = [(TriPoint[0] + (DeltaX * Ratio)), (TriPoint[1] + (DeltaY * Ratio))]
+                    Line1 = Line[0], Point
+                    Line2 = Line[1], Point
+                    Triangle = [Line[0], Line[1], Point]
+                    if ((self.ValidPoint(Point)) and (self.ValidTriangle(Triangle))):
+                        state.lines.append(Line1)
+                        state.lines.append(Line2)
+                        self.addTriangle(Triangle)
+                        brush.rl.add(brush.makeTriangle(Triangle[0][0], Triangle[0][1], Triangle[1][0], Triangle[1][1],
+                                                       Triangle[2][0], Triangle[2][1], True, TriCol))
+                        break
+            else:
+                brush.rl.add(brush.makeInstance(self.shape(state.replay), TriCol))
+                state.replay += 1
+                if (state.replay > (len(state.triangles) - 1)):
+                    state.replay = 0
+
+    # A triangle is valid if none of its edges crosses an edge of the mesh that it does
+    # not share an end point with.  Only the edges in the grid cells it touches are checked.
+    def ValidTriangle(self, Triangle):
+        grid = self.state.grid
+        nearby = [grid[cell] for cell in self.cells(*Triangle) if cell in grid]
+        if len(nearby) == 0:
+            return True
+        candidates = np.unique(np.concatenate(nearby))
+        return not triangleCrossesEdges(np.array(Triangle, dtype=float), self.state.edges.array[candidates])
+
+    def ValidPoint(self, Point):
+        Valid = True
+        if (Point[0] > 1) or (Point[0] < -1):
+            Valid = False
+        if (Point[1] > 1) or (Point[1] < -1):
+            Valid = False
+        return Valid
@@ -0,0 +1,72 @@
+from PySide2.QtGui import (QColor)
+
+from Algorithms.Algorithm import Algorithm
+from GeometryTemplates import rotateScale, starOffsets
+
+
+class Vortex(Algorithm):
+    """
+    A turning eleven pointed star that grows and shrinks with the spectrum, colored by
+    the frequency relative to the highest one so far.
+    """
+
+    # Unit offsets of the 11 points of the star in the order they are joined, point k at
+    # pi * (.5 - 2k / 11) before the rotation.
+    star = starOffsets(11, 3.14159265359, 5)
+
+    class State:
+        __slots__ = ('radius', 'rotation', 'first', 'maxfreq', 'growing')
+
+        def __init__(self):
+            self.radius = .1
+            self.rotation = .1
+            self.first = True
+            self.maxfreq = 0
+            self.growing = True
+
+    def draw(self, data, pos, spect):
+        brush = self.brush
+        state = self.state
+        if (state.first):
+            state.maxfreq = data[0]
+        else:
+            if (data[0] > state.maxfreq):
+                state.maxfreq = data[0]
+        LineCol = QColor()
+        if state.maxfreq > 0:
+            RedGreen = ((data[0] / state.maxfreq) * 510) - 255
+            if (RedGreen < 0):
+                LineCol.setRgb(0, abs(RedGreen), 255)
+            else:
+                LineCol.setRgb(RedGreen, 0, 255)
+        else:
+            LineCol.setRgb(0, 0, 255)
+
+        if (state.growing):
+            if (spect >= 200000):
+                SizeMultiplier = 1.3
+            elif (spect <= 10000):
+                SizeMultiplier = 1
+            else:
+                SizeMultiplier = ((((spect - 10000) / 190000) * .3) + 1)
+        else:
+            if (spect >= 200000):
+                SizeMultiplier = .7
+            elif (spect <= 10000):
+                SizeMultiplier = 1
+            else:
+                SizeMultiplier = (1 - (((spect - 10000) / 190000) * .3))
+
+        # The star points, every fifth joined, turned and scaled from the unit star.  The
+        # lines share the color, which is new every chunk.
+        P = rotateScale(self.star, state.rotation, state.radius)
+        brush.rl.extend([[1, P[k][0], P[k][1], P[k + 1][0], P[k + 1][1], LineCol] for k in range(11)])
+
+        state.radius *= SizeMultiplier
+        if (state.growing and state.radius > 1):
+            state.growing = False
+        if (state.growing == False and state.radius < .1):
+            state.growing = True
+        state.rotation += .03
+        if (state.first):
+            state.first = False
@@ -0,0 +1,45 @@
+import importlib
+
+# The painting algorithms in the order shown in the program, algorithm n is at index
+# n - 1, as (name, module).  Each module of this package holds a subclass of Algorithm
+# with the same name as the module.  Modules are only imported when their algorithm is
+# first used, so the program starts without loading them all.
+# To add an algorithm write its module and add it here.
+PLUGINS = [('Frequency Dots', 'FrequencyDots'), ('Dynamite', 'Dynamite'), ('Ball of Yarn', 'BallOfYarn'),
+           ('3-D Symmetry', 'Symmetry3D'), ('Spirograph', 'Spirograph'), ('Colorful Void', 'ColorfulVoid'),
+           ('Vortex', 'Vortex'), ('Illuminate Snake', 'IlluminateSnake'), ('Triangle Stacker', 'TriangleStacker'),
+           ('Spiraling Circles', 'SpiralingCircles'), ('Circulating Squares', 'CirculatingSquares'),
+           ('Sporadic Squares', 'SporadicSquares')]
+
+_classes = {}
+
+
+def algorithmNames():
+    return [name for name, module in PLUGINS]
+
+
+def algorithmClass(number):
+    """
+    Returns the class of algorithm number, importing its module on first use.
+    """
+    cls = _classes.get(number)
+    if cls is None:
+        if not 1 <= number <= len(PLUGINS):
+            raise ValueError("unknown algorithm " + str(number))
+        module = PLUGINS[number - 1][1]
+        cls = _classes[number] = getattr(importlib.import_module(__name__ + '.' + module), module)
+    return cls
+
+
+class AlgorithmTable(dict):
+    """
+    The algorithm instances of a PaintBrush by number, each created on its first lookup.
+    """
+
+    def __init__(self, brush):
+        super().__init__()
+        self.brush = brush
+
+    def __missing__(self, number):
+        algorithm = self[number] = algorithmClass(number)(self.brush)
+        return algorithm
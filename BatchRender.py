@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def initializeWorker():
+    """
+    Sets up a worker process for offscreen rendering.  The offscreen platform is forced
+    since the worker never shows a window, even if the parent process has a display.
+    """
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    import HeadlessRender
+    HeadlessRender.ensureApplication()
+
+
+def targetNames(files, outputdir):
+    """
+    Returns the image file in outputdir of each wav file, named after the wav file.
+    Files with the same name from different folders get a numeric suffix, so no image
+    overwrites another.
+    """
+    targets = []
+    used = set()
+    for filename in files:
+        base = os.path.splitext(os.path.basename(filename))[0]
+        name = base + ".png"
+        n = 2
+        while name.lower() in used:
+            name = base + "-" + str(n) + ".png"
+            n += 1
+        used.add(name.lower())
+        targets.append(os.path.join(outputdir, name))
+    return targets
+
+
+def renderJob(filename, algorithm, chunk, width, height, backgroundcolor, detailerror, target,
+              backend='qpainter', seed=None):
+    """
+    Analyzes, renders and saves one wav file to the image file target in a worker
+    process.  Returns the name of the image file written.
+    """
+    import HeadlessRender
+    image = HeadlessRender.renderFile(filename, algorithm, chunk, width, height, backgroundcolor, detailerror,
+                                      backend, seed)
+    if not image.save(target, "PNG"):
+        raise IOError("could not write " + target)
+    return target
+
+
+class PoolJob:
+    """
+    Runs one task per item in a pool of worker processes, one worker per core by default
+    and no more than there are items.  The spawn start method is used so the workers do
+    not inherit the state of a running Qt application.  The job is polled for progress
+    and can be cancelled, which drops the tasks that have not started yet.  Subclasses
+    submit the tasks in start, in the order of the items.
+    """
+
+    def __init__(self, items, workers=None):
+        self.items = items
+        if workers is None or workers <= 0:
+            workers = os.cpu_count() or 1
+        self.workers = min(workers, max(1, len(self.items)))
+
+        self.executor = None
+        self.futures = []
+        self.cancelled = False
+        self.startTime = 0
+
+    def startPool(self, initializer, initargs=()):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=initializer, initargs=initargs)
+
+    def start(self):
+        raise NotImplementedError
+
+    def progress(self):
+        """
+        Returns the number of tasks finished, including failed and cancelled ones, and the
+        total number of tasks.
+        """
+        return sum(1 for f in self.futures if f.done()), len(self.futures)
+
+    def finished(self):
+        done, total = self.progress()
+        return done == total
+
+    def elapsed(self):
+        return time.perf_counter() - self.startTime
+
+    def cancel(self):
+        """
+        Cancels the tasks that have not started.  Tasks already running are completed.
+        """
+        self.cancelled = True
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def results(self):
+        """
+        Returns a list of (item, result or None, error message or None) for the tasks that
+        finished.
+        """
+        results = []
+        for item, future in zip(self.items, self.futures):
+            if not future.done() or future.cancelled():
+                continue
+            error = future.exception()
+            if error is None:
+                results.append((item, future.result(), None))
+            else:
+                results.append((item, None, str(error)))
+        return results
+
+    def run(self, report=None):
+        """
+        Runs all tasks, blocking until they are done, and returns the results.  The optional
+        report function is called with (done, total) as tasks finish.
+        """
+        self.start()
+        try:
+            lastdone = -1
+            while not self.finished():
+                done, total = self.progress()
+                if report is not None and done != lastdone:
+                    report(done, total)
+                    lastdone = done
+                time.sleep(0.05)
+            if report is not None:
+                report(*self.progress())
+        finally:
+            self.shutdown()
+        return self.results()
+
+
+class BatchRender(PoolJob):
+    """
+    Renders a list of wav files in parallel with a process pool.  Each worker does its own
+    analysis and offscreen rasterization and writes the image to the output directory, so
+    the files are independent and throughput scales with the number of cores.  The
+    images are named after the wav files, made unique with targetNames.  The results are
+    (wav file, image file or None, error message or None).
+    """
+
+    def __init__(self, files, algorithm, chunk, width, height, backgroundcolor, outputdir,
+                 detailerror=0, workers=None, backend='qpainter', seed=None):
+        self.files = list(files)
+        super().__init__(self.files, workers)
+        self.algorithm = algorithm
+        self.chunk = chunk
+        self.width = width
+        self.height = height
+        self.backgroundcolor = backgroundcolor
+        self.outputdir = outputdir
+        self.targets = targetNames(self.files, outputdir)
+        self.detailerror = detailerror
+        self.backend = backend
+        self.seed = seed
+
+    def start(self):
+        """
+        Starts the worker processes and submits all files.
+        """
+        os.makedirs(self.outputdir, exist_ok=True)
+        self.startTime = time.perf_counter()
+        self.startPool(initializeWorker)
+        self.futures = [self.executor.submit(renderJob, f, self.algorithm, self.chunk, self.width, self.height,
+                                             self.backgroundcolor, self.detailerror, target, self.backend,
+                                             self.seed)
+                        for f, target in zip(self.files, self.targets)]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for Music Painter.  Runs the PaintBrush algorithms over a wav file on the Qt
+offscreen platform and times the rendering paths against each other, and times the
+algorithms that keep growing state on generated data.
+
+Examples:
+    python Benchmarks.py song.wav
+    python Benchmarks.py song.wav -a 4 -a Spirograph -c 4096 -W 3840 -H 2160 -r 3
+    python Benchmarks.py song.wav -a 1 -a 10 --sprites
+    python Benchmarks.py song.wav -a "Ball of Yarn" -a Spirograph --detail 0.75
+    python Benchmarks.py --stacker 5000
+    python Benchmarks.py --parametric 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from HeadlessRender import HeadlessPainter, algorithmNumber, ensureApplication
+from ListRenderer import ListRenderer
+from PaintBrush import PaintBrush
+
+from PySide2.QtGui import (QColor, QImage, QPainter)
+
+
+def bestTime(function, repeat):
+    """
+    Returns the shortest of repeat timed calls of function and its last result.
+    """
+    best = None
+    result = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def imagePixels(image):
+    image = image.convertToFormat(QImage.Format_RGBA8888)
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+    return pixels[:, :image.width() * 4].reshape(image.height(), image.width(), 4).astype(np.int16)
+
+
+def rasterizers(painter, algorithms, args):
+    """
+    Times the QPainter and NumPy rasterizers on the render list of each algorithm and
+    prints the times and the share of pixels where the images differ noticeably.
+    """
+    background = QColor(args.background)
+    print("rasterize %dx%d" % (args.width, args.height))
+    print("%-24s %10s %10s %10s %8s" % ("algorithm", "primitives", "qpainter", "numpy", "differ"))
+    for algorithm in algorithms:
+        painter.draw(algorithm)
+        qtime, qimage = bestTime(lambda: painter.rasterize(args.width, args.height, background, 0), args.repeat)
+        ntime, nimage = bestTime(lambda: painter.rasterize(args.width, args.height, background, 0, 'numpy'),
+                                 args.repeat)
+        differ = (np.abs(imagePixels(qimage) - imagePixels(nimage)).max(axis=2) > 16).mean()
+        print("%-24s %10d %9.3fs %9.3fs %7.2f%%" % (PaintBrush.algorithmNames[algorithm - 1],
+                                                   painter.rl.length(), qtime, ntime, 100 * differ))
+
+
+def sprites(painter, algorithms, args):
+    """
+    Times QPainter drawing of the render list of each algorithm with and without the
+    sprite cache and prints the speedup and the share of circles that were stamped.
+    """
+    background = QColor(args.background)
+
+    def render(stamps):
+        renderer = ListRenderer(args.width, args.height, backgroundcolor=background, detailerror=0)
+        if not stamps:
+            renderer.sprites = None
+        image = QImage(args.width, args.height, QImage.Format_ARGB32_Premultiplied)
+        qp = QPainter()
+        qp.begin(image)
+        renderer.renderAll(qp, painter.rl)
+        qp.end()
+        return renderer
+
+    print("sprite cache %dx%d" % (args.width, args.height))
+    print("%-24s %10s %10s %10s %8s %8s" % ("algorithm", "primitives", "direct", "stamped", "speedup", "hits"))
+    for algorithm in algorithms:
+        painter.draw(algorithm)
+        dtime, renderer = bestTime(lambda: render(False), args.repeat)
+        stime, renderer = bestTime(lambda: render(True), args.repeat)
+        print("%-24s %10d %9.3fs %9.3fs %7.2fx %7.1f%%" % (PaintBrush.algorithmNames[algorithm - 1],
+                                                        painter.rl.length(), dtime, stime, dtime / stime,
+                                                        100 * renderer.sprites.hitRate()))
+
+
+def levelOfDetail(painter, algorithms, args):
+    """
+    Times QPainter drawing of the render list of each algorithm with the level-of-detail
+    reducer off and with the error bound of args.detail, and prints the speedup and the
+    share of pixels where the images differ noticeably.
+    """
+    background = QColor(args.background)
+    print("level of detail %dx%d, error %g" % (args.width, args.height, args.detail))
+    print("%-24s %10s %10s %10s %8s %8s" % ("algorithm", "primitives", "off", "on", "speedup", "differ"))
+    for algorithm in algorithms:
+        painter.draw(algorithm)
+        offtime, offimage = bestTime(lambda: painter.rasterize(args.width, args.height, background, 0), args.repeat)
+        ontime, onimage = bestTime(lambda: painter.rasterize(args.width, args.height, background, args.detail),
+                                   args.repeat)
+        differ = (np.abs(imagePixels(offimage) - imagePixels(onimage)).max(axis=2) > 16).mean()
+        print("%-24s %10d %9.3fs %9.3fs %7.2fx %7.2f%%" % (PaintBrush.algorithmNames[algorithm - 1],
+                                                        painter.rl.length(), offtime, ontime, offtime / ontime,
+                                                        100 * differ))
+
+
+def triangleStacker(chunks, step=500):
+    """
+    Draws Triangle Stacker on random frequency and spectrum data and prints the time per
+    chunk as the mesh grows, which should stay about the same.
+    """
+    painter = HeadlessPainter()
+    painter.freqlist = [[0]] * chunks
+    brush = painter.paintbrush
+    brush.currentAlgorithm = algorithmNumber("Triangle Stacker")
+    brush.seed = 1
+    brush.resetAlgorithm(brush.currentAlgorithm)
+    state = brush.algorithms[brush.currentAlgorithm].state
+    generator = random.Random(1)
+
+    print("Triangle Stacker")
+    print("%8s %10s %10s %12s" % ("chunks", "triangles", "free edges", "per chunk"))
+    for done in range(0, chunks, step):
+        count = min(step, chunks - done)
+        start = time.perf_counter()
+        for i in range(done, done + count):
+            brush.draw([generator.random() * 2000], i, generator.random() * 300000)
+        elapsed = time.perf_counter() - start
+        print("%8d %10d %10d %10.3fms" % (done + count, len(state.triangles), len(state.lines),
+                                          1000 * elapsed / count))
+
+
+def parametric(chunks):
+    """
+    Prints the time per chunk of the per chunk draw of the algorithms built on geometry
+    templates, with random frequency and spectrum data.
+    """
+    painter = HeadlessPainter()
+    painter.freqlist = [[0]] * chunks
+    brush = painter.paintbrush
+    generator = random.Random(1)
+    data = [([generator.random() * 2000, generator.random() * 2000], generator.random() * 300000)
+            for i in range(chunks)]
+
+    print("per chunk draw")
+    print("%-24s %12s" % ("algorithm", "per chunk"))
+    for name in ("3-D Symmetry", "Spirograph", "Vortex", "Spiraling Circles"):
+        painter.rl.clear()
+        brush.currentAlgorithm = algorithmNumber(name)
+        brush.resetAlgorithm(brush.currentAlgorithm)
+        start = time.perf_counter()
+        for i in range(chunks):
+            brush.draw(data[i][0], i, data[i][1])
+        elapsed = time.perf_counter() - start
+        print("%-24s %10.2fus" % (name, 1e6 * elapsed / chunks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the Music Painter rendering paths and algorithms.")
+    parser.add_argument("file", nargs="?", help="wav file to draw for the rasterizer benchmark")
+    parser.add_argument("-a", "--algorithm", type=algorithmNumber, action="append",
+                        help="algorithm number or name, can be repeated (default all)")
+    parser.add_argument("-c", "--chunk", type=int, default=16384, help="chunk size in samples (default 16384)")
+    parser.add_argument("-W", "--width", type=int, default=1920, help="image width in pixels (default 1920)")
+    parser.add_argument("-H", "--height", type=int, default=1080, help="image height in pixels (default 1080)")
+    parser.add_argument("-b", "--background", default="white",
+                        help="background color as a name or #RRGGBB (default white)")
+    parser.add_argument("-r", "--repeat", type=int, default=1,
+                        help="number of runs of each measurement, the best is shown (default 1)")
+    parser.add_argument("--sprites", action="store_true",
+                        help="also time QPainter drawing with and without the sprite cache")
+    parser.add_argument("--detail", type=float, metavar="ERROR",
+                        help="also time QPainter drawing with the level-of-detail reducer off and at ERROR pixels")
+    parser.add_argument("--stacker", type=int, metavar="CHUNKS",
+                        help="time Triangle Stacker over CHUNKS chunks of generated data")
+    parser.add_argument("--parametric", type=int, metavar="CHUNKS",
+                        help="time the per chunk draw of the template based algorithms over CHUNKS chunks")
+    args = parser.parse_args(argv)
+    if args.file is None and args.stacker is None and args.parametric is None:
+        parser.error("give a wav file or a benchmark option")
+
+    ensureApplication()
+    if args.stacker is not None:
+        triangleStacker(args.stacker)
+    if args.parametric is not None:
+        parametric(args.parametric)
+    if args.file is None:
+        return 0
+
+    algorithms = args.algorithm or list(range(1, len(PaintBrush.algorithmNames) + 1))
+    algorithms = [a for a in algorithms if args.chunk >= PaintBrush.minimumChunkSize(a)]
+    if len(algorithms) == 0:
+        parser.error("no algorithm can run with a chunk size of " + str(args.chunk))
+
+    painter = HeadlessPainter()
+    painter.analyze(args.file, args.chunk)
+    rasterizers(painter, algorithms, args)
+    if args.sprites:
+        sprites(painter, algorithms, args)
+    if args.detail is not None:
+        levelOfDetail(painter, algorithms, args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
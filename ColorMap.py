@@ -0,0 +1,112 @@
+import numpy as np
+
+from PySide2.QtGui import (QColor)
+
+
+class ColorMap:
+    """
+    Lookup table from an integer feature value to a color, held as packed QColor.rgba()
+    values so whole arrays of values map to colors with one NumPy indexing operation.
+    Values are truncated to integers as QColor does.  A wrapping map takes them modulo
+    its size, like hues, otherwise values outside the table get the outside color.  The
+    QColors returned for single values are shared and must not be changed.
+    """
+
+    def __init__(self, rgb, wrap=False, outside=(0, 0, 0)):
+        rgb = np.vstack((np.asarray(rgb, dtype=np.int64).reshape(-1, 3), outside))
+        self.size = len(rgb) - 1
+        self.wrap = wrap
+        self.table = ((255 << 24) | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]).astype(np.uint32)
+        self.rgbList = rgb.tolist()
+        self.colorList = [QColor.fromRgba(v) for v in self.table.tolist()]
+
+    def __len__(self):
+        return self.size
+
+    def index(self, value):
+        i = int(value)
+        if self.wrap:
+            return i % self.size
+        return i if 0 <= i < self.size else self.size
+
+    def indices(self, values):
+        i = np.trunc(np.asarray(values, dtype=np.float64)).astype(np.int64)
+        if self.wrap:
+            return i % self.size
+        return np.where((i >= 0) & (i < self.size), i, self.size)
+
+    def rgb(self, value):
+        """
+        Returns the [r, g, b] components of the color of a value.
+        """
+        return list(self.rgbList[self.index(value)])
+
+    def color(self, value):
+        return self.colorList[self.index(value)]
+
+    def rgba(self, values):
+        """
+        Returns the packed colors of an array of values.
+        """
+        return self.table[self.indices(values)]
+
+
+def rbgWheel():
+    """
+    The color wheel of PaintBrush.getRBG, 0 to 1530 from red through blue, cyan, green
+    and yellow back to red.
+    """
+    v = np.arange(1531)
+    ramp = v % 255
+    section = np.minimum(v // 255, 5)
+    ramp[v == 1530] = 255
+    up = ramp
+    down = 255 - ramp
+    full = np.full(len(v), 255)
+    zero = np.zeros(len(v), dtype=np.int64)
+    r = np.choose(section, [full, down, zero, zero, up, full])
+    g = np.choose(section, [zero, zero, up, full, full, down])
+    b = np.choose(section, [up, full, full, down, zero, zero])
+    return np.stack((r, g, b), axis=1)
+
+
+def hsvRamp(saturation, value):
+    """
+    The 360 hues at a saturation and value, as QColor.setHsv gives them.
+    """
+    return [QColor.fromHsv(h, saturation, value).getRgb()[:3] for h in range(360)]
+
+
+def polynomial(coefficients, size=256):
+    """
+    A map from polynomial fits of each component over 0 to 1, constant term first.
+    """
+    t = np.linspace(0, 1, size)
+    rgb = np.stack([np.polyval(c[::-1], t) for c in np.transpose(coefficients)], axis=1)
+    return np.round(np.clip(rgb, 0, 1) * 255).astype(np.int64)
+
+
+# Polynomial fits of the matplotlib viridis and magma maps by Matt Zucker.
+VIRIDISFIT = [[0.2777273272234177, 0.005407344544966578, 0.3340998053353061],
+              [0.1050930431085774, 1.404613529898575, 1.384590162594685],
+              [-0.3308618287255563, 0.214847559468213, 0.09509516302823659],
+              [-4.634230498983486, -5.799100973351585, -19.33244095627987],
+              [6.228269936347081, 14.17993336680509, 56.69055260068105],
+              [4.776384997670288, -13.74514537774601, -65.35303263337234],
+              [-5.435455855934631, 4.645852612178535, 26.3124352495832]]
+MAGMAFIT = [[-0.002136485053939582, -0.000749655052795221, -0.005386127855323933],
+            [0.2516605407371642, 0.6775232436837668, 2.494026599312351],
+            [8.353717279216625, -3.577719514958484, 0.3144679030132573],
+            [-27.66873308576866, 14.26473078096533, -13.64921318813922],
+            [52.17613981234068, -27.94360607168351, 12.94416944238394],
+            [-50.76852536473588, 29.04658282127291, 4.23415299384598],
+            [18.65570506591883, -11.48977351997711, -5.601961508734096]]
+
+# The maps, shared by all algorithms.
+RBGWHEEL = ColorMap(rbgWheel())
+TRIANGLEHUES = ColorMap(hsvRamp(255, 130), wrap=True)
+VIRIDIS = ColorMap(polynomial(VIRIDISFIT))
+MAGMA = ColorMap(polynomial(MAGMAFIT))
+GRAYS = ColorMap(np.repeat(np.arange(256), 3).reshape(256, 3))
+
+COLORMAPS = {"rbg": RBGWHEEL, "triangle hues": TRIANGLEHUES, "viridis": VIRIDIS, "magma": MAGMA, "grays": GRAYS}
@@ -0,0 +1,129 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide2.QtGui import (QImage, QPainter)
+
+
+def savePng(image, filename):
+    if not image.save(filename, "PNG"):
+        raise IOError("could not write " + filename)
+    return None
+
+
+def rgbaBytes(image):
+    return bytes(image.convertToFormat(QImage.Format_RGBA8888).constBits())
+
+
+class FrameEncoder:
+    """
+    Encodes frames on a pool of background threads.  Frames are handed over in order and
+    the results of the encoder function, if any, are written to the stream in the same
+    order.  At most a few frames per thread are in flight so memory stays bounded when
+    rendering is faster than encoding.
+    """
+
+    def __init__(self, encode, stream=None, workers=None):
+        self.encode = encode
+        self.stream = stream
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.pending = deque()
+
+    def submit(self, *args):
+        while len(self.pending) >= 2 * self.workers:
+            self.writeOldest()
+        self.pending.append(self.executor.submit(self.encode, *args))
+
+    def writeOldest(self):
+        data = self.pending.popleft().result()
+        if data is not None and self.stream is not None:
+            self.stream.write(data)
+
+    def close(self):
+        try:
+            while len(self.pending) > 0:
+                self.writeOldest()
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+class FrameExport:
+    """
+    Exports the render and play animation as a frame sequence.  It steps through the
+    frequency data of a HeadlessPainter one chunk at a time, as the player does, draws the
+    primitives each chunk adds into a backing image and hands a copy of the image to a
+    FrameEncoder every step chunks.  The frames come at the chunk rate of the audio,
+    sampling frequency / chunk size frames a second, divided by the step.
+    """
+
+    def __init__(self, painter, algorithm, renderer, step=1):
+        self.painter = painter
+        self.algorithm = algorithm
+        self.renderer = renderer
+        self.step = max(1, step)
+
+    def frameCount(self):
+        return (len(self.painter.freqlist) + self.step - 1) // self.step
+
+    def run(self, encoder, report=None):
+        """
+        Renders the frames and passes each one to encoder with a function taking the frame
+        image and its number.  Returns the number of frames written.
+        """
+        painter = self.painter
+        brush = painter.paintbrush
+        renderer = self.renderer
+
+        painter.rl.clear()
+        brush.currentAlgorithm = self.algorithm
+        brush.resetAlgorithm(self.algorithm)
+        brush.resetlistlinks()
+
+        image = QImage(renderer.deviceWidth, renderer.deviceHeight, QImage.Format_ARGB32_Premultiplied)
+        image.fill(renderer.backgroundcolor)
+        pos = 0
+        frames = 0
+        count = len(painter.freqlist)
+        for i in range(count):
+            brush.draw(painter.freqlist[i], i, painter.SpectList[i])
+            if (i + 1) % self.step != 0 and i + 1 < count:
+                continue
+
+            qp = QPainter()
+            qp.begin(image)
+            renderer.renderRange(qp, painter.rl, pos, painter.rl.length())
+            qp.end()
+            pos = painter.rl.length()
+
+            encoder(image.copy(), frames)
+            frames += 1
+            if report is not None:
+                report(frames, self.frameCount())
+        return frames
+
+    def exportPngSequence(self, directory, workers=None, report=None):
+        """
+        Writes the frames to numbered PNG files frame_000000.png, frame_000001.png, ...
+        in the directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        pool = FrameEncoder(savePng, workers=workers)
+        try:
+            return self.run(lambda image, n: pool.submit(image, os.path.join(directory, "frame_%06d.png" % n)),
+                            report)
+        finally:
+            pool.close()
+
+    def exportRawStream(self, stream, workers=None, report=None):
+        """
+        Writes the frames to a binary stream as raw 8-bit RGBA pixels, one frame after
+        another.
+        """
+        pool = FrameEncoder(rgbaBytes, stream, workers)
+        try:
+            return self.run(lambda image, n: pool.submit(image), report)
+        finally:
+            pool.close()
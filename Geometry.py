@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class ShapeArray:
+    """
+    Growable contiguous float64 array of shapes with a fixed number of points each, such
+    as edges or triangles, of shape (n, points, 2).  It grows by doubling so appending
+    is amortized constant time, and array gives the filled part without copying so the
+    vectorized functions below can use it directly.
+    """
+
+    points = 2
+
+    def __init__(self, capacity=64):
+        self.data = np.empty((capacity, self.points, 2))
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0 or i >= self.count:
+            raise IndexError("shape index out of range")
+        return self.data[i]
+
+    def append(self, shape):
+        if self.count == len(self.data):
+            data = np.empty((2 * len(self.data), self.points, 2))
+            data[:self.count] = self.data
+            self.data = data
+        self.data[self.count] = shape
+        self.count += 1
+        return self.count - 1
+
+    @property
+    def array(self):
+        return self.data[:self.count]
+
+
+class EdgeArray(ShapeArray):
+    points = 2
+
+
+class TriangleArray(ShapeArray):
+    points = 3
+
+
+# https://bryceboe.com/2006/10/23/line-segment-intersection-algorithm/
+# Author: Bryce Boe
+# Last Updated: 10/23/2006
+# Vectorized, the points are arrays of shape (..., 2) that broadcast against each other.
+
+def ccw(A, B, C):
+    return (C[..., 1] - A[..., 1]) * (B[..., 0] - A[..., 0]) > (B[..., 1] - A[..., 1]) * (C[..., 0] - A[..., 0])
+
+
+def intersect(A, B, C, D):
+    """
+    True where segment AB crosses segment CD.
+    """
+    return (ccw(A, C, D) != ccw(B, C, D)) & (ccw(A, B, C) != ccw(A, B, D))
+
+
+def triangleCrossesEdges(triangle, edges):
+    """
+    Tests the 3 edges of a triangle, an array of shape (3, 2), against an array of edges
+    of shape (n, 2, 2) in one call.  Returns true if an edge of the triangle crosses a
+    stored edge it does not share an end point with.
+    """
+    if len(edges) == 0:
+        return False
+    A = triangle[:, None, :]
+    B = np.roll(triangle, -1, axis=0)[:, None, :]
+    C = edges[None, :, 0, :]
+    D = edges[None, :, 1, :]
+    shared = ((A == C).all(axis=2) | (A == D).all(axis=2) | (B == C).all(axis=2) | (B == D).all(axis=2))
+    return bool((intersect(A, B, C, D) & ~shared).any())
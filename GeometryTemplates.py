@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+
+
+class StepTable:
+    """
+    Table of the vertices a parametric algorithm draws at each chunk since its reset.
+    The algorithm keeps a counter that starts at 0 and goes up by step every chunk, and
+    the vertices are a function of the counter and the chunk number.  The counter is
+    summed one step at a time, as the algorithms did, so the table holds exactly the
+    values they would compute.  Rows are filled with vectorized calls a window of
+    windowSize chunks at a time and only the window of the last row asked for is kept,
+    along with the counter at the start of each window, so memory stays the same in
+    long sessions and any window can be made again.
+    """
+
+    windowSize = 4096
+
+    def __init__(self, step, function):
+        self.step = step
+        self.function = function
+        # Counter before the first chunk of each window reached so far.
+        self.starts = [0.0]
+        self.window = None
+        self.rowList = []
+
+    def counters(self, window):
+        """
+        Returns the counter of each chunk of a window.
+        """
+        while len(self.starts) <= window:
+            self.starts.append(self.sum(len(self.starts) - 1)[-1])
+        return self.sum(window)
+
+    def sum(self, window):
+        steps = np.full(self.windowSize + 1, self.step)
+        steps[0] = self.starts[window]
+        return np.cumsum(steps)[1:]
+
+    def windowValues(self, window):
+        first = window * self.windowSize
+        return np.ascontiguousarray(self.function(self.counters(window),
+                                                  np.arange(first, first + self.windowSize)))
+
+    def row(self, i):
+        """
+        Returns the vertices of chunk i as a list.
+        """
+        window, offset = divmod(i, self.windowSize)
+        if window != self.window:
+            self.rowList = self.windowValues(window).tolist()
+            self.window = window
+        return self.rowList[offset]
+
+    def rows(self, start, count):
+        """
+        Returns the vertices of count chunks from chunk start on as an array.
+        """
+        parts = []
+        end = start + count
+        for window in range(start // self.windowSize, -(-end // self.windowSize)):
+            first = window * self.windowSize
+            values = self.windowValues(window)
+            parts.append(values[max(start - first, 0):min(end - first, self.windowSize)])
+        if not parts:
+            return self.windowValues(0)[:0]
+        return np.concatenate(parts)
+
+
+def lissajous(counter, index):
+    theta = counter % np.pi * 2
+    return np.stack((np.sin(10 * theta), np.sin(8 * theta)), axis=1)
+
+
+def epicycloid(counter, index):
+    theta = counter % np.pi * 2
+    return np.stack(((np.cos(theta) - np.cos(9 * theta)) / 2, (np.sin(theta) - np.sin(9 * theta)) / 2), axis=1)
+
+
+# Divisor of the ring radius of Spiraling Circles for each multiple of pi of the ring counter.
+RINGDIVISORS = [1.06, 1.28, 1.6, 2.1, 2.95, 4.8, 12.0]
+
+
+def ringCycle():
+    """
+    Values of the ring counter of Spiraling Circles over one cycle.  It goes up by 0.51
+    to 7 pi and is then reset to 0 for one chunk, which draws nothing.
+    """
+    values = []
+    value = 0
+    while value != 0 or len(values) == 0:
+        value += 0.51
+        if value > np.pi * 7:
+            value = 0
+        values.append(value)
+    return np.array(values)
+
+
+def spiralingCircles(counter, index):
+    """
+    Center of the circle of each chunk and 1 if it is drawn.  The ring counter repeats
+    the same cycle, the ladder of ring radii becomes a lookup by multiple of pi.
+    """
+    cycle = ringCycle()
+    ring = cycle[index % len(cycle)]
+    theta = counter % np.pi * 2
+    divisor = np.array(RINGDIVISORS)[np.clip(np.searchsorted(np.pi * np.arange(1, 8), ring), 0, 6)]
+    return np.stack((np.cos(theta) / divisor, np.sin(theta) / divisor, ring != 0), axis=1)
+
+
+def starOffsets(points, angle, skip):
+    """
+    Unit vectors to the points of a star, point k at angle * (.5 - 2k / points), in the
+    order they are joined, every skip-th point, back to the first.
+    """
+    order = [skip * k % points for k in range(points + 1)]
+    angles = np.array([angle * (.5 - 2 * k / points) for k in order])
+    return np.stack((np.cos(angles), np.sin(angles)), axis=1)
+
+
+def rotateScale(offsets, rotation, scale):
+    """
+    Rotates unit offsets by rotation and scales them, one affine transform.
+    """
+    c = math.cos(rotation) * scale
+    s = math.sin(rotation) * scale
+    return (offsets @ np.array([[c, s], [-s, c]])).tolist()
+
+
+# The templates, shared by all algorithm instances.
+LISSAJOUS = StepTable(0.1, lissajous)
+EPICYCLOID = StepTable(0.1, epicycloid)
+SPIRALINGCIRCLES = StepTable(0.51, spiralingCircles)
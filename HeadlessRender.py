@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command line batch renderer for Music Painter.  It runs the same wav file analysis and
+PaintBrush rendering algorithms as the main program on the Qt offscreen platform and
+writes the finished images to PNG files without creating any windows, so it can be used
+on headless servers and in scripts.
+
+Examples:
+    python HeadlessRender.py song.wav other.wav -a Spirograph -c 16384 -W 1920 -H 1080 -b black -o renders
+    python HeadlessRender.py song.wav -a Vortex -c 2048 --raw | ffmpeg -f rawvideo -pix_fmt rgba \
+        -s 1920x1080 -framerate 21.533 -i - -i song.wav animation.mp4
+    python HeadlessRender.py song.wav --grid -c 16384 -W 1920 -H 1080 -j 0 -o renders
+"""
+
+import argparse
+import os
+import sys
+
+# The offscreen platform must be selected before the Qt application is created.
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2.QtGui import (QGuiApplication, QColor, QImage, QPainter)
+
+from PaintBrush import PaintBrush
+from RenderList import RenderList
+from ListRenderer import ListRenderer
+from FrameExport import FrameExport
+from NumpyRasterizer import NumpyRasterizer
+from RandomStream import MAXSEED
+import SoundAnalysis
+
+_application = None
+
+
+def ensureApplication():
+    """
+    Creates the Qt application needed for QImage and QPainter if there is none yet.
+    """
+    global _application
+    if QGuiApplication.instance() is None:
+        _application = QGuiApplication([sys.argv[0]])
+    return QGuiApplication.instance()
+
+
+class HeadlessPainter:
+    """
+    Stand-in for the main program window.  It holds the render list and frequency data
+    that a PaintBrush draws from, so the algorithms can run without a GUI.
+    """
+
+    def __init__(self):
+        self.rl = RenderList()
+        self.freqlist = None
+        self.SpectList = None
+        self.paintbrush = PaintBrush(self)
+
+    def analyze(self, filename, chunk):
+        """
+        Precomputes the frequency data for the wav file with the given chunk size.
+        """
+        self.freqlist, self.SpectList, samplingfreq = SoundAnalysis.analyzeWav(filename, chunk)
+        return samplingfreq
+
+    def draw(self, algorithm):
+        """
+        Clears the render list and runs the algorithm over the whole frequency list, in
+        one call if it has a whole track version.
+        """
+        self.rl.clear()
+        self.paintbrush.currentAlgorithm = algorithm
+        self.paintbrush.resetAlgorithm(algorithm)
+        self.paintbrush.resetlistlinks()
+        if PaintBrush.hasTrack(algorithm):
+            self.rl.extend(self.paintbrush.drawTrack(self.freqlist, self.SpectList))
+            return
+        for i in range(len(self.freqlist)):
+            self.paintbrush.draw(self.freqlist[i], i, self.SpectList[i])
+
+    def rasterize(self, width, height, backgroundcolor, detailerror=0, backend='qpainter'):
+        """
+        Draws the render list into a new image of the given size with QPainter or, with
+        the 'numpy' backend, with a NumpyRasterizer.
+        """
+        if backend == 'numpy':
+            rasterizer = NumpyRasterizer(width, height, backgroundcolor=backgroundcolor)
+            rasterizer.renderAll(self.rl)
+            return rasterizer.toQImage()
+        renderer = ListRenderer(width, height, backgroundcolor=backgroundcolor, detailerror=detailerror)
+        image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        qp = QPainter()
+        qp.begin(image)
+        renderer.renderAll(qp, self.rl)
+        qp.end()
+        return image
+
+
+def algorithmNumber(name):
+    """
+    Converts an algorithm number or name, as shown in the program, to its number.
+    """
+    names = PaintBrush.algorithmNames
+    if name.isdigit() and 1 <= int(name) <= len(names):
+        return int(name)
+    for i in range(len(names)):
+        if names[i].lower() == name.lower():
+            return i + 1
+    raise argparse.ArgumentTypeError("unknown algorithm '" + name + "', use 1-" + str(len(names)) +
+                                     " or one of: " + ", ".join(names))
+
+
+def renderFile(filename, algorithm, chunk, width, height, backgroundcolor, detailerror=0, backend='qpainter',
+               seed=None):
+    """
+    Analyzes and renders a wav file and returns the image.  The seed of the random numbers,
+    a new one if seed is None, is kept in the Seed text of the image and written with it.
+    """
+    ensureApplication()
+    painter = HeadlessPainter()
+    painter.paintbrush.seed = seed
+    painter.analyze(filename, chunk)
+    painter.draw(algorithm)
+    image = painter.rasterize(width, height, QColor(backgroundcolor), detailerror, backend)
+    image.setText("Seed", str(painter.paintbrush.random.seed))
+    return image
+
+
+def outputName(filename, output, count):
+    """
+    Chooses the PNG file for an input file.  The output is used as the file name when a
+    single file with a .png output is rendered and as a directory otherwise.
+    """
+    base = os.path.splitext(os.path.basename(filename))[0] + ".png"
+    if output is None:
+        return base
+    if count == 1 and output.lower().endswith(".png"):
+        return output
+    return os.path.join(output, base)
+
+
+def exportAnimation(args):
+    """
+    Writes the animation of the file of the command line arguments as a PNG sequence or
+    a raw RGBA stream on stdout.  Progress goes to stderr so it does not mix with frames.
+    """
+    ensureApplication()
+    painter = HeadlessPainter()
+    samplingfreq = painter.analyze(args.files[0], args.chunk)
+    painter.paintbrush.seed = args.seed
+    renderer = ListRenderer(args.width, args.height, backgroundcolor=QColor(args.background),
+                            detailerror=args.detail)
+    exporter = FrameExport(painter, args.algorithm, renderer, args.frame_step)
+    rate = samplingfreq / args.chunk / args.frame_step
+    print(str(exporter.frameCount()) + " frames of " + str(args.width) + "x" + str(args.height) +
+          " at %.4f frames per second" % rate, file=sys.stderr)
+
+    jobs = args.jobs or None
+    if args.raw:
+        frames = exporter.exportRawStream(sys.stdout.buffer, jobs)
+    else:
+        frames = exporter.exportPngSequence(args.frames, jobs)
+    print(args.files[0] + ": " + str(frames) + " frames written", file=sys.stderr)
+    return 0
+
+
+def compareAlgorithms(args):
+    """
+    Writes a grid of thumbnails of every algorithm for the file of the command line
+    arguments, from one analysis drawn in a process pool.  The width and height are those
+    of the whole grid.
+    """
+    from AlgorithmGrid import AlgorithmGrid
+
+    ensureApplication()
+    count = len(PaintBrush.algorithmNames)
+    rows = (count + AlgorithmGrid.columns - 1) // AlgorithmGrid.columns
+    width = args.width // AlgorithmGrid.columns
+    height = args.height // rows - AlgorithmGrid.labelHeight
+    if width <= 0 or height <= 0:
+        print("The grid is too small for " + str(count) + " thumbnails", file=sys.stderr)
+        return 1
+
+    filename = args.files[0]
+    base = os.path.splitext(os.path.basename(filename))[0] + "-grid.png"
+    if args.output is None:
+        target = base
+    elif args.output.lower().endswith(".png"):
+        target = args.output
+    else:
+        target = os.path.join(args.output, base)
+
+    grid = AlgorithmGrid(filename, args.chunk, width, height, args.background, args.detail,
+                         args.jobs, args.seed)
+    results = grid.run()
+    status = 0
+    for algorithm, image, error in results:
+        if error is not None:
+            print("Error rendering algorithm " + str(algorithm) + ": " + error, file=sys.stderr)
+            status = 1
+    if not grid.image(results).save(target, "PNG"):
+        print("Error writing " + target, file=sys.stderr)
+        return 1
+    print(filename + " -> " + target + " (%.1f sec.)" % grid.elapsed())
+    return status
+
+
+def renderParallel(args):
+    """
+    Renders the files of the command line arguments in a process pool.
+    """
+    from BatchRender import BatchRender
+
+    batch = BatchRender(args.files, args.algorithm, args.chunk, args.width, args.height, args.background,
+                        args.output or ".", args.detail, args.jobs, args.backend, args.seed)
+    status = 0
+    for filename, target, error in batch.run():
+        if error is None:
+            print(filename + " -> " + target)
+        else:
+            print("Error rendering " + filename + ": " + error, file=sys.stderr)
+            status = 1
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render wav files to PNG images without a window.")
+    parser.add_argument("files", nargs="+", help="wav files to render")
+    parser.add_argument("-a", "--algorithm", type=algorithmNumber, default=1,
+                        help="algorithm number (1-12) or name (default 1)")
+    parser.add_argument("-c", "--chunk", type=int, default=16384, help="chunk size in samples (default 16384)")
+    parser.add_argument("-W", "--width", type=int, default=1920, help="image width in pixels (default 1920)")
+    parser.add_argument("-H", "--height", type=int, default=1080, help="image height in pixels (default 1080)")
+    parser.add_argument("-b", "--background", default="white",
+                        help="background color as a name or #RRGGBB (default white)")
+    parser.add_argument("-d", "--detail", type=float, default=0,
+                        help="level-of-detail tolerance in pixels, 0 = off (default 0)")
+    parser.add_argument("--backend", choices=["qpainter", "numpy"], default="qpainter",
+                        help="rasterizer for still images, numpy does not need QPainter (default qpainter)")
+    parser.add_argument("-s", "--seed", type=int,
+                        help="seed of the random numbers, the same seed gives the same image (default a new one)")
+    parser.add_argument("-o", "--output", help="output directory, or PNG file name for a single input")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="number of parallel workers, files for batch rendering and encoder threads "
+                             "for animation export, 0 = one per core (default one per core)")
+    parser.add_argument("--frames", metavar="DIR",
+                        help="write the render and play animation of a single file as numbered PNGs in DIR")
+    parser.add_argument("--raw", action="store_true",
+                        help="write the animation of a single file as raw RGBA frames to stdout")
+    parser.add_argument("--grid", action="store_true",
+                        help="write a grid of thumbnails of every algorithm for a single file, from one "
+                             "analysis drawn in parallel, -W and -H give the size of the grid")
+    parser.add_argument("--frame-step", type=int, default=1,
+                        help="number of chunks per animation frame (default 1)")
+    args = parser.parse_args(argv)
+
+    if not QColor.isValidColor(args.background):
+        parser.error("invalid background color '" + args.background + "'")
+    if not args.grid and args.chunk < PaintBrush.minimumChunkSize(args.algorithm):
+        parser.error("algorithm " + str(args.algorithm) + " needs a chunk size of at least " +
+                     str(PaintBrush.minimumChunkSize(args.algorithm)))
+    if args.width <= 0 or args.height <= 0:
+        parser.error("the output resolution must be positive")
+    if args.seed is not None and not 0 <= args.seed <= MAXSEED:
+        parser.error("the seed must be between 0 and " + str(MAXSEED))
+
+    if args.output is not None and not (len(args.files) == 1 and args.output.lower().endswith(".png")):
+        os.makedirs(args.output, exist_ok=True)
+
+    if args.grid:
+        if len(args.files) != 1:
+            parser.error("the algorithm grid takes a single wav file")
+        return compareAlgorithms(args)
+
+    if args.frames is not None or args.raw:
+        if len(args.files) != 1:
+            parser.error("animation export takes a single wav file")
+        if args.frame_step < 1:
+            parser.error("the frame step must be at least 1")
+        return exportAnimation(args)
+
+    if args.jobs != 1 and len(args.files) > 1:
+        return renderParallel(args)
+
+    status = 0
+    for filename in args.files:
+        target = outputName(filename, args.output, len(args.files))
+        try:
+            image = renderFile(filename, args.algorithm, args.chunk, args.width, args.height,
+                               args.background, args.detail, args.backend, args.seed)
+            if not image.save(target, "PNG"):
+                raise IOError("could not write " + target)
+            print(filename + " -> " + target)
+        except Exception as e:
+            print("Error rendering " + filename + ": " + str(e), file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from PySide2.QtCore import (QBuffer, QIODevice)
+
+
+def pngBytes(image):
+    """
+    Returns a QImage encoded as PNG data.
+    """
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return buffer.data().data()
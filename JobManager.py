@@ -0,0 +1,190 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Event, Lock
+
+from PySide2.QtCore import (QObject, Signal)
+
+
+class JobCancelled(Exception):
+    """
+    Raised by Job.check in a job that has been cancelled, to leave it from any depth.
+    """
+
+
+class Job:
+    """
+    A task run by a JobManager.  The function is called with the job as its first
+    argument and should check cancelled() or call check() regularly and report what it
+    is doing with stage and setProgress.  The state goes from 'queued' to 'running' and
+    then 'done', 'cancelled' or 'failed'.  Each stage is kept with its start and end time
+    so the job can report where the time went.
+    """
+
+    def __init__(self, manager, name, function, args, exclusive):
+        self.manager = manager
+        self.name = name
+        self.function = function
+        self.args = args
+        self.exclusive = exclusive
+        self.state = 'queued'
+        self.result = None
+        self.error = None
+        self.stages = []
+        self.done = 0
+        self.total = 0
+        self.startTime = None
+        self.endTime = None
+        self.token = Event()
+        self.finishedEvent = Event()
+        self.lastReport = 0
+
+    def cancel(self):
+        self.token.set()
+
+    def cancelled(self):
+        return self.token.is_set()
+
+    def check(self):
+        if self.token.is_set():
+            raise JobCancelled()
+
+    def finished(self):
+        return self.finishedEvent.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job has finished, returns False on a timeout.
+        """
+        return self.finishedEvent.wait(timeout)
+
+    @contextmanager
+    def stage(self, name, total=0):
+        """
+        Times the enclosed block as a stage of the job with total units of progress.
+        """
+        self.stages.append([name, time.perf_counter(), None])
+        self.done = 0
+        self.total = total
+        self.manager.jobProgress.emit(self)
+        try:
+            yield self
+        finally:
+            self.stages[-1][2] = time.perf_counter()
+
+    def setProgress(self, done, total=None):
+        """
+        Sets the progress of the current stage.  Reports are sent at most every 0.1 s.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.perf_counter()
+        if now - self.lastReport >= 0.1:
+            self.lastReport = now
+            self.manager.jobProgress.emit(self)
+
+    def currentStage(self):
+        return self.stages[-1][0] if self.stages else ""
+
+    def elapsed(self):
+        if self.startTime is None:
+            return 0
+        return (self.endTime or time.perf_counter()) - self.startTime
+
+    def timings(self):
+        """
+        Returns a list of (stage, seconds) for the stages so far.
+        """
+        now = time.perf_counter()
+        return [(name, (end or now) - start) for name, start, end in self.stages]
+
+    def report(self):
+        text = self.name + " " + self.state + " in %.2f sec." % self.elapsed()
+        if self.stages:
+            text += " (" + ", ".join(name + " %.2f" % seconds for name, seconds in self.timings()) + ")"
+        if self.error is not None:
+            text += ": " + self.error
+        return text
+
+    def run(self):
+        if self.token.is_set():
+            self.state = 'cancelled'
+        else:
+            self.state = 'running'
+            self.startTime = time.perf_counter()
+            self.manager.jobProgress.emit(self)
+            try:
+                self.result = self.function(self, *self.args)
+                self.state = 'cancelled' if self.token.is_set() else 'done'
+            except JobCancelled:
+                self.state = 'cancelled'
+            except Exception as e:
+                self.state = 'failed'
+                self.error = str(e)
+            self.endTime = time.perf_counter()
+        self.manager.finish(self)
+
+
+class JobManager(QObject):
+    """
+    Runs the long tasks of the program, analysis, rendering, playing and recording, off
+    the GUI thread.  Exclusive jobs share the render list and frequency data, so they are
+    queued and run one at a time in order: a job only starts once the one before it has
+    returned and cleaned up, even if it was cancelled.  Other jobs, such as analyzing
+    another file, run concurrently in a pool of at most workers threads.  Progress and the
+    end of each job are sent with the jobProgress and jobFinished signals, which reach the
+    GUI thread as queued signals.
+    """
+
+    jobProgress = Signal(object)
+    jobFinished = Signal(object)
+
+    def __init__(self, workers=2):
+        super().__init__()
+        self.lock = Lock()
+        self.jobs = []
+        self.exclusiveLane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exclusive")
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, name, function, *args, exclusive=False):
+        """
+        Queues function(job, *args) and returns the job.
+        """
+        job = Job(self, name, function, args, exclusive)
+        with self.lock:
+            self.jobs.append(job)
+        (self.exclusiveLane if exclusive else self.pool).submit(job.run)
+        return job
+
+    def finish(self, job):
+        with self.lock:
+            if job in self.jobs:
+                self.jobs.remove(job)
+        job.finishedEvent.set()
+        self.jobFinished.emit(job)
+
+    def active(self, exclusive=None):
+        """
+        Returns the jobs queued or running, only the exclusive or other ones if asked.
+        """
+        with self.lock:
+            return [job for job in self.jobs if exclusive is None or job.exclusive == exclusive]
+
+    def busy(self):
+        """
+        True while an exclusive job is queued or running.
+        """
+        return len(self.active(True)) > 0
+
+    def cancelAll(self, exclusive=None):
+        for job in self.active(exclusive):
+            job.cancel()
+
+    def shutdown(self, wait=True):
+        """
+        Cancels all jobs and stops the threads, waiting for running jobs if wait is set.
+        """
+        self.cancelAll()
+        self.exclusiveLane.shutdown(wait=wait)
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,197 @@
+import numpy as np
+
+from PySide2.QtCore import (QPoint)
+from PySide2.QtGui import (QColor, QImage, QPolygon)
+
+
+class LevelOfDetail:
+    """
+    Level-of-detail reducer used while painting the render list.  Primitives that are
+    smaller than the error bound (in pixels) at the current zoom are not drawn one at
+    a time.  Chains of connected lines of one color are collapsed into a single
+    decimated polyline and tiny circles, rectangles, triangles and line fragments are
+    accumulated into a density raster.  Both are drawn before the next primitive that
+    is drawn directly, so the drawing order is kept.  A line that starts no chain is
+    drawn as it would be without the reducer.  Since the error bound is measured on
+    screen, zooming in makes every primitive larger and the full detail comes back.  An
+    error bound of 0, the default, turns the reduction off; Benchmarks.py --detail times
+    it against drawing every primitive.
+    """
+
+    # Fewer spots than this are filled one by one instead of through a raster.
+    maxDirectSpots = 32
+
+    def __init__(self, error=0):
+        self.error = error
+        self.begin(0, 0)
+
+    def enabled(self):
+        return self.error > 0
+
+    def begin(self, width, height):
+        """
+        Resets the polyline run and density raster for a paint of the given size.
+        """
+        self.width = width
+        self.height = height
+        self.errorSquared = self.error * self.error
+        # Vertices of the run as a flat list of coordinates, the end of the last line
+        # added to it and its color, None when there is no run.
+        self.run = []
+        self.runEndX = 0
+        self.runEndY = 0
+        self.runColor = None
+        self.runRgba = 0
+        self.spotX = []
+        self.spotY = []
+        self.spotColor = []
+        self.spotWeight = []
+
+    def isSubPixel(self, size):
+        """
+        Returns true if a primitive with the given screen size is below the error bound.
+        """
+        return size < self.error
+
+    def addLine(self, qp, x1, y1, x2, y2, col):
+        """
+        Adds a line in screen coordinates.  Lines of the same color that continue the
+        current run are appended to it, keeping only vertices at least the error bound
+        apart.  Short lines that do not continue the run go to the density raster and
+        long ones start a new run, which is drawn as a plain line if nothing joins it.
+        """
+        rgba = col.rgba()
+        if self.runColor is not None and x1 == self.runEndX and y1 == self.runEndY and rgba == self.runRgba:
+            run = self.run
+            dx = x2 - run[-2]
+            dy = y2 - run[-1]
+            if dx * dx + dy * dy >= self.errorSquared:
+                run.append(x2)
+                run.append(y2)
+            self.runEndX = x2
+            self.runEndY = y2
+            return
+
+        dx = x2 - x1
+        dy = y2 - y1
+        lengthSquared = dx * dx + dy * dy
+        if lengthSquared < self.errorSquared:
+            # addSpot, inlined since most lines of some algorithms end up here.
+            self.spotX.append((x1 + x2) / 2)
+            self.spotY.append((y1 + y2) / 2)
+            self.spotColor.append(rgba)
+            self.spotWeight.append(min(max(lengthSquared ** 0.5, 0.1), 1) * col.alphaF())
+            return
+
+        self.flush(qp)
+        self.run = [x1, y1, x2, y2]
+        self.runEndX = x2
+        self.runEndY = y2
+        self.runColor = col
+        self.runRgba = rgba
+
+    def addSpot(self, x, y, area, col):
+        """
+        Accumulates a sub-pixel primitive covering the given area (in square pixels)
+        centered at screen position (x, y) into the density raster.
+        """
+        self.spotX.append(x)
+        self.spotY.append(y)
+        self.spotColor.append(col.rgba())
+        self.spotWeight.append(min(area, 1) * col.alphaF())
+
+    def flush(self, qp):
+        """
+        Draws the current polyline run and composites the spots gathered since the last
+        flush.  Called before any primitive that is drawn directly so the drawing order
+        is kept.
+        """
+        if self.runColor is None and not self.spotX:
+            return
+        if self.runColor is not None:
+            run = self.run
+            qp.setPen(self.runColor)
+            if len(run) == 4 and run[2] == self.runEndX and run[3] == self.runEndY:
+                # A single line, with the same truncated end points as ListRenderer draws.
+                qp.drawLine(int(run[0]), int(run[1]), int(run[2]), int(run[3]))
+            else:
+                if run[-2] != self.runEndX or run[-1] != self.runEndY:
+                    run.append(self.runEndX)
+                    run.append(self.runEndY)
+                qp.drawPolyline(QPolygon([QPoint(run[i], run[i + 1]) for i in range(0, len(run), 2)]))
+            self.run = []
+            self.runColor = None
+        if self.spotX:
+            if len(self.spotX) < self.maxDirectSpots:
+                self.fillSpots(qp)
+            else:
+                self.drawSpots(qp)
+
+    def finish(self, qp):
+        """
+        Draws whatever is left at the end of the paint.
+        """
+        self.flush(qp)
+
+    def fillSpots(self, qp):
+        """
+        Fills the pixels of a few gathered spots one at a time.
+        """
+        width = self.width
+        height = self.height
+        for x, y, rgba, weight in zip(self.spotX, self.spotY, self.spotColor, self.spotWeight):
+            if 0 <= x < width and 0 <= y < height:
+                qp.fillRect(int(x), int(y), 1, 1, QColor.fromRgba((rgba & 0xffffff) | int(min(weight, 1) * 255) << 24))
+        self.spotX = []
+        self.spotY = []
+        self.spotColor = []
+        self.spotWeight = []
+
+    def drawSpots(self, qp):
+        """
+        Composites the density raster of the gathered spots.
+        """
+        x = np.array(self.spotX, dtype=np.int64)
+        y = np.array(self.spotY, dtype=np.int64)
+        weight = np.array(self.spotWeight)
+        packed = np.array(self.spotColor, dtype=np.uint32)
+        self.spotX = []
+        self.spotY = []
+        self.spotColor = []
+        self.spotWeight = []
+
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        if not np.any(inside):
+            return
+        x = x[inside]
+        y = y[inside]
+        weight = weight[inside]
+        packed = packed[inside]
+
+        # Spots are summed per pixel, only the pixels that received one are kept.
+        pixels, index = np.unique(y * self.width + x, return_inverse=True)
+        coverage = np.bincount(index, weight)
+        color = np.stack([np.bincount(index, ((packed >> shift) & 255) * weight) for shift in (16, 8, 0)], axis=1)
+        color /= np.maximum(coverage, 1e-12)[:, None]
+        alpha = np.clip(coverage, 0, 1) * 255
+        x = pixels % self.width
+        y = pixels // self.width
+
+        x0 = x.min()
+        y0 = y.min()
+        w = x.max() - x0 + 1
+        h = y.max() - y0 + 1
+        if len(pixels) * 64 < w * h:
+            # A few scattered pixels are cheaper to fill than a raster around them.
+            for px, py, (r, g, b), a in zip(x.tolist(), y.tolist(), np.clip(color, 0, 255).tolist(), alpha.tolist()):
+                qp.fillRect(px, py, 1, 1, QColor(int(r), int(g), int(b), int(a)))
+            return
+
+        # Only allocate the window of the screen that actually received spots.
+        raster = np.zeros((h, w, 4), dtype=np.uint8)
+        raster[y - y0, x - x0, :3] = np.clip(color, 0, 255)
+        raster[y - y0, x - x0, 3] = alpha
+
+        data = raster.tobytes()
+        image = QImage(data, w, h, w * 4, QImage.Format_RGBA8888)
+        qp.drawImage(int(x0), int(y0), image)
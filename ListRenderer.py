@@ -0,0 +1,500 @@
+import math
+
+import numpy as np
+
+from PySide2.QtCore import (Qt, QPoint, QRect, QRectF, QLine)
+from PySide2.QtGui import (QColor, QPainter, QPen, QRadialGradient, QTransform)
+
+from LevelOfDetail import LevelOfDetail
+from SpriteCache import SpriteCache
+
+
+def screenBounds(width, height, center, zoomfactor):
+    """
+    Returns the screen bounds [xmin, xmax, ymin, ymax] in real coordinates for an image
+    of the given size, center and zoom factor.  The default window is [-1,1] with
+    aspect ratio expansion in one direction.
+    """
+    fullscreen = [-1, 1, -1, 1]
+    ww = width
+    wh = height
+    if ww >= wh:
+        fullscreen = [-ww / wh, ww / wh, -1, 1]
+    else:
+        fullscreen = [-1, 1, -wh / ww, wh / ww]
+    for i in range(4):
+        fullscreen[i] = fullscreen[i] * (1 / zoomfactor)
+    return [center[0] - fullscreen[1], center[0] + fullscreen[1],
+            center[1] - fullscreen[3], center[1] + fullscreen[3]]
+
+
+def rectView(rect, scale):
+    """
+    Returns the image size, center and zoom factor of a view of the rectangle [xmin, ymin,
+    xmax, ymax] in real coordinates at scale pixels per unit.
+    """
+    width = max(1, round((rect[2] - rect[0]) * scale))
+    height = max(1, round((rect[3] - rect[1]) * scale))
+    center = [-(rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2]
+    return width, height, center, 2 * scale / min(width, height)
+
+
+def glowAlphas(alpha, layers):
+    """
+    Opacity, 0 to 1, of each ring of a glow.  A glow looks like layers filled circles of
+    radius r / (i + 1) and alpha alpha * (i + 1) / layers drawn over each other, so ring k,
+    between r / (k + 1) and r / k, is covered by the k largest circles.
+    """
+    alphas = []
+    transparency = 1
+    for i in range(layers):
+        transparency *= 1 - int(alpha * (i + 1) / layers) / 255
+        alphas.append(1 - transparency)
+    return alphas
+
+
+def glowStops(alpha, layers):
+    """
+    Gradient stops (position, opacity) of a glow from the center out, a hard step at
+    the edge of every ring.
+    """
+    alphas = glowAlphas(alpha, layers)
+    stops = [(0, alphas[-1])]
+    for k in range(layers, 1, -1):
+        stops.append((1 / k, alphas[k - 1]))
+        stops.append((1 / k + 1e-6, alphas[k - 2]))
+    stops.append((1, alphas[0]))
+    return stops
+
+
+def glowGradient(cx, cy, radius, layers, col):
+    """
+    Radial gradient brush for a glow centered at (cx, cy) in device coordinates.
+    """
+    gradient = QRadialGradient(cx, cy, radius)
+    stop = QColor(col)
+    for position, opacity in glowStops(col.alpha(), int(layers)):
+        stop.setAlpha(round(255 * opacity))
+        gradient.setColorAt(position, stop)
+    return gradient
+
+
+class ListRenderer:
+    """
+    Draws the geometric data in the render list with a QPainter.  The renderer holds a
+    copy of the view (image size, center, zoom factor and background color) and does not
+    depend on a widget, so it can draw into a QImage on any thread.  A renderer can also
+    be restricted to a tile of the image, in which case it draws into a device the size
+    of the tile.  Small circles are stamped from a sprite cache of the view, sprites can
+    be set to None to draw every circle directly.
+    """
+
+    def __init__(self, width, height, center=(0, 0), zoomfactor=1, backgroundcolor=None, detailerror=0):
+        self.width = width
+        self.height = height
+        self.center = [center[0], center[1]]
+        self.zoomfactor = zoomfactor
+        if backgroundcolor is None:
+            self.backgroundcolor = QColor()
+            self.backgroundcolor.setRgbF(1, 1, 1, 1)
+        else:
+            self.backgroundcolor = QColor(backgroundcolor)
+        self.lod = LevelOfDetail(detailerror)
+        self.sprites = SpriteCache()
+        self.screen = screenBounds(width, height, self.center, zoomfactor)
+        self.setTile(0, 0, width, height)
+
+    def setTile(self, x, y, width, height):
+        """
+        Restricts drawing to the tile of the image with upper left corner (x, y).
+        """
+        self.originX = x
+        self.originY = y
+        self.deviceWidth = width
+        self.deviceHeight = height
+
+    def screenRect(self, bounds):
+        """
+        Converts real coordinate bounds [xmin, ymin, xmax, ymax] to device coordinates
+        [left, top, right, bottom].
+        """
+        left, top = self.XYtoScreen(bounds[0], bounds[3])
+        right, bottom = self.XYtoScreen(bounds[2], bounds[1])
+        return [left, top, right, bottom]
+
+    def screenBoxes(self, bounds):
+        """
+        Converts an array of real coordinate bounds [xmin, ymin, xmax, ymax] of shape
+        (n, 4) to device coordinates [left, top, right, bottom].
+        """
+        xr = self.screen[1] - self.screen[0]
+        yr = self.screen[3] - self.screen[2]
+        boxes = np.empty_like(bounds)
+        boxes[:, 0] = (bounds[:, 0] + self.center[0]) / xr * self.width + self.width / 2 - self.originX
+        boxes[:, 2] = (bounds[:, 2] + self.center[0]) / xr * self.width + self.width / 2 - self.originX
+        boxes[:, 1] = (self.center[1] - bounds[:, 3]) / yr * self.height + self.height / 2 - self.originY
+        boxes[:, 3] = (self.center[1] - bounds[:, 1]) / yr * self.height + self.height / 2 - self.originY
+        return boxes
+
+    def dirtyRects(self, bounds, cell=32, margin=2):
+        """
+        Returns a short list of QRects that covers primitives with the given real
+        coordinate bounds.  The boxes are snapped to a grid of cells, which merges nearby
+        boxes, and runs of covered cells are joined into rectangles.
+        """
+        if len(bounds) == 0:
+            return []
+        boxes = self.screenBoxes(bounds)
+        cols = math.ceil(self.deviceWidth / cell)
+        rows = math.ceil(self.deviceHeight / cell)
+        visible = ((boxes[:, 2] >= -margin) & (boxes[:, 0] <= self.deviceWidth + margin) &
+                   (boxes[:, 3] >= -margin) & (boxes[:, 1] <= self.deviceHeight + margin))
+        boxes = boxes[visible]
+        if len(boxes) == 0:
+            return []
+        c0 = np.clip((boxes[:, 0] - margin) // cell, 0, cols - 1).astype(np.intp)
+        c1 = np.clip((boxes[:, 2] + margin) // cell, 0, cols - 1).astype(np.intp) + 1
+        r0 = np.clip((boxes[:, 1] - margin) // cell, 0, rows - 1).astype(np.intp)
+        r1 = np.clip((boxes[:, 3] + margin) // cell, 0, rows - 1).astype(np.intp) + 1
+
+        # Each box adds one to the cells it covers, summed with a 2D difference array.
+        cover = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+        np.add.at(cover, (r0, c0), 1)
+        np.add.at(cover, (r0, c1), -1)
+        np.add.at(cover, (r1, c0), -1)
+        np.add.at(cover, (r1, c1), 1)
+        cover = cover.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+        # Runs of cells in a row, continued by the same run in the next row.
+        rects = []
+        strips = {}
+        padded = np.zeros(cols + 2, dtype=np.int8)
+        for r in range(rows + 1):
+            runs = {}
+            if r < rows:
+                padded[1:-1] = cover[r]
+                edges = np.nonzero(np.diff(padded))[0]
+                for a, b in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+                    runs[(a, b)] = strips.pop((a, b), r)
+            for (a, b), top in strips.items():
+                rects.append(QRect(a * cell, top * cell, (b - a) * cell, (r - top) * cell))
+            strips = runs
+        return rects
+
+    def visibleRect(self):
+        """
+        Returns the rectangle [xmin, ymin, xmax, ymax] in real coordinates shown by the
+        whole image.
+        """
+        xr = self.screen[1] - self.screen[0]
+        yr = self.screen[3] - self.screen[2]
+        return [-self.center[0] - xr / 2, self.center[1] - yr / 2, -self.center[0] + xr / 2, self.center[1] + yr / 2]
+
+    def key(self):
+        """
+        Returns a value that changes whenever the view of the renderer changes.
+        """
+        return (self.width, self.height, self.center[0], self.center[1], self.zoomfactor,
+                self.backgroundcolor.rgba(), self.lod.error)
+
+    def XYtoScreen(self, x, y):
+        """
+        Covert real coordinates to unrounded screen coordinates.
+        """
+        xr = self.screen[1] - self.screen[0]
+        yr = self.screen[3] - self.screen[2]
+        # ptx = x / xr * self.width + self.width / 2
+        # pty = -y / yr * self.height + self.height / 2
+        ptx = (x + self.center[0]) / xr * self.width + self.width / 2 - self.originX
+        pty = (self.center[1] - y) / yr * self.height + self.height / 2 - self.originY
+        return ptx, pty
+
+    def transform(self):
+        """
+        Returns the transform from real coordinates to device coordinates.
+        """
+        sx = self.width / (self.screen[1] - self.screen[0])
+        sy = self.height / (self.screen[3] - self.screen[2])
+        return QTransform(sx, 0, 0, -sy, self.center[0] * sx + self.width / 2 - self.originX,
+                          self.center[1] * sy + self.height / 2 - self.originY)
+
+    def XYtoQPoint(self, x, y):
+        """
+        Covert real coordinates to screen coordinates.
+        """
+        ptx, pty = self.XYtoScreen(x, y)
+        return QPoint(ptx, pty)
+
+    def pixelScale(self):
+        """
+        Number of pixels per unit of real coordinates at the current zoom.
+        """
+        return self.width / (self.screen[1] - self.screen[0])
+
+    def RenderPoint(self, qp, obj):
+        """
+        Draw a point to the screen.
+        """
+        qp.setPen(obj[3])
+        qp.drawPoint(self.XYtoQPoint(obj[1], obj[2]))
+
+    def RenderLine(self, qp, obj):
+        """
+        Draw a line to the screen.
+        """
+        qp.setPen(obj[5])
+        pt1 = self.XYtoQPoint(obj[1], obj[2])
+        pt2 = self.XYtoQPoint(obj[3], obj[4])
+        line = QLine(pt1, pt2)
+        qp.drawLine(line)
+
+    def RenderCircle(self, qp, obj):
+        """
+        Draw a circle to the screen.  Small circles are stamped from the sprite cache.
+        """
+        ulpt = self.XYtoQPoint(obj[1] - obj[3], obj[2] + obj[3])
+        lrpt = self.XYtoQPoint(obj[1] + obj[3], obj[2] - obj[3])
+        sprites = self.sprites
+        if sprites is not None:
+            w = lrpt.x() - ulpt.x() + 1
+            h = lrpt.y() - ulpt.y() + 1
+            if w > 0 and h > 0 and sprites.fits(w, h):
+                stamp = sprites.circle(w, h, obj[5], obj[4], qp.testRenderHint(QPainter.Antialiasing))
+                if stamp is not None:
+                    qp.drawImage(ulpt.x() - 1, ulpt.y() - 1, stamp)
+                    return
+        qp.setPen(obj[5])
+        # rect = QRect(ulpt.x(), ulpt.y(), lrpt.x() - ulpt.x(), lrpt.y() - ulpt.y())
+        rect = QRect(ulpt, lrpt)
+        if obj[4]:
+            qp.setBrush(obj[5])
+            qp.drawEllipse(rect)
+            qp.setBrush(QColor(0, 0, 0, 0))
+        else:
+            qp.drawEllipse(rect)
+
+    def RenderGlow(self, qp, obj):
+        """
+        Draw a glow, a disc filled with a stepped radial gradient, to the screen.
+        """
+        ulpt = self.XYtoQPoint(obj[1] - obj[3], obj[2] + obj[3])
+        lrpt = self.XYtoQPoint(obj[1] + obj[3], obj[2] - obj[3])
+        rect = QRect(ulpt, lrpt)
+        center = QRectF(rect).center()
+        qp.setPen(Qt.NoPen)
+        qp.setBrush(glowGradient(center.x(), center.y(), (lrpt.x() - ulpt.x()) / 2, obj[4], obj[5]))
+        qp.drawEllipse(rect)
+        qp.setBrush(QColor(0, 0, 0, 0))
+
+    def RenderInstance(self, qp, obj):
+        """
+        Draw an instance of a shape to the screen from its cached paths, transformed by
+        the painter.
+        """
+        fillPath, linePath = obj[1].paths()
+        world = qp.worldTransform()
+        qp.setWorldTransform(self.transform(), True)
+        if not fillPath.isEmpty():
+            qp.fillPath(fillPath, obj[2])
+        if not linePath.isEmpty():
+            qp.strokePath(linePath, QPen(obj[3], 0))
+        qp.setWorldTransform(world)
+
+    def RendeRectangle(self, qp, obj):
+        """
+        Draw a rectangle to the screen.
+        """
+        qp.setPen(obj[6])
+        ulpt = self.XYtoQPoint(obj[1], obj[2])
+        lrpt = self.XYtoQPoint(obj[3], obj[4])
+        # rect = QRect(ulpt.x(), ulpt.y(), lrpt.x() - ulpt.x(), lrpt.y() - ulpt.y())
+        rect = QRect(ulpt, lrpt)
+        if obj[5]:
+            qp.fillRect(rect, obj[6])
+        else:
+            qp.drawRect(rect)
+
+    def RenderTriangle(self, qp, obj):
+        if obj[7]:
+            self.RiemannFill(qp, obj)
+            # self.FanFill(qp, obj)
+        else:
+            obj1 = [1, obj[1], obj[2], obj[3], obj[4], obj[8]]
+            obj2 = [1, obj[3], obj[4], obj[5], obj[6], obj[8]]
+            obj3 = [1, obj[5], obj[6], obj[1], obj[2], obj[8]]
+            self.RenderLine(qp, obj1)
+            self.RenderLine(qp, obj2)
+            self.RenderLine(qp, obj3)
+
+    def RiemannFill(self, qp, obj):
+        Resolution = 250
+        Range = abs(obj[1] - obj[5])
+        MidPoint = obj[3]
+        MidPointY = obj[4]
+        if (obj[1] > obj[5]):
+            BegPoint = obj[5]
+            BegPointY = obj[6]
+            EndPoint = obj[1]
+            EndPointY = obj[2]
+        else:
+            BegPoint = obj[1]
+            BegPointY = obj[2]
+            EndPoint = obj[5]
+            EndPointY = obj[6]
+        for i in range(2):
+            if (abs(obj[(i * 2) + 1] - obj[((i + 1) * 2) + 1]) > Range):
+                Range = abs(obj[(i * 2) + 1] - obj[((i + 1) * 2) + 1])
+                if (i * 2 + 1) == 1:
+                    MidPoint = obj[5]
+                    MidPointY = obj[6]
+                    if (obj[1] > obj[3]):
+                        BegPoint = obj[3]
+                        BegPointY = obj[4]
+                        EndPoint = obj[1]
+                        EndPointY = obj[2]
+                    else:
+                        BegPoint = obj[1]
+                        BegPointY = obj[2]
+                        EndPoint = obj[3]
+                        EndPointY = obj[4]
+                elif (i * 2 + 1) == 3:
+                    MidPoint = obj[1]
+                    MidPointY = obj[2]
+                    if (obj[3] > obj[5]):
+                        BegPoint = obj[5]
+                        BegPointY = obj[6]
+                        EndPoint = obj[3]
+                        EndPointY = obj[4]
+                    else:
+                        BegPoint = obj[3]
+                        BegPointY = obj[4]
+                        EndPoint = obj[5]
+                        EndPointY = obj[6]
+        width = Range / Resolution
+        for i in range(Resolution):
+            StartingX = BegPoint + (i * width)
+            EndingX = BegPoint + ((i + 1) * width)
+            if EndPoint == MidPoint:
+                EndingY = ((((MidPointY - BegPointY) / (MidPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
+                StartingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (StartingX - BegPoint)) + BegPointY)
+            elif BegPoint == MidPoint:
+                EndingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
+                StartingY = ((((EndPointY - MidPointY) / (EndPoint - MidPoint)) * (StartingX - MidPoint)) + MidPointY)
+            else:
+                EndingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
+                if (StartingX >= MidPoint):
+                    StartingY = ((((EndPointY - MidPointY) / (EndPoint - MidPoint)) * (
+                            StartingX - MidPoint)) + MidPointY)
+                else:
+                    StartingY = ((((MidPointY - BegPointY) / (MidPoint - BegPoint)) * (
+                            StartingX - BegPoint)) + BegPointY)
+            objFill = [3, StartingX, StartingY, EndingX, EndingY, True, obj[8]]
+            self.RendeRectangle(qp, objFill)
+
+    def RenderReduced(self, qp, obj, scale):
+        """
+        Hands primitives that are below the level-of-detail error bound to the reducer.
+        Returns false if the primitive is large enough to be drawn normally.
+        """
+        lod = self.lod
+        kind = obj[0]
+        if kind == 1:
+            # The same conversion as XYtoScreen, inlined since most entries are lines.
+            cx, cy, xr, yr, w, h, hw, hh, ox, oy = self.screenScale
+            lod.addLine(qp, (obj[1] + cx) / xr * w + hw - ox, (cy - obj[2]) / yr * h + hh - oy,
+                        (obj[3] + cx) / xr * w + hw - ox, (cy - obj[4]) / yr * h + hh - oy, obj[5])
+            return True
+        elif kind == 2 or kind == 5:
+            size = 2 * obj[3] * scale
+            if lod.isSubPixel(size):
+                x, y = self.XYtoScreen(obj[1], obj[2])
+                lod.addSpot(x, y, np.pi * (size / 2) ** 2, obj[5])
+                return True
+        elif kind == 3:
+            w = abs(obj[3] - obj[1]) * scale
+            h = abs(obj[4] - obj[2]) * scale
+            if lod.isSubPixel(max(w, h)):
+                x, y = self.XYtoScreen((obj[1] + obj[3]) / 2, (obj[2] + obj[4]) / 2)
+                lod.addSpot(x, y, w * h, obj[6])
+                return True
+        elif kind == 4:
+            w = (max(obj[1], obj[3], obj[5]) - min(obj[1], obj[3], obj[5])) * scale
+            h = (max(obj[2], obj[4], obj[6]) - min(obj[2], obj[4], obj[6])) * scale
+            if lod.isSubPixel(max(w, h)):
+                x, y = self.XYtoScreen((obj[1] + obj[3] + obj[5]) / 3, (obj[2] + obj[4] + obj[6]) / 3)
+                lod.addSpot(x, y, w * h / 2, obj[8])
+                return True
+        elif kind == 6:
+            b = obj[1].bounds
+            w = (b[2] - b[0]) * scale
+            h = (b[3] - b[1]) * scale
+            if lod.isSubPixel(max(w, h)):
+                x, y = self.XYtoScreen((b[0] + b[2]) / 2, (b[1] + b[3]) / 2)
+                lod.addSpot(x, y, w * h / 2, obj[2])
+                return True
+
+        if lod.runColor is not None or lod.spotX:
+            lod.flush(qp)
+        return False
+
+    def renderRange(self, qp, rl, start, end):
+        """
+        Draws the render list entries from start up to end.
+        """
+        self.renderIndices(qp, rl, range(start, end))
+
+    def renderIndices(self, qp, rl, indices):
+        """
+        Draws the render list entries with the given indices in order.
+        """
+        reduce = self.lod.enabled()
+        scale = self.pixelScale()
+        self.lod.begin(self.deviceWidth, self.deviceHeight)
+        self.screenScale = (self.center[0], self.center[1], self.screen[1] - self.screen[0],
+                            self.screen[3] - self.screen[2], self.width, self.height, self.width / 2,
+                            self.height / 2, self.originX, self.originY)
+
+        for i in indices:
+            obj = rl.get(i)
+            if obj is None:
+                break
+            if reduce and self.RenderReduced(qp, obj, scale):
+                continue
+            if obj[0] == 0:
+                self.RenderPoint(qp, obj)
+            elif obj[0] == 1:
+                self.RenderLine(qp, obj)
+            elif obj[0] == 2:
+                self.RenderCircle(qp, obj)
+            elif obj[0] == 3:
+                self.RendeRectangle(qp, obj)
+            elif obj[0] == 4:
+                self.RenderTriangle(qp, obj)
+            elif obj[0] == 5:
+                self.RenderGlow(qp, obj)
+            elif obj[0] == 6:
+                self.RenderInstance(qp, obj)
+        self.lod.finish(qp)
+
+    def renderBase(self, qp, rl):
+        """
+        Draws the raster base layer of the render list, if it has one, scaled to the view.
+        """
+        base = rl.base
+        if base is None:
+            return
+        image, rect = base
+        left, top, right, bottom = self.screenRect(rect)
+        qp.save()
+        qp.setRenderHint(QPainter.SmoothPixmapTransform)
+        qp.drawImage(QRectF(left, top, right - left, bottom - top), image)
+        qp.restore()
+
+    def renderAll(self, qp, rl):
+        """
+        Clears the image to the background color and draws the base layer and the entire
+        render list.
+        """
+        qp.fillRect(0, 0, self.deviceWidth, self.deviceHeight, self.backgroundcolor)
+        self.renderBase(qp, rl)
+        self.renderRange(qp, rl, 0, rl.length())
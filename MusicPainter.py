@@ -20,18 +20,18 @@ import os
 import numpy as np
 import wave
 from scipy.io import wavfile
-from threading import Thread
 import sounddevice as sd
 import pyaudio
 import webbrowser
 import time
-from PySide2.QtCore import (Qt, QSize, QDir, QPoint, QMarginsF, QRect, QLine, QTimer)
+import multiprocessing
+from PySide2.QtCore import (Qt, QSize, QDir, QPoint, QMarginsF, QTimer)
 from PySide2.QtGui import (QIcon, QFont, QCursor, QPainter, QColor, QFontMetrics,
-                           QMouseEvent, QPageSize, QPageLayout, QPixmap, QBrush)
-from PySide2.QtWidgets import (QApplication, QMainWindow, QStatusBar, QPushButton,
+                           QMouseEvent, QPageSize, QPageLayout, QPixmap, QBrush, QRegion)
+from PySide2.QtWidgets import (QApplication, QMainWindow, QStatusBar, QPushButton, QProgressDialog,
                                QToolBar, QDockWidget, QSpinBox, QHBoxLayout,
                                QVBoxLayout, QWidget, QLabel, QScrollArea, QMessageBox,
-                               QInputDialog, QFileDialog, QDialog, QAction, QListWidget,
+                               QInputDialog, QFileDialog, QDialog, QAction, QListWidget, QListWidgetItem,
                                QTreeWidget, QSplitter, QAbstractItemView, QTreeWidgetItem,
                                QColorDialog, QFontDialog, QLineEdit, QFrame, QCheckBox,
                                QDialogButtonBox, QComboBox, QDoubleSpinBox, QHeaderView,
@@ -40,6 +40,18 @@ from PySide2.QtPrintSupport import (QPrintDialog, QPrinter, QPrintPreviewDialog)
 
 # Program imports of our modules.
 from PaintBrush import PaintBrush
+from RenderList import RenderList
+from BatchRender import BatchRender
+from AlgorithmGrid import AlgorithmGrid
+from TiledExport import TiledExport
+from VectorExport import VectorExport
+import SceneFile
+import SoundAnalysis
+from ListRenderer import ListRenderer, screenBounds
+from RenderWorker import RenderWorker
+from RepaintScheduler import RepaintScheduler
+from ThumbnailWorker import ThumbnailWorker
+from JobManager import JobManager
 
 # For the Mac OS
 os.environ['QT_MAC_WANTS_LAYER'] = '1'
@@ -71,22 +83,47 @@ class ObjectListViewer(QWidget):
     also has features for zooming and translation.
     """
 
-    def __init__(self, parent=None, ma=None):
+    def __init__(self, parent=None, ma=None, worker=None):
         super(ObjectListViewer, self).__init__(parent)
         self.Parent = parent
         self.mainapp = ma
+        self.worker = worker
 
         self.screen = [-1, 1, -1, 1]
         self.lastRenderListSize = 0
+        self.lastGeneration = None
         self.renderAll = True
+        self.renderStart = 0
+        self.renderEnd = 0
         self.zoomfactor = 1
         self.center = [0, 0]
 
         self.mousePosition = [0, 0]
         self.mouseDown = False
         self.setMouseTracking(True)
+        # Keep the previous image between paints so new primitives can be drawn on top.
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         self.backgroundcolor = QColor()
         self.backgroundcolor.setRgbF(1, 1, 1, 1)
+        self.detailerror = 0
+        if self.worker is not None:
+            self.worker.frameReady.connect(self.frameChanged)
+
+    def frameChanged(self, rects):
+        """
+        Schedules a repaint of the parts of the control the render worker changed, or of
+        all of it if rects is None.
+        """
+        if rects is None:
+            self.update()
+        elif len(rects) > 0:
+            self.update(self.dirtyRegion(rects))
+
+    def dirtyRegion(self, rects):
+        region = QRegion()
+        for rect in rects:
+            region = region.united(rect)
+        return region
 
     def SetBackCol(self):
         self.backgroundcolor = QColorDialog.getColor()
@@ -165,164 +202,58 @@ class ObjectListViewer(QWidget):
                 self.center[1] += (self.mousePosition.y() - lastmouseposition.y()) * yr / self.height()
                 self.repaint()
 
-    def XYtoQPoint(self, x, y):
-        """
-        Covert real coordinates to screen coordinates.
-        """
-        xr = self.screen[1] - self.screen[0]
-        yr = self.screen[3] - self.screen[2]
-        # ptx = x / xr * self.width() + self.width() / 2
-        # pty = -y / yr * self.height() + self.height() / 2
-        ptx = (x + self.center[0]) / xr * self.width() + self.width() / 2
-        pty = (self.center[1] - y) / yr * self.height() + self.height() / 2
-        return QPoint(ptx, pty)
-
     def updateScreenBounds(self):
         """
         Update the screen bounds based on the center and zoom factor being used.
         """
-        fullscreen = [-1, 1, -1, 1]
-        ww = self.width()
-        wh = self.height()
-        if ww >= wh:
-            fullscreen = [-ww / wh, ww / wh, -1, 1]
-        else:
-            fullscreen = [-1, 1, -wh / ww, wh / ww]
-        for i in range(4):
-            fullscreen[i] = fullscreen[i] * (1 / self.zoomfactor)
-        self.screen[0] = self.center[0] - fullscreen[1]
-        self.screen[1] = self.center[0] + fullscreen[1]
-        self.screen[2] = self.center[1] - fullscreen[3]
-        self.screen[3] = self.center[1] + fullscreen[3]
-
-    def RenderPoint(self, qp, obj):
-        """
-        Draw a point to the screen.
-        """
-        qp.setPen(obj[3])
-        qp.drawPoint(self.XYtoQPoint(obj[1], obj[2]))
+        self.screen = screenBounds(self.width(), self.height(), self.center, self.zoomfactor)
 
-    def RenderLine(self, qp, obj):
+    def makeRenderer(self, width=None, height=None):
         """
-        Draw a line to the screen.
+        Returns a renderer for the current view, by default at the size of the control.
         """
-        qp.setPen(obj[5])
-        pt1 = self.XYtoQPoint(obj[1], obj[2])
-        pt2 = self.XYtoQPoint(obj[3], obj[4])
-        line = QLine(pt1, pt2)
-        qp.drawLine(line)
+        if width is None:
+            width = self.width()
+            height = self.height()
+        return ListRenderer(width, height, self.center, self.zoomfactor, self.backgroundcolor, self.detailerror)
 
-    def RenderCircle(self, qp, obj):
+    def paintRange(self, start, end):
         """
-        Draw a circle to the screen.
+        Paints the render list entries from start up to end on top of the current image.
+        With a render worker the entries are queued for it, otherwise they are painted
+        immediately.  A full repaint is done if the render list was cleared or compacted.
+        Returns the index painting stopped at.
         """
-        qp.setPen(obj[5])
-        ulpt = self.XYtoQPoint(obj[1] - obj[3], obj[2] + obj[3])
-        lrpt = self.XYtoQPoint(obj[1] + obj[3], obj[2] - obj[3])
-        # rect = QRect(ulpt.x(), ulpt.y(), lrpt.x() - ulpt.x(), lrpt.y() - ulpt.y())
-        rect = QRect(ulpt, lrpt)
-        if obj[4]:
-            qp.setBrush(obj[5])
-            qp.drawEllipse(rect)
-            qp.setBrush(QColor(0, 0, 0, 0))
-        else:
-            qp.drawEllipse(rect)
-
-    def RendeRectangle(self, qp, obj):
-        """
-        Draw a rectangle to the screen.
-        """
-        qp.setPen(obj[6])
-        ulpt = self.XYtoQPoint(obj[1], obj[2])
-        lrpt = self.XYtoQPoint(obj[3], obj[4])
-        # rect = QRect(ulpt.x(), ulpt.y(), lrpt.x() - ulpt.x(), lrpt.y() - ulpt.y())
-        rect = QRect(ulpt, lrpt)
-        if obj[5]:
-            qp.fillRect(rect, obj[6])
-        else:
-            qp.drawRect(rect)
-
-    def RenderTriangle(self, qp, obj):
-        if obj[7]:
-            self.RiemannFill(qp, obj)
-            # self.FanFill(qp, obj)
-        else:
-            obj1 = [1, obj[1], obj[2], obj[3], obj[4], obj[8]]
-            obj2 = [1, obj[3], obj[4], obj[5], obj[6], obj[8]]
-            obj3 = [1, obj[5], obj[6], obj[1], obj[2], obj[8]]
-            self.RenderLine(qp, obj1)
-            self.RenderLine(qp, obj2)
-            self.RenderLine(qp, obj3)
-
-    def RiemannFill(self, qp, obj):
-        Resolution = 250
-        Range = abs(obj[1] - obj[5])
-        MidPoint = obj[3]
-        MidPointY = obj[4]
-        if (obj[1] > obj[5]):
-            BegPoint = obj[5]
-            BegPointY = obj[6]
-            EndPoint = obj[1]
-            EndPointY = obj[2]
-        else:
-            BegPoint = obj[1]
-            BegPointY = obj[2]
-            EndPoint = obj[5]
-            EndPointY = obj[6]
-        for i in range(2):
-            if (abs(obj[(i * 2) + 1] - obj[((i + 1) * 2) + 1]) > Range):
-                Range = abs(obj[(i * 2) + 1] - obj[((i + 1) * 2) + 1])
-                if (i * 2 + 1) == 1:
-                    MidPoint = obj[5]
-                    MidPointY = obj[6]
-                    if (obj[1] > obj[3]):
-                        BegPoint = obj[3]
-                        BegPointY = obj[4]
-                        EndPoint = obj[1]
-                        EndPointY = obj[2]
-                    else:
-                        BegPoint = obj[1]
-                        BegPointY = obj[2]
-                        EndPoint = obj[3]
-                        EndPointY = obj[4]
-                elif (i * 2 + 1) == 3:
-                    MidPoint = obj[1]
-                    MidPointY = obj[2]
-                    if (obj[3] > obj[5]):
-                        BegPoint = obj[5]
-                        BegPointY = obj[6]
-                        EndPoint = obj[3]
-                        EndPointY = obj[4]
-                    else:
-                        BegPoint = obj[3]
-                        BegPointY = obj[4]
-                        EndPoint = obj[5]
-                        EndPointY = obj[6]
-        width = Range / Resolution
-        for i in range(Resolution):
-            StartingX = BegPoint + (i * width)
-            EndingX = BegPoint + ((i + 1) * width)
-            if EndPoint == MidPoint:
-                EndingY = ((((MidPointY - BegPointY) / (MidPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
-                StartingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (StartingX - BegPoint)) + BegPointY)
-            elif BegPoint == MidPoint:
-                EndingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
-                StartingY = ((((EndPointY - MidPointY) / (EndPoint - MidPoint)) * (StartingX - MidPoint)) + MidPointY)
-            else:
-                EndingY = ((((EndPointY - BegPointY) / (EndPoint - BegPoint)) * (EndingX - BegPoint)) + BegPointY)
-                if (StartingX >= MidPoint):
-                    StartingY = ((((EndPointY - MidPointY) / (EndPoint - MidPoint)) * (
-                            StartingX - MidPoint)) + MidPointY)
-                else:
-                    StartingY = ((((MidPointY - BegPointY) / (MidPoint - BegPoint)) * (
-                            StartingX - BegPoint)) + BegPointY)
-            objFill = [3, StartingX, StartingY, EndingX, EndingY, True, obj[8]]
-            self.RendeRectangle(qp, objFill)
+        rl = self.mainapp.rl
+        length = rl.length()
+        end = min(end, length)
+        if self.worker is not None:
+            self.worker.extend(end)
+            return end
+
+        if self.lastRenderListSize > length or self.lastGeneration != rl.generation:
+            self.repaint()
+            return end
+
+        self.renderStart = max(start, self.lastRenderListSize)
+        self.renderEnd = end
+        if self.renderStart < self.renderEnd:
+            rects = self.makeRenderer().dirtyRects(rl.takeDirtyBounds(end))
+            if len(rects) == 0:
+                # Nothing new is on screen.
+                self.lastRenderListSize = end
+                return end
+            self.renderAll = False
+            self.repaint(self.dirtyRegion(rects))
+            self.renderAll = True
+        return end
 
     def paintEvent(self, event):
         """
-        Paint event override, clears the screen, loops through the render list of
-        objects, and draws a border around the image.
+        Paint event override.  With a render worker the last finished frame is drawn and
+        a redraw is requested if the view or render list no longer match it.  Otherwise
+        the screen is cleared and the render list is drawn directly.  A border is drawn
+        around the image.
         """
         self.updateScreenBounds()
         rl = self.mainapp.rl
@@ -330,54 +261,40 @@ class ObjectListViewer(QWidget):
         qp = QPainter()
         qp.begin(self)
 
-        renderstart = 0
-        if self.renderAll:
-            # Clear Screen
-            qp.fillRect(0, 0, self.width(), self.height(), self.backgroundcolor)
+        # Primitives are flattened at the resolution the painting is viewed at.
+        rl.baseScale = self.makeRenderer().pixelScale()
+
+        if self.worker is not None:
+            renderer = self.makeRenderer()
+            frame, key, frameend = self.worker.currentFrame()
+            if key != renderer.key():
+                if self.worker.requestedKey != renderer.key():
+                    self.worker.reset(renderer)
+            elif rl.length() < frameend:
+                self.worker.extend(rl.length())
+            if frame is None:
+                qp.fillRect(0, 0, self.width(), self.height(), self.backgroundcolor)
+            else:
+                qp.drawImage(0, 0, frame)
+            self.lastRenderListSize = frameend
         else:
-            renderstart = self.lastRendetListSize
-
-        for i in range(renderstart, rl.length()):
-            obj = rl.get(i)
-            if obj[0] == 0:
-                self.RenderPoint(qp, obj)
-            elif obj[0] == 1:
-                self.RenderLine(qp, obj)
-            elif obj[0] == 2:
-                self.RenderCircle(qp, obj)
-            elif obj[0] == 3:
-                self.RendeRectangle(qp, obj)
-            elif obj[0] == 4:
-                self.RenderTriangle(qp, obj)
+            renderer = self.makeRenderer()
+            if self.renderAll:
+                # Clear Screen
+                self.lastGeneration = rl.generation
+                renderer.renderAll(qp, rl)
+                self.lastRenderListSize = rl.length()
+                rl.markClean(self.lastRenderListSize)
+            else:
+                renderer.renderRange(qp, rl, self.renderStart, self.renderEnd)
+                self.lastRenderListSize = self.renderEnd
 
         outline = QColor()
         outline.setRgb(0, 0, 0, 255)
         qp.setPen(outline)
         qp.drawRect(0, 0, self.width() - 1, self.height() - 1)
         qp.end()
-        self.lastRenderListSize = rl.length()
-
-
-class RenderList:
-    """
-    Convenience class for storing a list of items to be rendered.
-    """
-    def __init__(self):
-        self.renderlist = []
-
-    def add(self, item):
-        self.renderlist.append(item)
 
-    def clear(self):
-        self.renderlist = []
-
-    def length(self):
-        return len(self.renderlist)
-
-    def get(self, i):
-        if i < 0 or i >= len(self.renderlist):
-            return None
-        return self.renderlist[i]
 
 class MusicPainter(QMainWindow):
     """
@@ -413,14 +330,26 @@ class MusicPainter(QMainWindow):
         self.freqlist = None
         self.clipboard = QApplication.clipboard()
         self.rl = RenderList()
+        # Long recording sessions flatten the oldest primitives into a raster layer.
+        self.rl.setBudget(1000000, 256 * 2 ** 20)
         self.paintbrush = PaintBrush(self)
+        self.renderWorker = RenderWorker(self.rl)
         self.loadedFilename = ""
         self.loadedFiles = []
         self.titleoverridetext = ""
-        self.music_thread = None
-        self.playsoundstop = False
+        # Rendering, playing and recording run as exclusive jobs, one at a time.
+        self.jobs = JobManager()
+        self.musicJob = None
+        # Seed of the random numbers the painting was drawn with, None if it is not known or
+        # the painting holds more than one render.
+        self.renderSeed = None
+        self.batch = None
+        self.grid = None
+        self.thumbnailKey = None
+        self.thumbnailWorker = ThumbnailWorker(busy=self.thumbnailsBusy)
         self.initializeUI()
         # self.createLeftToolBar()
+        self.repaintScheduler = RepaintScheduler(self.canvas)
 
         # Set Animation blink flag and timer
         self.flag = True
@@ -457,6 +386,7 @@ class MusicPainter(QMainWindow):
         if (TestString == ".wav"):
             self.loadedFilename = FileString
             self.updateProgramWindowTitle()
+            self.updateThumbnails()
             NoFilesLoaded = False
         elif (TestString == ".mp3"):
             mp3FileDetected = True
@@ -504,10 +434,11 @@ class MusicPainter(QMainWindow):
             self.updateProgramWindowTitle()
         else:
             self.loadedFilename = ""
+        self.updateThumbnails()
 
     # Initialize the window, calls create methods to set up the GUI.
     def initializeUI(self):
-        self.canvas = ObjectListViewer(self, self)
+        self.canvas = ObjectListViewer(self, self, self.renderWorker)
         self.setMinimumSize(950, 700)
         self.updateProgramWindowTitle()
         icon = QIcon(self.resource_path("icons/Logo-blackv2.png"))
@@ -542,29 +473,31 @@ class MusicPainter(QMainWindow):
         for i in range(len(self.loadedFiles)):
             self.ChosenFile.addItem(self.loadedFiles[i])
 
-        self.algorithmNum.addItem(str('Frequency Dots'))
-        self.algorithmNum.addItem(str('Dynamite'))
-        self.algorithmNum.addItem(str('Ball of Yarn'))
-        self.algorithmNum.addItem(str('3-D Symmetry'))
-        self.algorithmNum.addItem(str('Spirograph'))
-        self.algorithmNum.addItem(str('Colorful Void'))
-        self.algorithmNum.addItem(str('Vortex'))
-        self.algorithmNum.addItem(str('Illuminate Snake'))
-        self.algorithmNum.addItem(str('Triangle Stacker'))
-        self.algorithmNum.addItem(str('Spiraling Circles'))
-        self.algorithmNum.addItem(str('Circulating Squares'))
-        self.algorithmNum.addItem(str('Sporadic Squares'))
+        for name in self.paintbrush.algorithmNames:
+            self.algorithmNum.addItem(name)
 
         self.algorithmNum.currentIndexChanged.connect(self.resetRLData)
 
         self.ChosenFile.currentIndexChanged.connect(self.SetFile)
 
-        self.ChunkSizesList = [1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072]
+        self.queueLabel = QLabel("Render Queue: 0")
+        self.renderWorker.queueDepthChanged.connect(self.updateQueueLabel)
+
+        self.jobLabel = QLabel("")
+        self.jobs.jobProgress.connect(self.showJobProgress)
+        self.jobs.jobFinished.connect(self.showJobFinished)
+
+        self.AllChunkSizes = [1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072]
+        self.ChunkSizesList = list(self.AllChunkSizes)
         self.chunkSize = QComboBox()
         # self.chunkSize.setFixedSize(130, 28)
         for val in self.ChunkSizesList:
             self.chunkSize.addItem(str(val))
         self.chunkSize.setCurrentIndex(4)
+        self.chunkSize.currentIndexChanged.connect(self.updateThumbnails)
+
+        self.algorithmNum.setIconSize(QSize(self.thumbnailWorker.width, self.thumbnailWorker.height))
+        self.thumbnailWorker.thumbnailReady.connect(self.setThumbnail)
 
         self.createMenu()
         self.createToolBar()
@@ -577,55 +510,50 @@ class MusicPainter(QMainWindow):
         self.setCentralWidget(self.canvas)
         self.show()
 
-    def resetRLData(self):
-        if (self.algorithmNum.currentIndex() == 5):
-            self.paintbrush.SetAlg6()
-        elif (
-                self.algorithmNum.currentIndex() == 1 or self.algorithmNum.currentIndex() == 2 or self.algorithmNum.currentIndex() == 3 or self.algorithmNum.currentIndex() == 4):
-            self.paintbrush.SetAlg2345()
-        elif (self.algorithmNum.currentIndex() == 6):
-            self.paintbrush.SetAlg7()
-        elif (self.algorithmNum.currentIndex() == 7):
-            self.paintbrush.SetAlg8()
-        elif (self.algorithmNum.currentIndex() == 8):
-            self.paintbrush.SetAlg9()
-        elif (self.algorithmNum.currentIndex() == 9):
-            self.paintbrush.SetAlg10()
-
-        current = self.chunkSize.currentIndex()
-
-        if ((self.algorithmNum.currentIndex() == 5) or (self.algorithmNum.currentIndex() == 8)):
-            if self.ChunkSizesList[0] == 1024:
-                ListChanged = True
-            else:
-                ListChanged = False
-            self.ChunkSizesList = [16384, 32768, 65536, 131072]
-            self.chunkSize.clear()
-            for val in self.ChunkSizesList:
-                self.chunkSize.addItem(str(val))
-            if ListChanged:
-                if current >= 5 and current <= 7:
-                    self.chunkSize.setCurrentIndex(current - 4)
-                else:
-                    self.chunkSize.setCurrentIndex(0)
-            else:
-                self.chunkSize.setCurrentIndex(current)
+    # Reports the number of requests waiting for the render worker.
+    def updateQueueLabel(self, depth):
+        self.queueLabel.setText("Render Queue: " + str(depth))
+
+    # Asks the thumbnail worker for previews of the algorithms for the loaded file and chunk
+    # size.  The icons of the algorithm picker are cleared until the new ones arrive.
+    def updateThumbnails(self):
+        key = None
+        if self.loadedFilename != "" and self.chunkSize.currentIndex() >= 0:
+            key = (self.loadedFilename, self.ChunkSizesList[self.chunkSize.currentIndex()])
+        if key == self.thumbnailKey:
+            return
+        self.thumbnailKey = key
+        for i in range(self.algorithmNum.count()):
+            self.algorithmNum.setItemIcon(i, QIcon())
+        if key is None:
+            self.thumbnailWorker.cancel()
         else:
-            if self.ChunkSizesList[0] == 16384:
-                ListChanged = True
-            else:
-                ListChanged = False
-            self.ChunkSizesList = [1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072]
-            self.chunkSize.clear()
-            for val in self.ChunkSizesList:
-                self.chunkSize.addItem(str(val))
-            if ListChanged:
-                if current >= 1 and current <= 3:
-                    self.chunkSize.setCurrentIndex(current + 4)
-                else:
-                    self.chunkSize.setCurrentIndex(4)
-            else:
-                self.chunkSize.setCurrentIndex(current)
+            self.thumbnailWorker.request(*key)
+
+    def setThumbnail(self, key, algorithm, image):
+        if key == self.thumbnailKey:
+            self.algorithmNum.setItemIcon(algorithm - 1, QIcon(QPixmap.fromImage(image)))
+
+    # Called on the thumbnail thread, which waits while the image is being drawn or played.
+    def thumbnailsBusy(self):
+        return self.renderWorker.queueDepth() > 0 or self.jobs.busy()
+
+    # Resets the state of the chosen algorithm and offers only the chunk sizes it can be
+    # drawn with.  The chosen chunk size is kept if possible and 16384 is used otherwise.
+    def resetRLData(self):
+        algorithm = self.algorithmNum.currentIndex() + 1
+        self.paintbrush.resetAlgorithm(algorithm)
+
+        current = self.ChunkSizesList[self.chunkSize.currentIndex()] if self.chunkSize.currentIndex() >= 0 else 16384
+        minimum = self.paintbrush.minimumChunkSize(algorithm)
+        sizes = [val for val in self.AllChunkSizes if val >= minimum]
+        if sizes == self.ChunkSizesList:
+            return
+        self.ChunkSizesList = sizes
+        self.chunkSize.clear()
+        for val in self.ChunkSizesList:
+            self.chunkSize.addItem(str(val))
+        self.chunkSize.setCurrentIndex(sizes.index(current) if current in sizes else sizes.index(16384))
 
     # Setup all menu and toolbar actions as well as create the menu.
     def createMenu(self):
@@ -663,11 +591,35 @@ class MusicPainter(QMainWindow):
         self.saveImage_act.triggered.connect(self.saveAsImage)
         self.saveImage_act.setStatusTip("Save the image.")
 
+        self.exportImage_act = QAction("&Export High Resolution Image...", self)
+        self.exportImage_act.triggered.connect(self.exportHighResolution)
+        self.exportImage_act.setStatusTip("Save the image at a chosen resolution for printing.")
+
+        self.exportVector_act = QAction("Export &Vector Image...", self)
+        self.exportVector_act.triggered.connect(self.exportVectorImage)
+        self.exportVector_act.setStatusTip("Save the image as an SVG or PDF file.")
+
+        self.openScene_act = QAction("Open S&cene...", self)
+        self.openScene_act.triggered.connect(self.openScene)
+        self.openScene_act.setStatusTip("Open a saved painting without rendering it again.")
+
+        self.saveScene_act = QAction("Save Sc&ene As...", self)
+        self.saveScene_act.triggered.connect(self.saveScene)
+        self.saveScene_act.setStatusTip("Save the painting so it can be opened and edited later.")
+
         self.render_act = QAction(QIcon(self.resource_path('icons/48x48/Brush-Purple.png')), "&Render", self)
         # self.render_act = QAction(QIcon(self.resource_path('Brush-Purple.png')), "&Render", self)
         self.render_act.triggered.connect(self.renderImage)
         self.render_act.setStatusTip("Render the image.")
 
+        self.renderAll_act = QAction("Render &All Files...", self)
+        self.renderAll_act.triggered.connect(self.renderAllFiles)
+        self.renderAll_act.setStatusTip("Render every loaded file to an image in a chosen folder.")
+
+        self.compare_act = QAction("Co&mpare Algorithms...", self)
+        self.compare_act.triggered.connect(self.compareAlgorithms)
+        self.compare_act.setStatusTip("Render the file with every algorithm and pick one from the thumbnails.")
+
         self.clear_act = QAction("&Clear Image", self)
         self.clear_act.triggered.connect(self.clearImage)
         self.clear_act.setStatusTip("Clear the image.")
@@ -697,6 +649,18 @@ class MusicPainter(QMainWindow):
         self.resetCenterZoom_act.triggered.connect(self.canvas.resetCenterAndZoom)
         self.resetCenterZoom_act.setStatusTip("Reset the center to the origin and zoom factor to 1.")
 
+        self.repaintRate_act = QAction("Repaint &Rate...", self)
+        self.repaintRate_act.triggered.connect(self.setRepaintRate)
+        self.repaintRate_act.setStatusTip("Set the maximum number of times a second the image is redrawn while rendering.")
+
+        self.budget_act = QAction("Vector &Budget...", self)
+        self.budget_act.triggered.connect(self.setVectorBudget)
+        self.budget_act.setStatusTip("Set how many primitives are kept before the oldest are flattened into an image.")
+
+        self.detail_act = QAction("&Detail Tolerance...", self)
+        self.detail_act.triggered.connect(self.setDetailTolerance)
+        self.detail_act.setStatusTip("Set the size below which primitives are merged when drawn.")
+
         self.properties_act = QAction(QIcon(self.resource_path('icons/48x48/InfoCard.png')), "File &Information...",
                                       self)
         # self.properties_act = QAction(QIcon(self.resource_path('InfoCard.png')), "File &Information...",self)
@@ -751,7 +715,11 @@ class MusicPainter(QMainWindow):
         file_menu = menu_bar.addMenu('&File')
         file_menu.addAction(self.file_open_act)
         file_menu.addAction(self.properties_act)
+        file_menu.addAction(self.openScene_act)
+        file_menu.addAction(self.saveScene_act)
         file_menu.addAction(self.render_act)
+        file_menu.addAction(self.renderAll_act)
+        file_menu.addAction(self.compare_act)
         file_menu.addAction(self.play_act)
         file_menu.addAction(self.stop_act)
         file_menu.addSeparator()
@@ -765,6 +733,8 @@ class MusicPainter(QMainWindow):
         image_menu = menu_bar.addMenu('&Image')
         image_menu.addAction(self.copyImage_act)
         image_menu.addAction(self.saveImage_act)
+        image_menu.addAction(self.exportImage_act)
+        image_menu.addAction(self.exportVector_act)
         image_menu.addSeparator()
         image_menu.addAction(self.printImage_act)
         image_menu.addAction(self.printPreviewImage_act)
@@ -772,6 +742,9 @@ class MusicPainter(QMainWindow):
         image_menu.addAction(self.resetCenter_act)
         image_menu.addAction(self.resetZoom_act)
         image_menu.addAction(self.resetCenterZoom_act)
+        image_menu.addAction(self.detail_act)
+        image_menu.addAction(self.repaintRate_act)
+        image_menu.addAction(self.budget_act)
         image_menu.addSeparator()
         # image_menu.addAction(self.clear_act)
 
@@ -817,6 +790,8 @@ class MusicPainter(QMainWindow):
         layout.addWidget(QLabel("File Choice:"), 0, Qt.AlignRight)
         layout.addWidget(self.ChosenFile, 0, Qt.AlignLeft)
         layout.addWidget(self.ColorButton, 0, Qt.AlignLeft)
+        layout.addWidget(self.queueLabel, 0, Qt.AlignLeft)
+        layout.addWidget(self.jobLabel, 0, Qt.AlignLeft)
         layout.addStretch()
 
         layoutWidget.setLayout(layout)
@@ -874,128 +849,69 @@ class MusicPainter(QMainWindow):
 
     # Uses NumPy fft to compute frequency spectrum.
     def getSpectrum(self, data, samplingfreq):
-        spectrum = np.abs(np.fft.rfft(data))
-        freq = np.fft.rfftfreq(data.size, d=1.0 / samplingfreq)
-        return spectrum, freq
+        return SoundAnalysis.getSpectrum(data, samplingfreq)
 
     # Returns the dominate frequency from a spectrum and frequency list.
     def getMaxFreq(self, spec, freq):
-        if len(spec) == 0 or len(freq) == 0:
-            return 0
-
-        maxfreq = freq[0]
-        maxspec = spec[0]
-        for j in range(len(spec)):
-            if spec[j] > maxspec:
-                maxspec = spec[j]
-                maxfreq = freq[j]
-
-        return maxfreq
+        return SoundAnalysis.getMaxFreq(spec, freq)
 
-    # Executed in a separate thread.  Reads in the wav file, precomputes the frequencies
+    # Executed as an exclusive job.  Reads in the wav file, precomputes the frequencies
     # for the entire file, depending on the mode will either render the data all at once
-    # with the current algorithm and chunk size or it will render while the file is being
-    # played.
-    def dotheplay(self, playmusic):
-        chunk = self.ChunkSizesList[self.chunkSize.currentIndex()]
-        self.paintbrush.currentAlgorithm = self.algorithmNum.currentIndex() + 1
-
-        samplingfreq, sound = wavfile.read(self.loadedFilename)
+    # with the given algorithm and chunk size or it will render while the file is being
+    # played.  Stops early when the job is cancelled.
+    def dotheplay(self, job, playmusic, filename, chunk, algorithm):
+        self.paintbrush.currentAlgorithm = algorithm
+        self.startRender(algorithm)
 
-        if (len(sound.shape) > 1):
-            channels = sound.shape[1]
-            samples = sound.shape[0]
-        else:
-            channels = 1
-            samples = sound.shape[0]
-
-        channelData = []
-
-        if (len(sound.shape) > 1):
-            for i in range(channels):
-                channelData.append(sound[:, i])
-        else:
-            channelData.append(sound)
-
-        channelChunks = []
-        for i in range(channels):
-            soundslices = []
-            start = 0
-            while start + chunk <= samples:
-                soundslices.append(channelData[i][start:start + chunk])
-                start += chunk
-            channelChunks.append(soundslices)
-
-        af = wave.open(self.loadedFilename, 'rb')
+        af = wave.open(filename, 'rb')
         pa = pyaudio.PyAudio()
-        # wavframerate = af.getframerate()
-        stream = pa.open(format=pa.get_format_from_width(af.getsampwidth()),
-                         channels=af.getnchannels(),
-                         rate=af.getframerate(),
-                         output=True)
-
-        self.freqlist = []
-        self.SpectList = []
-        freqcap = 8500
-
-        # precompute the frequency data.
-
-        for i in range(len(channelChunks[0])):
-            channelFreqs = []
-            CorSpect = 0
-            for k in range(channels):
-                spect, freq = self.getSpectrum(channelChunks[k][i], samplingfreq)
-                maxfreq = self.getMaxFreq(spect, freq)
-                channelFreqs.append(maxfreq)
-
-            maxfreqch = max(channelFreqs)
-
-            for i in range(len(channelFreqs)):
-                if channelFreqs[i] == maxfreqch:
-                    CorSpect = spect[i]
-
-            if maxfreqch > freqcap:
-                channelFreqs = [0, 0]
-            self.freqlist.append(channelFreqs)
-            self.SpectList.append(CorSpect)
-            # self.setStatusText("Processing segment "+ str(i+1) + " of " + str(len(channelChunks[0])))
-
-        rd_data = []
-        if playmusic:
-            af.rewind()
-            rd_data = af.readframes(chunk)
-
-        self.paintbrush.resetlistlinks()
-
-        i = 0
-        while i < len(self.freqlist) and (not self.playsoundstop):
-            if i < len(self.freqlist):
-                self.paintbrush.draw(self.freqlist[i], i, self.SpectList[i])
-                self.canvas.renderAll = False
-                self.canvas.update()
-                self.canvas.renderAll = True
-
+        stream = None
+        try:
+            # wavframerate = af.getframerate()
+            stream = pa.open(format=pa.get_format_from_width(af.getsampwidth()),
+                             channels=af.getnchannels(),
+                             rate=af.getframerate(),
+                             output=True)
+
+            # precompute the frequency data.
+            with job.stage("analysis"):
+                self.freqlist, self.SpectList, samplingfreq = SoundAnalysis.analyzeWav(filename, chunk)
+            job.check()
+
+            rd_data = []
             if playmusic:
-                stream.write(rd_data)
+                af.rewind()
                 rd_data = af.readframes(chunk)
-            #     self.setStatusText("")
-            # else:
-            #     self.setStatusText("")
-            # eltime = "%.3f" %  (i * chunk / wavframerate)
-            # self.setStatusText(eltime + " sec.")
-
-            i += 1
-
-        stream.stop_stream()
-        stream.close()
-        af.close()
-        pa.terminate()
-        # self.setStatusText("")
-        # Remove Thread
-        self.music_thread = None
-        self.canvas.update()
 
-        # self.play_act.setEnabled(True)
+            self.paintbrush.resetlistlinks()
+
+            with job.stage("play" if playmusic else "render", len(self.freqlist)):
+                i = 0
+                if not playmusic and self.paintbrush.hasTrack(algorithm):
+                    # Render only: the whole track is drawn at once.
+                    start = self.rl.length()
+                    self.rl.extend(self.paintbrush.drawTrack(self.freqlist, self.SpectList))
+                    self.repaintScheduler.request(start, self.rl.length())
+                    i = len(self.freqlist)
+
+                while i < len(self.freqlist) and not job.cancelled():
+                    start = self.rl.length()
+                    self.paintbrush.draw(self.freqlist[i], i, self.SpectList[i])
+                    self.repaintScheduler.request(start, self.rl.length())
+
+                    if playmusic:
+                        stream.write(rd_data)
+                        rd_data = af.readframes(chunk)
+
+                    i += 1
+                    job.setProgress(i)
+        finally:
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            af.close()
+            pa.terminate()
+            self.repaintScheduler.requestAll()
 
     # Checks id the file is readable with both scipy and pyaudio
     def checkFile(self):
@@ -1016,51 +932,231 @@ class MusicPainter(QMainWindow):
 
         return True
 
-    # Sets the rendering thread to render the entire wav file immediately.
+    # Cancels the running jobs when the window closes so the program can exit once they
+    # have cleaned up.
+    def closeEvent(self, event):
+        self.jobs.shutdown(wait=False)
+        super().closeEvent(event)
+
+    # Starts the algorithm and its random stream over for a render on an empty painting and
+    # keeps the seed, which can reproduce it.  On top of an existing painting the algorithm
+    # carries on from where it was, so lines continue and meshes keep growing, and no seed
+    # is kept.
+    def startRender(self, algorithm):
+        if self.rl.length() == 0 and self.rl.base is None:
+            self.paintbrush.resetAlgorithm(algorithm)
+            self.renderSeed = self.paintbrush.random.seed
+        else:
+            self.renderSeed = None
+
+    # Starts an exclusive job for rendering, playing or recording unless one is already
+    # running.  A stopped job may still be finishing, the new one then waits for it.
+    def startMusicJob(self, name, function, *args):
+        if self.musicJob is not None and not self.musicJob.finished() and not self.musicJob.cancelled():
+            return False
+        self.musicJob = self.jobs.submit(name, function, *args, exclusive=True)
+        return True
+
+    # Stops the rendering, playing or recording job and waits for it to clean up, so the
+    # render list and frequency data can be changed from the GUI thread.
+    def stopMusicJob(self):
+        if self.musicJob is not None:
+            self.musicJob.cancel()
+            self.musicJob.wait()
+        self.titleoverridetext = ""
+        self.updateProgramWindowTitle()
+        self.StopAnimateRecordButton()
+
+    # Shows the stage and progress of a running job.
+    def showJobProgress(self, job):
+        text = job.name + ": " + job.currentStage()
+        if job.total > 0:
+            text += " %d%%" % (100 * job.done // job.total)
+        self.jobLabel.setText(text)
+
+    # Shows how long a finished job took in each stage.
+    def showJobFinished(self, job):
+        self.jobLabel.setText(job.report())
+
+    # Starts a job to render the entire wav file immediately.
     def renderImage(self):
         if not self.checkFile():
             return
 
-        if not self.music_thread:
-            self.music_thread = Thread(target=self.dotheplay, args=(False,), daemon=True)
-            # self.clearImage()
+        self.startMusicJob("Render", self.dotheplay, False, self.loadedFilename,
+                           self.ChunkSizesList[self.chunkSize.currentIndex()], self.algorithmNum.currentIndex() + 1)
 
-        if self.music_thread.is_alive():
+    # Renders every loaded file with the current algorithm, chunk size, image size and
+    # background color in parallel worker processes and saves the images to a folder.
+    def renderAllFiles(self):
+        files = self.loadedFiles
+        if len(files) == 0 and self.loadedFilename != "":
+            files = [self.loadedFilename]
+        if len(files) == 0:
+            QMessageBox.warning(self, "No Files Loaded",
+                                "Open a Directory that contains .wav files or a Wav File to render.",
+                                QMessageBox.Ok)
+            return
+        if self.batch is not None:
             return
 
-        self.playsoundstop = False
-        self.music_thread.start()
+        outputdir = QFileDialog.getExistingDirectory(self, "Select Output Folder", QDir.currentPath())
+        if outputdir == '':
+            return
 
-    # Sets the rendering and playing thread to play while rendering.
-    def PlaySoundData(self):
-        if not self.checkFile():
+        chunk = self.ChunkSizesList[self.chunkSize.currentIndex()]
+        algorithm = self.algorithmNum.currentIndex() + 1
+        self.batch = BatchRender(files, algorithm, chunk, self.canvas.width(), self.canvas.height(),
+                                 self.canvas.backgroundcolor.name(QColor.HexArgb), outputdir,
+                                 self.canvas.detailerror)
+        self.batch.start()
+
+        self.batchProgress = QProgressDialog("Rendering files...", "Cancel", 0, len(files), self)
+        self.batchProgress.setWindowTitle("Render All Files")
+        self.batchProgress.setWindowModality(Qt.WindowModal)
+        self.batchProgress.setMinimumDuration(0)
+        self.batchProgress.canceled.connect(self.batch.cancel)
+
+        self.batchTimer = QTimer(self, interval=100)
+        self.batchTimer.timeout.connect(self.updateBatchProgress)
+        self.batchTimer.start()
+
+    # Polls the batch render for progress and reports the results when it is done.
+    def updateBatchProgress(self):
+        done, total = self.batch.progress()
+        self.batchProgress.setValue(done)
+        self.batchProgress.setLabelText("Rendered " + str(done) + " of " + str(total) + " files.")
+        if done < total:
+            return
+
+        # Closing a progress dialog emits canceled, so it is disconnected and the dialog
+        # hidden instead.
+        self.batchTimer.stop()
+        self.batchProgress.canceled.disconnect(self.batch.cancel)
+        self.batchProgress.hide()
+        batch = self.batch
+        self.batch = None
+        batch.shutdown()
+
+        results = batch.results()
+        failed = [r for r in results if r[2] is not None]
+        report = "Rendered " + str(len(results) - len(failed)) + " of " + str(total) + " files in "
+        report += "%.1f" % batch.elapsed() + " sec. using " + str(batch.workers) + " processes."
+        if batch.cancelled:
+            report += "\nThe batch was cancelled."
+        for filename, target, error in failed:
+            report += "\n" + filename + ": " + error
+        QMessageBox.information(self, "Render All Files", report, QMessageBox.Ok)
+
+    # Renders the loaded file with every algorithm at the current chunk size from a single
+    # analysis, in parallel worker processes, and shows the thumbnails to pick one from.
+    # The analysis runs as a job so it does not hold up the GUI.
+    def compareAlgorithms(self):
+        if not self.checkFile() or self.grid is not None:
             return
 
-        if not self.music_thread:
-            self.music_thread = Thread(target=self.dotheplay, args=(True,), daemon=True)
-            # self.clearImage()
+        chunk = self.ChunkSizesList[self.chunkSize.currentIndex()]
+        width = 240
+        height = max(1, round(width * self.canvas.height() / max(1, self.canvas.width())))
+        grid = self.grid = AlgorithmGrid(self.loadedFilename, chunk, width, height,
+                                         self.canvas.backgroundcolor.name(QColor.HexArgb), self.canvas.detailerror)
+        self.gridJob = self.jobs.submit("Compare", lambda job: grid.start())
+
+        self.gridProgress = QProgressDialog("Rendering algorithms...", "Cancel", 0, len(self.grid.algorithms), self)
+        self.gridProgress.setWindowTitle("Compare Algorithms")
+        self.gridProgress.setWindowModality(Qt.WindowModal)
+        self.gridProgress.setMinimumDuration(0)
+        self.gridProgress.canceled.connect(self.grid.cancel)
+
+        self.gridTimer = QTimer(self, interval=100)
+        self.gridTimer.timeout.connect(self.updateGridProgress)
+        self.gridTimer.start()
+
+    # Polls the algorithm grid for progress and shows the thumbnails when it is done.  The
+    # algorithm of the chosen thumbnail becomes the current one.
+    def updateGridProgress(self):
+        job = self.gridJob
+        if not job.finished():
+            if not self.grid.cancelled:
+                self.gridProgress.setLabelText("Analyzing " + os.path.basename(self.grid.filename) + "...")
+            return
+        done, total = self.grid.progress()
+        self.gridProgress.setValue(done)
+        self.gridProgress.setLabelText("Rendered " + str(done) + " of " + str(total) + " algorithms.")
+        if done < total:
+            return
 
-        if self.music_thread.is_alive():
+        # Closing a progress dialog emits canceled, so it is disconnected and the dialog
+        # hidden instead.
+        self.gridTimer.stop()
+        self.gridProgress.canceled.disconnect(self.grid.cancel)
+        self.gridProgress.hide()
+        grid = self.grid
+        self.grid = None
+        grid.shutdown()
+        if job.state == 'failed':
+            QMessageBox.warning(self, "Compare Algorithms", "The file could not be analyzed.\n" + job.error,
+                                QMessageBox.Ok)
+        if grid.cancelled or job.state != 'done':
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Compare Algorithms")
+        thumbnails = QListWidget()
+        thumbnails.setViewMode(QListWidget.IconMode)
+        thumbnails.setIconSize(QSize(grid.width, grid.height))
+        thumbnails.setResizeMode(QListWidget.Adjust)
+        thumbnails.setMovement(QListWidget.Static)
+        for algorithm, image, error in grid.cells(grid.results()):
+            item = QListWidgetItem(str(algorithm) + ". " + self.paintbrush.algorithmNames[algorithm - 1])
+            if image is not None:
+                item.setIcon(QIcon(QPixmap.fromImage(image)))
+            else:
+                item.setToolTip(error)
+                item.setFlags(Qt.NoItemFlags)
+            item.setData(Qt.UserRole, algorithm)
+            thumbnails.addItem(item)
+        thumbnails.itemDoubleClicked.connect(dialog.accept)
+
+        buttons = QDialogButtonBox()
+        buttons.addButton(QDialogButtonBox.Ok)
+        buttons.addButton(QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Rendered in %.1f sec. Choose an algorithm:" % grid.elapsed()))
+        layout.addWidget(thumbnails)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+        dialog.resize(4 * grid.width + 80, 3 * grid.height + 160)
+
+        if dialog.exec() == QDialog.Accepted and thumbnails.currentItem() is not None:
+            self.algorithmNum.setCurrentIndex(thumbnails.currentItem().data(Qt.UserRole) - 1)
+
+    # Starts a job to play the wav file while rendering.
+    def PlaySoundData(self):
+        if not self.checkFile():
             return
 
-        self.playsoundstop = False
-        self.music_thread.start()
+        self.startMusicJob("Play", self.dotheplay, True, self.loadedFilename,
+                           self.ChunkSizesList[self.chunkSize.currentIndex()], self.algorithmNum.currentIndex() + 1)
 
-    # Stops the playing and rendering of the wav file.
+    # Stops the playing and rendering of the wav file.  The job finishes the chunk it is
+    # on and cleans up before another one can start.
     def StopSoundData(self):
-        self.playsoundstop = True
-        self.music_thread = None
+        if self.musicJob is not None:
+            self.musicJob.cancel()
         self.titleoverridetext = ""
         self.updateProgramWindowTitle()
         self.StopAnimateRecordButton()
 
-    # Executed in a separate thread.  This will use the current chunk size and algorithm
-    # to stream data from the microphone through the numpy fft to the rendering algorithms.
-    # At the end it will join the frames into a single data file that can be saved to a
-    # wav file.
-    def dotherecord(self):
-        chunk = self.ChunkSizesList[self.chunkSize.currentIndex()]
-        self.paintbrush.currentAlgorithm = self.algorithmNum.currentIndex() + 1
+    # Executed as an exclusive job.  This will use the given chunk size and algorithm to
+    # stream data from the microphone through the numpy fft to the rendering algorithms
+    # until the job is cancelled.  At the end it will join the frames into a single data
+    # file that can be saved to a wav file.
+    def dotherecord(self, job, chunk, algorithm):
+        self.paintbrush.currentAlgorithm = algorithm
+        self.startRender(algorithm)
 
         p = pyaudio.PyAudio()
         stream = p.open(format=self.RECORDFORMAT,
@@ -1074,49 +1170,48 @@ class MusicPainter(QMainWindow):
         freqcap = 8500
         self.paintbrush.resetlistlinks()
 
-        while not self.playsoundstop:
-            data = stream.read(chunk)
-            numpydata = np.frombuffer(data, dtype=np.int16)
-            # frame = np.stack((numpydata[::2], numpydata[1::2]), axis=0)
-            # frame = []
-            # for i in range(self.RECORDCHANNELS):
-            #     frame.append(numpydata[i::2])
-
-            channelFreqs = []
-            CorSpect = 0
-            for i in range(self.RECORDCHANNELS):
-                # channelData.append(numpydata[:, i])
-                # spect, freq = self.getSpectrum(frame[i], self.RECORDRATE)
-                spect, freq = self.getSpectrum(numpydata[i::self.RECORDCHANNELS], self.RECORDRATE)
-                maxfreq = self.getMaxFreq(spect, freq)
-                channelFreqs.append(maxfreq)
-
-            maxfreqch = max(channelFreqs)
-
-            for i in range(len(channelFreqs)):
-                if channelFreqs[i] == maxfreqch:
-                    CorSpect = spect[i]
-
-            if maxfreqch > freqcap:
-                channelFreqs = [0, 0]
-            self.freqlist.append(channelFreqs)
-
-            if channelFreqs != [0, 0]:
-                pos = len(self.freqlist) - 1
-                self.paintbrush.draw(self.freqlist[pos], pos, CorSpect)
-                self.canvas.renderAll = False
-                self.canvas.update()
-                self.canvas.renderAll = True
-                # print(self.freqlist[pos])
-
-            frames.append(data)
-
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-
-        self.fullrecording = b''.join(frames)
-        self.music_thread = None
+        try:
+            with job.stage("record"):
+                while not job.cancelled():
+                    data = stream.read(chunk)
+                    numpydata = np.frombuffer(data, dtype=np.int16)
+                    # frame = np.stack((numpydata[::2], numpydata[1::2]), axis=0)
+                    # frame = []
+                    # for i in range(self.RECORDCHANNELS):
+                    #     frame.append(numpydata[i::2])
+
+                    channelFreqs = []
+                    CorSpect = 0
+                    for i in range(self.RECORDCHANNELS):
+                        # channelData.append(numpydata[:, i])
+                        # spect, freq = self.getSpectrum(frame[i], self.RECORDRATE)
+                        spect, freq = self.getSpectrum(numpydata[i::self.RECORDCHANNELS], self.RECORDRATE)
+                        maxfreq = self.getMaxFreq(spect, freq)
+                        channelFreqs.append(maxfreq)
+
+                    maxfreqch = max(channelFreqs)
+
+                    for i in range(len(channelFreqs)):
+                        if channelFreqs[i] == maxfreqch:
+                            CorSpect = spect[i]
+
+                    if maxfreqch > freqcap:
+                        channelFreqs = [0, 0]
+                    self.freqlist.append(channelFreqs)
+
+                    if channelFreqs != [0, 0]:
+                        pos = len(self.freqlist) - 1
+                        start = self.rl.length()
+                        self.paintbrush.draw(self.freqlist[pos], pos, CorSpect)
+                        self.repaintScheduler.request(start, self.rl.length())
+                        # print(self.freqlist[pos])
+
+                    frames.append(data)
+        finally:
+            stream.stop_stream()
+            stream.close()
+            p.terminate()
+            self.fullrecording = b''.join(frames)
 
     def AnimateRecordButton(self):
         if self.flag:
@@ -1133,28 +1228,23 @@ class MusicPainter(QMainWindow):
         self.record_act.setIcon(QIcon(self.resource_path('icons/48x48/Record.png')))
         # self.record_act.setIcon(QIcon(self.resource_path('Record.png')))
 
-    # Sets up the thread to record the sound data from the microphone.
+    # Starts a job to record the sound data from the microphone.
     def RecordSoundData(self):
-        if not self.music_thread:
-            self.music_thread = Thread(target=self.dotherecord, daemon=True)
-            # self.clearImage()
-
-        if self.music_thread.is_alive():
+        if not self.startMusicJob("Record", self.dotherecord, self.ChunkSizesList[self.chunkSize.currentIndex()],
+                                  self.algorithmNum.currentIndex() + 1):
             return
 
         self.timer.start()
 
-        self.playsoundstop = False
         self.titleoverridetext = "Recording"
         self.updateProgramWindowTitle()
-        self.music_thread.start()
         # self.titleoverridetext = ""
         # self.updateProgramWindowTitle()
 
     # Stops the recording.
     def StopRecordData(self):
-        self.playsoundstop = True
-        self.music_thread = None
+        if self.musicJob is not None:
+            self.musicJob.cancel()
         self.titleoverridetext = ""
         self.updateProgramWindowTitle()
         self.StopAnimateRecordButton()
@@ -1204,9 +1294,36 @@ class MusicPainter(QMainWindow):
         except:
             pass
 
-    # Clears the render list and screen.
+    # Sets the level-of-detail error bound, in pixels, used when drawing the image.
+    def setDetailTolerance(self):
+        value, ok = QInputDialog.getDouble(self, "Detail Tolerance",
+                                           "Merge primitives smaller than (pixels, 0 = off):",
+                                           self.canvas.detailerror, 0, 10, 2)
+        if ok:
+            self.canvas.detailerror = value
+            self.canvas.update()
+
+    # Sets the target frame rate for repainting the image while rendering.
+    def setRepaintRate(self):
+        value, ok = QInputDialog.getInt(self, "Repaint Rate", "Frames per second:",
+                                        self.repaintScheduler.targetFPS, 1, 240)
+        if ok:
+            self.repaintScheduler.setTargetFPS(value)
+
+    def setVectorBudget(self):
+        value, ok = QInputDialog.getInt(self, "Vector Budget", "Primitives kept as vectors (0 for no limit):",
+                                        self.rl.maxPrimitives or 0, 0, 100000000, 100000)
+        if ok:
+            self.rl.setBudget(value or None, self.rl.maxBytes, detailerror=self.rl.detailError)
+            # The render worker compacts the list on its next request.
+            self.renderWorker.extend(self.rl.length())
+            self.canvas.update()
+
+    # Clears the render list and screen, stopping any job that is drawing into it.
     def clearImage(self):
+        self.stopMusicJob()
         self.rl.clear()
+        self.renderSeed = None
         self.canvas.update()
 
     # Opens a wav file for rendering and playing.  The file data ia not stored internally
@@ -1225,6 +1342,7 @@ class MusicPainter(QMainWindow):
 
                 self.loadedFilename = file_name
                 self.updateProgramWindowTitle()
+                self.updateThumbnails()
             except:
                 QMessageBox.warning(self, "File Not Loaded", "The file " + file_name + " could not be loaded.",
                                     QMessageBox.Ok)
@@ -1327,22 +1445,114 @@ class MusicPainter(QMainWindow):
         dialog.paintRequested.connect(self.printPreview)
         dialog.exec()
 
-    # This function does the printing by invoking an off-screen version of the image viewer and
-    # rendering it to a pixmap.  This pixmap is then drawn as an image to the painter object
-    # attached to the printer.
+    # Returns a tiled exporter for the current view of the image at the given width.  The
+    # height follows the aspect ratio of the image on the screen.  It draws a copy of the
+    # render list, which a running job may add to and the render worker compact meanwhile.
+    def makeTiledExport(self, width):
+        height = round(width * self.canvas.height() / self.canvas.width())
+        return TiledExport(self.rl.copy(), width, height, self.canvas.center, self.canvas.zoomfactor,
+                           self.canvas.backgroundcolor, self.canvas.detailerror)
+
+    # Saves the current view of the image to a PNG file at a chosen resolution.  The image is
+    # rendered and written in tiles so very large images can be exported.
+    def exportHighResolution(self):
+        width, ok = QInputDialog.getInt(self, "Export High Resolution Image", "Image width (pixels):",
+                                        4 * self.canvas.width(), 16, 100000)
+        if not ok:
+            return
+
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export High Resolution Image", "",
+                                                   "PNG Files (*.png)")
+        if not file_name:
+            return
+        if not file_name.lower().endswith(".png"):
+            file_name += ".png"
+
+        exporter = self.makeTiledExport(width)
+        progress = QProgressDialog("Exporting image...", "Cancel", 0, 1, self)
+        progress.setWindowTitle("Export High Resolution Image")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def report(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QApplication.processEvents()
+            return not progress.wasCanceled()
+
+        try:
+            exporter.exportPng(file_name, report)
+        except Exception:
+            QMessageBox.warning(self, "File Not Saved", "The file " + file_name + " could not be saved.",
+                                QMessageBox.Ok)
+        progress.close()
+
+    # Saves the current view of the image as an SVG or PDF file, chosen by the selected filter.
+    def exportVectorImage(self):
+        file_name, selected = QFileDialog.getSaveFileName(self, "Export Vector Image", "",
+                                                          "SVG Files (*.svg);;PDF Files (*.pdf)")
+        if not file_name:
+            return
+        ext = ".pdf" if selected.startswith("PDF") else ".svg"
+        if not file_name.lower().endswith(ext):
+            file_name += ext
+
+        exporter = VectorExport(self.rl.copy(), self.canvas.width(), self.canvas.height(), self.canvas.center,
+                                self.canvas.zoomfactor, self.canvas.backgroundcolor)
+        try:
+            exporter.export(file_name)
+        except Exception:
+            QMessageBox.warning(self, "File Not Saved", "The file " + file_name + " could not be saved.",
+                                QMessageBox.Ok)
+
+    def saveScene(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save Scene As", "", "Scene Files (*.mps)")
+        if not file_name:
+            return
+        if not file_name.lower().endswith(".mps"):
+            file_name += ".mps"
+
+        try:
+            items, base = self.rl.snapshot()
+            SceneFile.saveScene(file_name, items, self.canvas.backgroundcolor, self.canvas.center,
+                                self.canvas.zoomfactor, base, seed=self.renderSeed)
+        except Exception:
+            QMessageBox.warning(self, "File Not Saved", "The file " + file_name + " could not be saved.",
+                                QMessageBox.Ok)
+
+    # Loads a scene file into the render list and restores the view it was saved with.
+    # The worker is reset since the new list may be longer than the one it has drawn.
+    def openScene(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Open Scene", "", "Scene Files (*.mps);;All Files (*.*)")
+        if not file_name:
+            return
+
+        try:
+            scene = SceneFile.loadScene(file_name)
+        except Exception as e:
+            QMessageBox.warning(self, "File Not Opened", "The file " + file_name + " could not be opened.\n" + str(e),
+                                QMessageBox.Ok)
+            return
+
+        self.stopMusicJob()
+        self.rl.replace(scene.items, scene.base)
+        self.renderSeed = scene.seed
+        self.canvas.backgroundcolor = scene.backgroundcolor
+        self.canvas.center = scene.center
+        self.canvas.zoomfactor = scene.zoomfactor
+        self.canvas.updateScreenBounds()
+        self.renderWorker.reset(self.canvas.makeRenderer())
+        self.canvas.update()
+
+    # This function does the printing by rendering the image in tiles at the printer
+    # resolution and drawing each tile to the painter object attached to the printer.
     def printPreview(self, printer):
-        printviewer = ObjectListViewer(self, self.mainapp)
         printres = printer.resolution()
 
         wid = 7 * printres
-        hei = wid * self.canvas.height() / self.canvas.width()
-        printviewer.setFixedSize(QSize(round(wid), round(hei)))
-        printviewer.zoomfactor = self.canvas.zoomfactor
-        printviewer.center = self.canvas.center
-        pixmap = QPixmap(printviewer.size())
-        printviewer.render(pixmap)
+        exporter = self.makeTiledExport(round(wid))
         painter = QPainter(printer)
-        painter.drawPixmap(QPoint(0, 0), pixmap)
+        exporter.exportPainter(painter)
         painter.end()
 
     # Ending dummy function for print completion.
@@ -1354,6 +1564,7 @@ if __name__ == '__main__':
     """
     Initiate the program. 
     """
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MusicPainter(app)
     progcss = appcss()
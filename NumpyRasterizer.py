@@ -0,0 +1,399 @@
+import math
+
+import numpy as np
+
+from PySide2.QtGui import (QImage)
+
+from ListRenderer import ListRenderer
+from SceneFile import coordStarts, packRenderList
+
+
+def unpackColors(colors):
+    """
+    Splits packed QColor.rgba() values into premultiplied float RGBA of shape (n, 4).
+    """
+    a = ((colors >> 24) & 255) / 255
+    rgba = np.empty((len(colors), 4))
+    rgba[:, 0] = ((colors >> 16) & 255) / 255 * a
+    rgba[:, 1] = ((colors >> 8) & 255) / 255 * a
+    rgba[:, 2] = (colors & 255) / 255 * a
+    rgba[:, 3] = a
+    return rgba
+
+
+def boxPixels(left, top, width, height):
+    """
+    Enumerates the pixels of a batch of boxes.  Returns the index of the box each pixel
+    belongs to and the pixel coordinates.
+    """
+    area = np.maximum(width, 0) * np.maximum(height, 0)
+    prim = np.repeat(np.arange(len(area)), area)
+    local = np.arange(len(prim)) - np.repeat(np.cumsum(area) - area, area)
+    w = width[prim]
+    return prim, left[prim] + local % w, top[prim] + local // w
+
+
+def linePixels(x1, y1, x2, y2):
+    """
+    Rasterizes a batch of aliased one pixel lines between integer end points, both end
+    points included.  The minor coordinate is rounded down, as QPainter does.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    count = steps + 1
+    prim = np.repeat(np.arange(len(count)), count)
+    t = (np.arange(len(prim)) - np.repeat(np.cumsum(count) - count, count)) / np.maximum(steps, 1)[prim]
+    x = np.floor(x1[prim] + t * dx[prim] + 1e-9).astype(np.int64)
+    y = np.floor(y1[prim] + t * dy[prim] + 1e-9).astype(np.int64)
+    return prim, x, y
+
+
+class NumpyRasterizer:
+    """
+    Software rasterizer for the render list written with vectorized NumPy, so rendering
+    does not need a QPainter or the thread it belongs to.  Batches of primitives are
+    packed into typed arrays, every primitive is turned into pixel fragments at once and
+    the fragments are blended over the image in drawing order with source-over alpha
+    blending.  The geometry follows the aliased QPainter path of ListRenderer: points,
+    one pixel lines, ellipses and rectangles on integer corners, and glows with the
+    opacity of their rings.  Filled triangles are filled directly instead of with
+    vertical strips, which only differs where the strips overlap with translucent colors.
+
+    The image is held as premultiplied float RGBA and returned as straight 8-bit RGBA.
+    Only the tile being drawn is held, the whole image if no tile is given.
+    """
+
+    def __init__(self, width, height, center=(0, 0), zoomfactor=1, backgroundcolor=None, maxfragments=1 << 22,
+                 tile=None):
+        self.view = ListRenderer(width, height, center, zoomfactor, backgroundcolor, 0)
+        self.backgroundcolor = self.view.backgroundcolor
+        self.maxFragments = maxfragments
+        self.setTile(*(tile or (0, 0, width, height)))
+
+    def setTile(self, x, y, width, height):
+        """
+        Restricts drawing to the tile of the image with upper left corner (x, y) and
+        clears it to the background color.
+        """
+        self.view.setTile(x, y, width, height)
+        self.width = width
+        self.height = height
+        self.pixels = np.empty((height * width, 4))
+        self.clear()
+
+    def clear(self):
+        self.pixels[:] = unpackColors(np.array([self.backgroundcolor.rgba()], dtype=np.uint32))[0]
+
+    def screenPoints(self, x, y):
+        """
+        Maps real coordinates to integer device coordinates, truncated like QPoint.
+        """
+        sx, sy = self.view.XYtoScreen(x, y)
+        return np.trunc(sx).astype(np.int64), np.trunc(sy).astype(np.int64)
+
+    def pointFragments(self, c):
+        x, y = self.screenPoints(c[:, 0], c[:, 1])
+        return np.arange(len(c)), x, y
+
+    def lineFragments(self, c):
+        x1, y1 = self.screenPoints(c[:, 0], c[:, 1])
+        x2, y2 = self.screenPoints(c[:, 2], c[:, 3])
+        return linePixels(x1, y1, x2, y2)
+
+    def ellipseFragments(self, c, fill):
+        """
+        Circles are ellipses in the integer rectangle between their corners, a filled
+        interior followed by a one pixel outline traced along the curve.
+        """
+        left, top = self.screenPoints(c[:, 0] - c[:, 2], c[:, 1] + c[:, 2])
+        right, bottom = self.screenPoints(c[:, 0] + c[:, 2], c[:, 1] - c[:, 2])
+        w = right - left + 1
+        h = bottom - top + 1
+        cx = left + w / 2
+        cy = top + h / 2
+
+        filled = np.nonzero(fill)[0]
+        prim, x, y = boxPixels(left[filled], top[filled], w[filled] + 1, h[filled] + 1)
+        prim = filled[prim]
+        inside = ((x - cx[prim]) / (w[prim] / 2)) ** 2 + ((y - cy[prim]) / (h[prim] / 2)) ** 2 <= 1
+        fillprim, fillx, filly = prim[inside], x[inside], y[inside]
+
+        samples = np.ceil(math.pi * (w + h)).astype(np.int64) * 2 + 8
+        prim = np.repeat(np.arange(len(c)), samples)
+        theta = (np.arange(len(prim)) - np.repeat(np.cumsum(samples) - samples, samples)) * (2 * math.pi) / samples[prim]
+        x = np.floor(cx[prim] + w[prim] / 2 * np.cos(theta) + 0.5).astype(np.int64)
+        y = np.floor(cy[prim] + h[prim] / 2 * np.sin(theta) + 0.5).astype(np.int64)
+        prim, x, y = self.unique(prim, x, y)
+        return (fillprim, fillx, filly), (prim, x, y)
+
+    def glowFragments(self, c, alpha):
+        """
+        Glows are filled ellipses like circles, with the opacity of the ring each pixel is
+        in.  Returns the fragments and the factor that takes the alpha of the color to
+        that opacity.
+        """
+        left, top = self.screenPoints(c[:, 0] - c[:, 2], c[:, 1] + c[:, 2])
+        right, bottom = self.screenPoints(c[:, 0] + c[:, 2], c[:, 1] - c[:, 2])
+        w = right - left + 1
+        h = bottom - top + 1
+        cx = left + w / 2
+        cy = top + h / 2
+        layers = np.maximum(c[:, 3].astype(np.int64), 1)
+
+        prim, x, y = boxPixels(left, top, w + 1, h + 1)
+        t = np.sqrt(((x - cx[prim]) / (w[prim] / 2)) ** 2 + ((y - cy[prim]) / (h[prim] / 2)) ** 2)
+        inside = t <= 1
+        prim, x, y, t = prim[inside], x[inside], y[inside], t[inside]
+
+        # Ring k is covered by the k largest of the circles the glow stands for.
+        rings = np.minimum(layers[prim], np.floor(1 / np.maximum(t, 1e-9))).astype(np.int64)
+        transparency = np.ones(len(prim))
+        for j in range(int(layers.max(initial=1))):
+            step = np.floor(alpha[prim] * (j + 1) / layers[prim]) / 255
+            transparency *= np.where(j < rings, 1 - step, 1)
+        scale = np.where(alpha[prim] > 0, (1 - transparency) * 255 / np.maximum(alpha[prim], 1), 0)
+        return prim, x, y, scale
+
+    def rectFragments(self, c, fill):
+        """
+        Rectangles between integer corners, filled like QPainter.fillRect or outlined like
+        QPainter.drawRect, either way round.
+        """
+        l, t = self.screenPoints(c[:, 0], c[:, 1])
+        r, b = self.screenPoints(c[:, 2], c[:, 3])
+        # QRect(topLeft, bottomRight) is width r - l + 1 and may be negative.
+        x0 = np.minimum(l, r + 1)
+        x1 = np.maximum(l, r + 1)
+        y0 = np.minimum(t, b + 1)
+        y1 = np.maximum(t, b + 1)
+
+        filled = np.nonzero(fill)[0]
+        prim, x, y = boxPixels(x0[filled], y0[filled], x1[filled] - x0[filled], y1[filled] - y0[filled])
+        filledfrags = (filled[prim], x, y)
+
+        outlined = np.nonzero(~fill)[0]
+        ox0, oy0, ox1, oy1 = x0[outlined], y0[outlined], x1[outlined], y1[outlined]
+        prim, x, y = boxPixels(ox0, oy0, ox1 - ox0 + 1, oy1 - oy0 + 1)
+        edge = (x == ox0[prim]) | (x == ox1[prim]) | (y == oy0[prim]) | (y == oy1[prim])
+        return filledfrags, (outlined[prim[edge]], x[edge], y[edge])
+
+    def triangleFragments(self, c, fill):
+        filled = np.nonzero(fill)[0]
+        sx, sy = self.view.XYtoScreen(c[filled][:, 0::2], c[filled][:, 1::2])
+        left = np.floor(sx.min(axis=1)).astype(np.int64)
+        top = np.floor(sy.min(axis=1)).astype(np.int64)
+        right = np.ceil(sx.max(axis=1)).astype(np.int64)
+        bottom = np.ceil(sy.max(axis=1)).astype(np.int64)
+        prim, x, y = boxPixels(left, top, right - left + 1, bottom - top + 1)
+
+        # A pixel is inside if it is on the same side of all three edges.
+        sides = []
+        for a, b in ((0, 1), (1, 2), (2, 0)):
+            sides.append((sx[prim, b] - sx[prim, a]) * (y - sy[prim, a]) -
+                         (sy[prim, b] - sy[prim, a]) * (x - sx[prim, a]))
+        inside = (((sides[0] >= 0) & (sides[1] >= 0) & (sides[2] >= 0)) |
+                  ((sides[0] <= 0) & (sides[1] <= 0) & (sides[2] <= 0)))
+        filledfrags = (filled[prim[inside]], x[inside], y[inside])
+
+        outlined = np.nonzero(~fill)[0]
+        o = c[outlined]
+        edges = np.concatenate([o[:, [0, 1, 2, 3]], o[:, [2, 3, 4, 5]], o[:, [4, 5, 0, 1]]])
+        prim, x, y = self.lineFragments(edges)
+        return filledfrags, (np.tile(outlined, 3)[prim], x, y)
+
+    def unique(self, prim, x, y):
+        """
+        Drops repeated pixels of the same primitive so they are not blended twice.
+        """
+        key = (prim * (self.height + 2) + (np.clip(y, -1, self.height) + 1)) * (self.width + 2) + \
+              (np.clip(x, -1, self.width) + 1)
+        key, index = np.unique(key, return_index=True)
+        return prim[index], x[index], y[index]
+
+    def fragments(self, types, fills, colors, coords, starts):
+        """
+        Yields (primitive, x, y, pass, scale) fragment arrays for a batch, by type.
+        Primitives with a fill and an outline draw the fill in pass 0 and the outline in
+        pass 1.  The scale multiplies the color of each fragment, or is None.
+        """
+        fills = fills != 0
+        for kind, n in ((0, 2), (1, 4), (2, 3), (3, 4), (4, 6), (5, 4)):
+            index = np.nonzero(types == kind)[0]
+            if len(index) == 0:
+                continue
+            c = coords[starts[index, None] + np.arange(n)]
+            if kind == 0:
+                parts = [self.pointFragments(c)]
+            elif kind == 1:
+                parts = [self.lineFragments(c)]
+            elif kind == 2:
+                parts = self.ellipseFragments(c, fills[index])
+            elif kind == 3:
+                parts = self.rectFragments(c, fills[index])
+            elif kind == 4:
+                parts = self.triangleFragments(c, fills[index])
+            else:
+                prim, x, y, scale = self.glowFragments(c, (colors[index] >> 24) & 255)
+                yield index[prim], x, y, 0, scale
+                continue
+            for stage, (prim, x, y) in enumerate(parts):
+                yield index[prim], x, y, stage, None
+
+    def blend(self, order, pixel, rgba):
+        """
+        Blends fragments over the image.  Fragments are sorted by pixel and drawing order
+        and each pixel gets src over ... over src over dst in one step: the weight of a
+        fragment is its alpha times the transparency of everything drawn after it, taken
+        from a cumulative sum of log transparencies.  If every fragment is opaque the last
+        one of each pixel simply replaces it.
+        """
+        if len(pixel) == 0:
+            return
+        sort = np.argsort(pixel * (int(order.max()) + 1) + order)
+        pixel = pixel[sort]
+        rgba = rgba[sort]
+
+        first = np.concatenate(([0], np.nonzero(np.diff(pixel))[0] + 1))
+        last = np.concatenate((first[1:], [len(pixel)])) - 1
+        target = pixel[first]
+        if rgba[:, 3].min() >= 1:
+            self.pixels[target] = rgba[last]
+            return
+
+        logt = np.log(np.maximum(1 - rgba[:, 3], 1e-12))
+        total = np.cumsum(logt)
+        segment = np.repeat(np.arange(len(first)), last - first + 1)
+        before = np.concatenate(([0], total))[first]
+
+        weight = np.exp(total[last][segment] - total)
+        color = np.add.reduceat(rgba * weight[:, None], first)
+        transparency = np.exp(total[last] - before)
+        self.pixels[target] = self.pixels[target] * transparency[:, None] + color
+
+    def drawBatch(self, types, fills, colors, coords, starts=None):
+        """
+        Draws a batch of primitives given as the typed arrays of SceneFile.packRenderList.
+        Large batches are split so no more than about maxFragments fragments are held at once.
+        """
+        if starts is None:
+            starts = coordStarts(types)
+        count = len(types)
+        if count == 0:
+            return
+
+        # Split by an estimate of the fragments, the pixel area of each bounding box.
+        estimate = self.estimateFragments(types, coords, starts)
+        splits = np.searchsorted(np.cumsum(estimate), np.arange(1, 1 + estimate.sum() // self.maxFragments) *
+                                 self.maxFragments)
+        bounds = np.unique(np.concatenate(([0], splits, [count])))
+
+        premultiplied = unpackColors(colors)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start >= end:
+                continue
+            orders = []
+            pixels = []
+            prims = []
+            scales = []
+            for prim, x, y, stage, scale in self.fragments(types[start:end], fills[start:end], colors[start:end],
+                                                           coords, starts[start:end]):
+                visible = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+                prim, x, y = prim[visible], x[visible], y[visible]
+                orders.append(prim * 2 + stage)
+                pixels.append(y * self.width + x)
+                prims.append(prim + start)
+                scales.append(np.ones(len(prim)) if scale is None else scale[visible])
+            prim = np.concatenate(prims)
+            self.blend(np.concatenate(orders), np.concatenate(pixels),
+                       premultiplied[prim] * np.concatenate(scales)[:, None])
+
+    def estimateFragments(self, types, coords, starts):
+        """
+        Rough number of fragments of each primitive: the pixel area of its bounding box,
+        or its length for points and lines.
+        """
+        scale = self.view.pixelScale()
+        estimate = np.ones(len(types))
+        for kind, n in ((1, 4), (2, 3), (3, 4), (4, 6), (5, 3)):
+            index = np.nonzero(types == kind)[0]
+            if len(index) == 0:
+                continue
+            c = coords[starts[index, None] + np.arange(n)]
+            if kind == 1:
+                estimate[index] = np.abs(c[:, 2:4] - c[:, 0:2]).max(axis=1) * scale + 1
+            elif kind == 2 or kind == 5:
+                estimate[index] = (2 * c[:, 2] * scale + 2) ** 2
+            else:
+                w = c[:, 0::2].max(axis=1) - c[:, 0::2].min(axis=1)
+                h = c[:, 1::2].max(axis=1) - c[:, 1::2].min(axis=1)
+                estimate[index] = (w * scale + 2) * (h * scale + 2)
+        return np.minimum(estimate, self.width * self.height + 1).astype(np.int64)
+
+    def drawBase(self, base):
+        """
+        Blends the raster base layer of a render list over the image, scaled to the view
+        with nearest neighbour sampling.
+        """
+        if base is None:
+            return
+        image, rect = base
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        iw, ih = image.width(), image.height()
+        src = np.frombuffer(image.constBits(), dtype=np.uint32).reshape(ih, image.bytesPerLine() // 4)[:, :iw]
+
+        left, top, right, bottom = self.view.screenRect(rect)
+        x0, x1 = max(0, math.floor(left)), min(self.width, math.ceil(right))
+        y0, y1 = max(0, math.floor(top)), min(self.height, math.ceil(bottom))
+        if x0 >= x1 or y0 >= y1:
+            return
+        sx = np.clip(((np.arange(x0, x1) + 0.5 - left) / (right - left) * iw).astype(np.int64), 0, iw - 1)
+        sy = np.clip(((np.arange(y0, y1) + 0.5 - top) / (bottom - top) * ih).astype(np.int64), 0, ih - 1)
+        packed = src[sy[:, None], sx[None, :]].ravel()
+
+        # The image is premultiplied already, so the channels are used as they are.
+        rgba = np.empty((len(packed), 4))
+        rgba[:, 0] = ((packed >> 16) & 255) / 255
+        rgba[:, 1] = ((packed >> 8) & 255) / 255
+        rgba[:, 2] = (packed & 255) / 255
+        rgba[:, 3] = ((packed >> 24) & 255) / 255
+        target = (np.arange(y0, y1)[:, None] * self.width + np.arange(x0, x1)[None, :]).ravel()
+        self.pixels[target] = self.pixels[target] * (1 - rgba[:, 3:4]) + rgba
+
+    def renderRange(self, rl, start, end):
+        """
+        Draws the render list entries from start up to end.
+        """
+        types, fills, colors, coords = packRenderList(rl.renderlist[start:end])
+        self.drawBatch(types, fills, colors, coords)
+
+    def renderIndices(self, rl, indices):
+        """
+        Draws the render list entries with the given indices, in order.
+        """
+        types, fills, colors, coords = packRenderList([rl.renderlist[i] for i in indices])
+        self.drawBatch(types, fills, colors, coords)
+
+    def renderAll(self, rl):
+        """
+        Clears the image to the background color and draws the base layer and the entire
+        render list.
+        """
+        self.clear()
+        self.drawBase(rl.base)
+        self.renderRange(rl, 0, rl.length())
+
+    def rgba(self):
+        """
+        Returns the image as straight 8-bit RGBA of shape (height, width, 4).
+        """
+        alpha = self.pixels[:, 3:4]
+        color = np.divide(self.pixels[:, :3], alpha, out=np.zeros((len(alpha), 3)), where=alpha > 0)
+        out = np.empty((len(alpha), 4), dtype=np.uint8)
+        out[:, :3] = np.clip(np.round(color * 255), 0, 255)
+        out[:, 3:] = np.clip(np.round(alpha * 255), 0, 255)
+        return out.reshape(self.height, self.width, 4)
+
+    def toQImage(self):
+        pixels = np.ascontiguousarray(self.rgba())
+        return QImage(pixels.data, self.width, self.height, self.width * 4, QImage.Format_RGBA8888).copy()
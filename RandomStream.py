@@ -0,0 +1,58 @@
+import numpy as np
+
+# Seeds are kept to 64 bits so they fit the scene file header.
+MAXSEED = (1 << 64) - 1
+
+
+class RandomStream:
+    """
+    Seeded source of the random numbers of a render.  The numbers come from a NumPy
+    Generator and are drawn in blocks of blockSize, so a single draw is a list lookup.
+    Numbers taken one at a time and as arrays come from the same sequence in the same
+    order, so a whole track version of an algorithm gets the numbers its per chunk draw
+    would have.  Without a seed one is made from fresh entropy.  The seed is kept, so a
+    render can be repeated exactly with the same input, and reset starts the sequence
+    over.
+    """
+
+    blockSize = 4096
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy) & MAXSEED
+        if not 0 <= seed <= MAXSEED:
+            raise ValueError("the seed must be between 0 and " + str(MAXSEED))
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.generator = np.random.default_rng(self.seed)
+        self.block = []
+        self.pos = 0
+
+    def random(self):
+        """
+        Returns the next number, uniform in [0, 1).
+        """
+        if self.pos == len(self.block):
+            self.block = self.generator.random(self.blockSize).tolist()
+            self.pos = 0
+        value = self.block[self.pos]
+        self.pos += 1
+        return value
+
+    def randrange(self, n):
+        """
+        Returns the next number as an integer in [0, n).
+        """
+        return min(int(self.random() * n), n - 1)
+
+    def randoms(self, count):
+        """
+        Returns the next count numbers as an array.
+        """
+        head = self.block[self.pos:self.pos + count]
+        self.pos += len(head)
+        if len(head) == count:
+            return np.array(head, dtype=np.float64)
+        return np.concatenate((head, self.generator.random(count - len(head))))
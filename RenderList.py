@@ -0,0 +1,248 @@
+import math
+from threading import RLock
+
+import numpy as np
+
+from PySide2.QtGui import (QImage, QPainter)
+
+from ListRenderer import ListRenderer, rectView
+
+
+def primitiveBounds(obj):
+    """
+    Returns the bounding box [xmin, ymin, xmax, ymax] in real coordinates of a render
+    list entry.
+    """
+    if obj[0] == 0:
+        return [obj[1], obj[2], obj[1], obj[2]]
+    elif obj[0] == 1 or obj[0] == 3:
+        return [min(obj[1], obj[3]), min(obj[2], obj[4]), max(obj[1], obj[3]), max(obj[2], obj[4])]
+    elif obj[0] == 2 or obj[0] == 5:
+        return [obj[1] - obj[3], obj[2] - obj[3], obj[1] + obj[3], obj[2] + obj[3]]
+    elif obj[0] == 4:
+        return [min(obj[1], obj[3], obj[5]), min(obj[2], obj[4], obj[6]),
+                max(obj[1], obj[3], obj[5]), max(obj[2], obj[4], obj[6])]
+    elif obj[0] == 6:
+        return obj[1].bounds
+    return None
+
+
+def boundsArray(items):
+    """
+    Returns the bounding boxes of render list entries as an array of shape (n, 4).
+    """
+    return np.array(list(map(primitiveBounds, items)), dtype=np.float64).reshape(len(items), 4)
+
+
+def mergeBounds(a, b):
+    if a is None:
+        return b
+    return [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+
+
+def entryBytes(item):
+    """
+    Rough estimate of the memory used by a render list entry: the list, its floats and
+    a share of the color.
+    """
+    return 72 + 32 * len(item)
+
+
+class RenderList:
+    """
+    Convenience class for storing a list of items to be rendered.
+
+    The list can be given a budget of primitives and estimated bytes.  When an add goes
+    over the budget the oldest primitives are flattened into a raster base layer and
+    dropped from the list, so memory and paint cost level off in long sessions.  The base
+    layer, base, is None or a transparent image and the rectangle [xmin, ymin, xmax, ymax]
+    in real coordinates it covers.  It grows as needed, at baseScale pixels per unit up to
+    maxBaseSize pixels a side, and is drawn before the list.  The generation counter
+    changes whenever entries are removed from the front of the list, which invalidates
+    anything drawn by index.
+
+    With deferCompaction set adds never flatten, so the thread adding entries is not held
+    up; whoever draws the list calls compactIfOverBudget instead.  The lock guards the
+    list and base layer when entries are added on one thread and flattened on another.
+
+    Entries added since the last paint are dirty.  Their bounds are taken by whoever
+    paints them, so only the area they cover has to be updated on screen.
+    """
+    def __init__(self):
+        self.renderlist = []
+        self.generation = 0
+        self.base = None
+        self.bytes = 0
+        self.dirtyStart = 0
+
+        self.maxPrimitives = None
+        self.maxBytes = None
+        self.baseScale = 512
+        self.maxBaseSize = 8192
+        self.detailError = 0
+        self.deferCompaction = False
+        self.lock = RLock()
+
+    def add(self, item):
+        with self.lock:
+            self.renderlist.append(item)
+            self.bytes += entryBytes(item)
+        if not self.deferCompaction:
+            self.compactIfOverBudget()
+
+    def extend(self, items):
+        """
+        Appends a batch of entries, compacting at most once.
+        """
+        with self.lock:
+            self.renderlist.extend(items)
+            self.bytes += sum(map(entryBytes, items))
+        if not self.deferCompaction:
+            self.compactIfOverBudget()
+
+    def clear(self):
+        with self.lock:
+            self.renderlist = []
+            self.base = None
+            self.bytes = 0
+            self.dirtyStart = 0
+            self.generation += 1
+
+    def replace(self, items, base=None):
+        with self.lock:
+            self.renderlist = items
+            self.base = base
+            self.bytes = sum(map(entryBytes, items))
+            self.dirtyStart = 0
+            self.generation += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of the entries and the base layer, taken together.
+        """
+        with self.lock:
+            return list(self.renderlist), self.base
+
+    def copy(self):
+        """
+        Returns a render list with the entries and base layer of this one and no budget,
+        for exporters that read it by index while this one is added to and compacted.
+        """
+        rl = RenderList()
+        rl.replace(*self.snapshot())
+        return rl
+
+    def length(self):
+        return len(self.renderlist)
+
+    def get(self, i):
+        if i < 0 or i >= len(self.renderlist):
+            return None
+        return self.renderlist[i]
+
+    def takeDirtyBounds(self, end=None):
+        """
+        Returns the bounds of the dirty entries before end, by default all of them, as an
+        array of shape (n, 4) and marks them clean.
+        """
+        start = self.dirtyStart
+        end = self.markClean(end)
+        return boundsArray(self.renderlist[start:end])
+
+    def markClean(self, end=None):
+        """
+        Marks the entries before end clean without computing their bounds, for example
+        after a full repaint.  Returns the index of the first dirty entry.
+        """
+        if end is None or end > len(self.renderlist):
+            end = len(self.renderlist)
+        self.dirtyStart = max(self.dirtyStart, end)
+        return self.dirtyStart
+
+    def setBudget(self, maxprimitives=None, maxbytes=None, scale=None, detailerror=0):
+        """
+        Sets the number of primitives and estimated bytes kept as vectors, None for no
+        limit, and the resolution of the base layer in pixels per unit of real coordinates.
+        """
+        self.maxPrimitives = maxprimitives
+        self.maxBytes = maxbytes
+        if scale is not None:
+            self.baseScale = scale
+        self.detailError = detailerror
+        if not self.deferCompaction:
+            self.compactIfOverBudget()
+
+    def overBudget(self):
+        return ((self.maxPrimitives is not None and len(self.renderlist) > self.maxPrimitives) or
+                (self.maxBytes is not None and self.bytes > self.maxBytes))
+
+    def compactIfOverBudget(self):
+        """
+        Compacts the list if it is over budget.  Returns True if it was compacted.
+        """
+        if not self.overBudget():
+            return False
+        self.compact()
+        return True
+
+    def compact(self):
+        """
+        Flattens the oldest primitives into the base layer until the list is 10% under
+        budget, so the cost of flattening is spread over many adds.
+        """
+        items = self.renderlist
+        count = len(items)
+        if self.maxPrimitives is not None and count > self.maxPrimitives:
+            count -= int(self.maxPrimitives * 0.9)
+        else:
+            count = 0
+        if self.maxBytes is not None:
+            target = self.bytes - int(self.maxBytes * 0.9)
+            removed = sum(map(entryBytes, items[:count]))
+            while count < len(items) and removed < target:
+                removed += entryBytes(items[count])
+                count += 1
+        if count <= 0:
+            return
+        self.flatten(count)
+
+    def flatten(self, count):
+        """
+        Draws the first count primitives into the base layer and removes them from the list.
+        Entries are only appended while the lock is not held, so the first count stay put
+        while they are drawn and the lock is held just to swap in the result.
+        """
+        with self.lock:
+            items = self.renderlist
+            base = self.base
+            generation = self.generation
+        bounds = None
+        for i in range(count):
+            bounds = mergeBounds(bounds, primitiveBounds(items[i]))
+        rect = mergeBounds(None if base is None else base[1], bounds)
+        scale = min(self.baseScale, self.maxBaseSize / max(rect[2] - rect[0], rect[3] - rect[1], 1e-9))
+
+        # The rectangle is snapped to whole pixels and a margin of one pixel is left for
+        # pens, so an old base layer at the same scale is copied without resampling.
+        rect = [math.floor(rect[0] * scale - 1) / scale, math.floor(rect[1] * scale - 1) / scale,
+                math.ceil(rect[2] * scale + 1) / scale, math.ceil(rect[3] * scale + 1) / scale]
+        width, height, center, zoomfactor = rectView(rect, scale)
+        renderer = ListRenderer(width, height, center, zoomfactor, None, self.detailError)
+        image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(0)
+        qp = QPainter()
+        qp.begin(image)
+        renderer.renderBase(qp, self)
+        renderer.renderRange(qp, self, 0, count)
+        qp.end()
+        removed = sum(map(entryBytes, items[:count]))
+
+        with self.lock:
+            # Cleared or replaced while drawing.
+            if self.generation != generation:
+                return
+            self.base = (image, renderer.visibleRect())
+            self.renderlist = self.renderlist[count:]
+            self.dirtyStart = max(0, self.dirtyStart - count)
+            self.bytes -= removed
+            self.generation += 1
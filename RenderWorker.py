@@ -0,0 +1,136 @@
+import queue
+from threading import Lock, Thread
+
+from PySide2.QtCore import (QObject, Signal)
+from PySide2.QtGui import (QImage, QPainter)
+
+
+class RenderWorker(QObject):
+    """
+    Rasterizes the render list on a dedicated thread.  New primitives are drawn into a
+    backing QImage with a ListRenderer and a copy of the image is handed to the GUI
+    thread as a finished frame, so the GUI thread only has to blit it.  Requests are
+    queued with reset, when the view changes, and extend, when primitives are added.  The
+    image is redrawn from the base layer when the render list is cleared or compacted.
+    The render list is compacted here rather than by whoever adds to it, so flattening
+    never holds up playing or recording.
+    Consecutive requests are merged and at most maxPerFrame primitives are drawn before
+    a frame is published, along with the dirty rectangles of the primitives added.
+    """
+
+    frameReady = Signal(object)
+    queueDepthChanged = Signal(int)
+
+    def __init__(self, rl, maxperframe=20000):
+        super().__init__()
+        self.rl = rl
+        self.rl.deferCompaction = True
+        self.maxPerFrame = maxperframe
+        self.jobs = queue.Queue()
+
+        self.lock = Lock()
+        self.frame = None
+        self.frameKey = None
+        self.frameEnd = 0
+        self.requestedKey = None
+
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def queueDepth(self):
+        """
+        Number of requests waiting for the render thread.
+        """
+        return self.jobs.qsize()
+
+    def reset(self, renderer):
+        """
+        Requests a full redraw of the render list with a new view.
+        """
+        self.requestedKey = renderer.key()
+        self.jobs.put(("reset", renderer))
+        self.queueDepthChanged.emit(self.jobs.qsize())
+
+    def extend(self, end):
+        """
+        Requests that the render list entries up to end be drawn into the current frame.
+        """
+        self.jobs.put(("extend", end))
+        self.queueDepthChanged.emit(self.jobs.qsize())
+
+    def currentFrame(self):
+        """
+        Returns the last finished frame, the view key it was drawn with and the number of
+        render list entries in it.
+        """
+        with self.lock:
+            return self.frame, self.frameKey, self.frameEnd
+
+    def publish(self, image, key, end, rects=None):
+        """
+        Hands a copy of the image to the GUI thread.  The frame ready signal carries the
+        list of QRects that changed since the last frame, or None if all of it did.
+        """
+        with self.lock:
+            self.frame = image.copy()
+            self.frameKey = key
+            self.frameEnd = end
+        self.frameReady.emit(rects)
+
+    def run(self):
+        renderer = None
+        image = None
+        pos = 0
+        generation = None
+
+        while True:
+            jobs = [self.jobs.get()]
+            while True:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            redraw = False
+            for kind, arg in jobs:
+                if kind == "reset":
+                    renderer = arg
+                    redraw = True
+            self.queueDepthChanged.emit(self.jobs.qsize())
+            if renderer is None:
+                continue
+            self.rl.compactIfOverBudget()
+
+            # The render list was cleared or compacted since the last frame.
+            if self.rl.generation != generation or self.rl.length() < pos:
+                redraw = True
+
+            if redraw:
+                generation = self.rl.generation
+                image = QImage(renderer.width, renderer.height, QImage.Format_ARGB32_Premultiplied)
+                image.fill(renderer.backgroundcolor)
+                qp = QPainter()
+                qp.begin(image)
+                renderer.renderBase(qp, self.rl)
+                qp.end()
+                pos = 0
+
+            end = self.rl.length()
+            if not redraw and pos >= end:
+                continue
+
+            while True:
+                stop = min(end, pos + self.maxPerFrame)
+                if redraw:
+                    self.rl.markClean(stop)
+                    rects = None
+                else:
+                    rects = renderer.dirtyRects(self.rl.takeDirtyBounds(stop))
+                qp = QPainter()
+                qp.begin(image)
+                renderer.renderRange(qp, self.rl, pos, stop)
+                qp.end()
+                pos = stop
+                self.publish(image, renderer.key(), pos, rects)
+                if pos >= end or not self.jobs.empty():
+                    break
@@ -0,0 +1,99 @@
+import time
+from threading import Lock
+
+from PySide2.QtCore import (QObject, QTimer, Signal)
+
+
+class RepaintScheduler(QObject):
+    """
+    Coalesces repaint requests from the rendering threads.  The threads call request
+    with the range of render list entries they just added.  The ranges are merged under
+    a lock and at most one signal is posted to the GUI thread until the pending range
+    has been painted, so the event loop is not flooded.  The GUI thread paints the
+    accumulated range at most targetFPS times a second and never more than
+    maxPerFrame primitives in one paint.
+    """
+
+    requested = Signal()
+
+    def __init__(self, canvas, fps=30, maxperframe=20000):
+        super().__init__()
+        self.canvas = canvas
+        self.targetFPS = fps
+        self.maxPerFrame = maxperframe
+
+        self.lock = Lock()
+        self.pendingStart = None
+        self.pendingEnd = None
+        self.pendingAll = False
+        self.posted = False
+        self.lastPaint = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.requested.connect(self.schedule)
+
+    def setTargetFPS(self, fps):
+        self.targetFPS = max(1, fps)
+
+    def request(self, start, end):
+        """
+        Marks the render list entries from start up to end as needing to be painted.
+        Safe to call from any thread.
+        """
+        with self.lock:
+            if self.pendingStart is None or start < self.pendingStart:
+                self.pendingStart = start
+            if self.pendingEnd is None or end > self.pendingEnd:
+                self.pendingEnd = end
+            if self.posted:
+                return
+            self.posted = True
+        self.requested.emit()
+
+    def requestAll(self):
+        """
+        Requests a full repaint of the image.  Safe to call from any thread.
+        """
+        with self.lock:
+            self.pendingAll = True
+            if self.posted:
+                return
+            self.posted = True
+        self.requested.emit()
+
+    def schedule(self):
+        """
+        Starts the frame timer so the pending range is painted no sooner than one
+        frame after the last paint.
+        """
+        if self.timer.isActive():
+            return
+        wait = self.lastPaint + 1 / self.targetFPS - time.perf_counter()
+        self.timer.start(max(0, int(wait * 1000)))
+
+    def flush(self):
+        """
+        Paints the pending range, or at most maxPerFrame entries of it and schedules
+        another frame for the rest.  A pending range is still painted with a full
+        repaint, since a render worker only draws entries it has been asked for.
+        """
+        with self.lock:
+            start = self.pendingStart
+            end = self.pendingEnd
+            full = self.pendingAll
+            self.pendingStart = None
+            self.pendingEnd = None
+            self.pendingAll = False
+            self.posted = False
+
+        self.lastPaint = time.perf_counter()
+        if full:
+            self.canvas.update()
+        if start is None:
+            return
+
+        painted = self.canvas.paintRange(start, min(end, start + self.maxPerFrame))
+        if painted < end:
+            self.request(painted, end)
@@ -0,0 +1,283 @@
+import gc
+import mmap
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, repeat
+from operator import itemgetter
+
+import numpy as np
+
+from PySide2.QtGui import (QColor, QImage)
+
+from ImageUtils import pngBytes
+from Shape import expandInstances
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File layout: a fixed header, the raster base layer if the flags say there is one, and
+# the payload, either raw or as compressed blocks.  Since version 3 the header ends with
+# the seed of the render, set if the flags say there is one.  The base layer is its
+# rectangle in real coordinates and the PNG data length followed by the PNG data, padded
+# to 8 bytes.  The payload holds the render list as typed arrays, coordinates first so
+# they stay aligned when an uncompressed file is memory mapped.  Instances of shapes are
+# written as the plain entries of their shapes.
+#   coords  float64[...]        coordinates of each primitive in turn, as many as its type has
+#   colors  uint32[count]       QColor.rgba() of each primitive
+#   types   uint8[count]        0 = point, 1 = line, 2 = circle, 3 = rectangle, 4 = triangle,
+#                               5 = glow
+#   fills   uint8[count]        fill flag of circles, rectangles and triangles
+MAGIC = b'MPSCENE\0'
+VERSION = 3
+HEADER = struct.Struct('<8sHBBIQdddQQ')
+# Header of versions 1 and 2, without the seed.
+OLDHEADER = struct.Struct('<8sHBBIQdddQ')
+BASEHEADER = struct.Struct('<ddddQ')
+
+FLAG_BASELAYER = 1
+FLAG_SEED = 2
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Compressed payloads are split into blocks of this many bytes, compressed in parallel.
+BLOCKSIZE = 1 << 22
+
+# Number of coordinates and the positions of the fill flag and color for each type.  The
+# number of layers of a glow is kept with its coordinates.
+COORDS = {0: 2, 1: 4, 2: 3, 3: 4, 4: 6, 5: 4}
+COORDCOUNT = np.array([COORDS[kind] for kind in sorted(COORDS)], dtype=np.intp)
+FILLPOS = {0: None, 1: None, 2: 4, 3: 5, 4: 7, 5: None}
+COLORPOS = {0: 3, 1: 5, 2: 5, 3: 6, 4: 8, 5: 5}
+
+
+class Scene:
+    """
+    A finished painting: the render list entries, the base layer (image, rectangle) or
+    None, the view they are shown with and the seed of the random numbers they were
+    drawn with, or None if it is not known.
+    """
+
+    def __init__(self, items, backgroundcolor, center, zoomfactor, base=None, seed=None):
+        self.items = items
+        self.base = base
+        self.seed = seed
+        self.backgroundcolor = backgroundcolor
+        self.center = center
+        self.zoomfactor = zoomfactor
+
+
+def coordStarts(types):
+    """
+    Returns the index of the first coordinate of each primitive, with the total number of
+    coordinates appended.
+    """
+    starts = np.zeros(len(types) + 1, dtype=np.intp)
+    np.cumsum(COORDCOUNT[types], out=starts[1:])
+    return starts
+
+
+def packRenderList(items):
+    """
+    Converts render list entries to the typed arrays (types, fills, colors, coords).  The
+    entries are grouped by type so each column is extracted in a single pass with no
+    per entry lists.
+    """
+    count = len(items)
+    types = np.fromiter(map(itemgetter(0), items), dtype=np.uint8, count=count)
+    if (types == 6).any():
+        items = expandInstances(items)
+        count = len(items)
+        types = np.fromiter(map(itemgetter(0), items), dtype=np.uint8, count=count)
+    fills = np.zeros(count, dtype=np.uint8)
+    colors = np.zeros(count, dtype=np.uint32)
+    starts = coordStarts(types)
+    coords = np.empty(starts[-1])
+
+    for kind in COORDS:
+        index = np.nonzero(types == kind)[0]
+        if len(index) == 0:
+            continue
+        group = items if len(index) == count else [items[i] for i in index.tolist()]
+        n = COORDS[kind]
+        values = np.fromiter(chain.from_iterable(map(itemgetter(*range(1, 1 + n)), group)),
+                             dtype=np.float64, count=len(index) * n)
+        coords[starts[index, None] + np.arange(n)] = values.reshape(len(index), n)
+        colors[index] = np.fromiter(map(QColor.rgba, map(itemgetter(COLORPOS[kind]), group)),
+                                    dtype=np.uint32, count=len(index))
+        if FILLPOS[kind] is not None:
+            fills[index] = np.fromiter(map(itemgetter(FILLPOS[kind]), group), dtype=bool, count=len(index))
+    return types, fills, colors, coords
+
+
+def unpackRenderList(types, fills, colors, coords):
+    """
+    Rebuilds render list entries from the typed arrays.  Equal colors share one QColor.
+    The garbage collector is paused while the entries are created since it would
+    otherwise scan the growing list over and over.
+    """
+    count = len(types)
+    starts = coordStarts(types)
+    palette = {}
+    for rgba in np.unique(colors).tolist():
+        palette[rgba] = QColor.fromRgba(rgba)
+
+    collect = gc.isenabled()
+    gc.disable()
+    try:
+        grouped = []
+        order = []
+        for kind in COORDS:
+            index = np.nonzero(types == kind)[0]
+            if len(index) == 0:
+                continue
+            columns = [coords[starts[index] + j].tolist() for j in range(COORDS[kind])]
+            if FILLPOS[kind] is not None:
+                columns.append((fills[index] != 0).tolist())
+            columns.append(list(map(palette.__getitem__, colors[index].tolist())))
+            grouped.extend(map(list, zip(repeat(kind), *columns)))
+            order.append(index)
+
+        if len(order) <= 1:
+            return grouped
+        position = np.empty(count, dtype=np.intp)
+        position[np.concatenate(order)] = np.arange(count)
+        return list(map(grouped.__getitem__, position.tolist()))
+    finally:
+        if collect:
+            gc.enable()
+
+
+def compressBlock(codec, level, data):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompressBlock(codec, data, size):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    return zlib.decompress(data, bufsize=size)
+
+
+def compressPayload(codec, level, payload):
+    """
+    Compresses the payload in independent blocks on a thread pool, both compressors
+    release the GIL.  Each block is written with its compressed length in front.
+    """
+    view = memoryview(payload)
+    blocks = [view[i:i + BLOCKSIZE] for i in range(0, len(view), BLOCKSIZE)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        compressed = list(executor.map(lambda block: compressBlock(codec, level, block), blocks))
+    return b''.join(struct.pack('<I', len(block)) + block for block in compressed)
+
+
+def decompressPayload(codec, view, rawlength):
+    blocks = []
+    offset = 0
+    while offset < len(view):
+        length, = struct.unpack_from('<I', view, offset)
+        blocks.append(view[offset + 4:offset + 4 + length])
+        offset += 4 + length
+    sizes = [min(BLOCKSIZE, rawlength - i * BLOCKSIZE) for i in range(len(blocks))]
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        return b''.join(executor.map(lambda block, size: decompressBlock(codec, block, size), blocks, sizes))
+
+
+def saveScene(filename, items, backgroundcolor, center, zoomfactor, base=None, codec=None, level=1, seed=None):
+    """
+    Writes render list entries, the base layer, the view and the seed to a scene file.  The payload is
+    compressed with zstd when the zstandard module is installed and with zlib otherwise.
+    """
+    if codec is None:
+        codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+    types, fills, colors, coords = packRenderList(items)
+    payload = b''.join([coords.tobytes(), colors.tobytes(), types.tobytes(), fills.tobytes()])
+    rawlength = len(payload)
+    if codec != CODEC_NONE:
+        payload = compressPayload(codec, level, payload)
+
+    flags = (0 if base is None else FLAG_BASELAYER) | (0 if seed is None else FLAG_SEED)
+    header = HEADER.pack(MAGIC, VERSION, codec, flags, QColor(backgroundcolor).rgba(), len(types),
+                         center[0], center[1], zoomfactor, rawlength, seed or 0)
+    with open(filename, 'wb') as f:
+        f.write(header)
+        if base is not None:
+            image, rect = base
+            png = pngBytes(image)
+            f.write(BASEHEADER.pack(rect[0], rect[1], rect[2], rect[3], len(png)))
+            f.write(png)
+            f.write(bytes(-len(png) % 8))
+        f.write(payload)
+
+
+def readScene(mm, filename):
+    if len(mm) < OLDHEADER.size:
+        raise ValueError(filename + " is not a scene file")
+    magic, version, codec, flags, background, count, cx, cy, zoom, rawlength = OLDHEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError(filename + " is not a scene file")
+    if version > VERSION:
+        raise ValueError(filename + " was written by a newer version of the program")
+
+    seed = None
+    offset = OLDHEADER.size
+    if version >= 3:
+        if len(mm) < HEADER.size:
+            raise ValueError(filename + " is damaged")
+        if flags & FLAG_SEED:
+            seed = HEADER.unpack_from(mm, 0)[-1]
+        offset = HEADER.size
+    base = None
+    if flags & FLAG_BASELAYER:
+        xmin, ymin, xmax, ymax, length = BASEHEADER.unpack_from(mm, offset)
+        offset += BASEHEADER.size
+        image = QImage.fromData(mm[offset:offset + length], "PNG")
+        if image.isNull():
+            raise ValueError(filename + " is damaged")
+        base = (image.convertToFormat(QImage.Format_ARGB32_Premultiplied), [xmin, ymin, xmax, ymax])
+        offset += length + (-length % 8)
+
+    payload = memoryview(mm)[offset:]
+    if codec == CODEC_ZLIB or codec == CODEC_ZSTD:
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ValueError(filename + " is zstd compressed and the zstandard module is not installed")
+        payload = decompressPayload(codec, payload, rawlength)
+    elif codec != CODEC_NONE:
+        raise ValueError(filename + " uses an unknown compression")
+    if len(payload) != rawlength:
+        raise ValueError(filename + " is damaged")
+
+    # The per primitive arrays are at the end, the coordinates take the rest.
+    offset = len(payload) - 6 * count
+    colors = np.frombuffer(payload, dtype=np.uint32, count=count, offset=offset)
+    types = np.frombuffer(payload, dtype=np.uint8, count=count, offset=offset + 4 * count)
+    fills = np.frombuffer(payload, dtype=np.uint8, count=count, offset=offset + 5 * count)
+    coords = np.frombuffer(payload, dtype=np.float64, count=offset // 8)
+
+    items = unpackRenderList(types, fills, colors, coords)
+    return Scene(items, QColor.fromRgba(background), [cx, cy], zoom, base, seed)
+
+
+def loadScene(filename):
+    """
+    Reads a scene file through a memory map and returns a Scene.  Uncompressed payloads
+    are used in place without copying.
+    """
+    with open(filename, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return readScene(mm, filename)
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # After an error the traceback can still hold views of the map, it is
+            # closed when they are released.
+            pass
@@ -0,0 +1,56 @@
+from itertools import chain
+
+from PySide2.QtCore import (QPointF)
+from PySide2.QtGui import (QPainterPath, QPolygonF)
+
+
+class Shape:
+    """
+    Geometry that is drawn again and again, filled triangles and lines in real
+    coordinates.  The render list refers to a shape with an instance entry,
+    [6, shape, fillcol, linecol], so replayed geometry is stored once however often it
+    is drawn.  The shape keeps its outline as two QPainterPaths, built on first use, in
+    real coordinates so they stay valid at every view.
+    """
+
+    def __init__(self, triangles=(), lines=()):
+        self.triangles = [[list(p) for p in t] for t in triangles]
+        self.lines = [[list(p) for p in line] for line in lines]
+        points = list(chain.from_iterable(self.triangles + self.lines))
+        self.bounds = [min(p[0] for p in points), min(p[1] for p in points),
+                       max(p[0] for p in points), max(p[1] for p in points)]
+        self.fillPath = None
+        self.linePath = None
+
+    def paths(self):
+        """
+        Returns the fill path of the triangles and the path of the lines.
+        """
+        if self.fillPath is None:
+            fillPath = QPainterPath()
+            for t in self.triangles:
+                fillPath.addPolygon(QPolygonF([QPointF(*p) for p in t]))
+                fillPath.closeSubpath()
+            linePath = QPainterPath()
+            for (x1, y1), (x2, y2) in self.lines:
+                linePath.moveTo(x1, y1)
+                linePath.lineTo(x2, y2)
+            self.linePath = linePath
+            self.fillPath = fillPath
+        return self.fillPath, self.linePath
+
+    def entries(self, fillcol, linecol):
+        """
+        Returns the shape as plain render list entries, filled triangles followed by lines.
+        """
+        items = [[4, t[0][0], t[0][1], t[1][0], t[1][1], t[2][0], t[2][1], True, fillcol] for t in self.triangles]
+        items.extend([1, x1, y1, x2, y2, linecol] for (x1, y1), (x2, y2) in self.lines)
+        return items
+
+
+def expandInstances(items):
+    """
+    Replaces the instance entries of a list of render list entries with the plain
+    entries of their shapes.
+    """
+    return list(chain.from_iterable(obj[1].entries(obj[2], obj[3]) if obj[0] == 6 else (obj,) for obj in items))
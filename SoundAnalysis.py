@@ -0,0 +1,79 @@
+import numpy as np
+from scipy.io import wavfile
+
+
+# Uses NumPy fft to compute frequency spectrum.
+def getSpectrum(data, samplingfreq):
+    spectrum = np.abs(np.fft.rfft(data))
+    freq = np.fft.rfftfreq(data.size, d=1.0 / samplingfreq)
+    return spectrum, freq
+
+
+# Returns the dominate frequency from a spectrum and frequency list.
+def getMaxFreq(spec, freq):
+    if len(spec) == 0 or len(freq) == 0:
+        return 0
+
+    maxfreq = freq[0]
+    maxspec = spec[0]
+    for j in range(len(spec)):
+        if spec[j] > maxspec:
+            maxspec = spec[j]
+            maxfreq = freq[j]
+
+    return maxfreq
+
+
+# Reads in the wav file and precomputes the dominant frequency of each channel for every
+# chunk of the file along with the corresponding spectrum value.  Returns the frequency
+# list, the spectrum list and the sampling frequency.
+def analyzeWav(filename, chunk, freqcap=8500):
+    samplingfreq, sound = wavfile.read(filename)
+
+    if (len(sound.shape) > 1):
+        channels = sound.shape[1]
+        samples = sound.shape[0]
+    else:
+        channels = 1
+        samples = sound.shape[0]
+
+    channelData = []
+
+    if (len(sound.shape) > 1):
+        for i in range(channels):
+            channelData.append(sound[:, i])
+    else:
+        channelData.append(sound)
+
+    channelChunks = []
+    for i in range(channels):
+        soundslices = []
+        start = 0
+        while start + chunk <= samples:
+            soundslices.append(channelData[i][start:start + chunk])
+            start += chunk
+        channelChunks.append(soundslices)
+
+    freqlist = []
+    spectlist = []
+
+    for i in range(len(channelChunks[0])):
+        channelFreqs = []
+        CorSpect = 0
+        for k in range(channels):
+            spect, freq = getSpectrum(channelChunks[k][i], samplingfreq)
+            maxfreq = getMaxFreq(spect, freq)
+            channelFreqs.append(maxfreq)
+
+        maxfreqch = max(channelFreqs)
+
+        for i in range(len(channelFreqs)):
+            if channelFreqs[i] == maxfreqch:
+                CorSpect = spect[i]
+
+        if maxfreqch > freqcap:
+            channelFreqs = [0, 0]
+        freqlist.append(channelFreqs)
+        spectlist.append(CorSpect)
+
+    return freqlist, spectlist, samplingfreq
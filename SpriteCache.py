@@ -0,0 +1,83 @@
+from PySide2.QtCore import (QRect)
+from PySide2.QtGui import (QColor, QImage, QPainter)
+
+
+class SpriteCache:
+    """
+    Pre-rasterized stamps of small circles, so a circle that has been drawn once at a
+    size in pixels is drawn again as a blit of an image instead of being rasterized from
+    scratch.  Stamps are keyed by the pixel size, color, fill and antialiasing and are
+    drawn the same way ListRenderer draws a circle, so stamping does not change the
+    aliased image.  A stamp is only made the second time a key is asked for, and if
+    fewer than minHitRate of the circles of a window of lookups are stamped, the cache
+    steps aside for skipCount circles, so circles in colors that rarely repeat are drawn
+    directly at about the cost they had without it.  The stamps are QImages, which
+    unlike pixmaps can be used on any thread.  A renderer has its own cache for its
+    view, so the stamps are made again when the zoom changes.  At most maxStamps keys
+    are kept, the cache starts over when it is full.
+    """
+
+    window = 1024
+    minHitRate = 0.5
+    skipCount = 16384
+
+    def __init__(self, maxsize=64, maxstamps=4096):
+        self.maxSize = maxsize
+        self.maxStamps = maxstamps
+        self.stamps = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.windowHits = 0
+        self.windowCount = 0
+        self.skip = 0
+
+    def fits(self, width, height):
+        return width <= self.maxSize and height <= self.maxSize
+
+    def circle(self, width, height, col, fill, antialias):
+        """
+        Returns the stamp of a circle drawn in QRect(1, 1, width, height), one pixel in
+        from the upper left corner of the stamp, or None if the circle is to be drawn
+        directly.
+        """
+        if self.skip > 0:
+            self.skip -= 1
+            self.misses += 1
+            return None
+        self.windowCount += 1
+        if self.windowCount == self.window:
+            if self.windowHits < self.minHitRate * self.window:
+                self.skip = self.skipCount
+            self.windowHits = 0
+            self.windowCount = 0
+
+        key = (width, height, col.rgba(), fill, antialias)
+        stamp = self.stamps.get(key)
+        if stamp is not None:
+            self.hits += 1
+            self.windowHits += 1
+            return stamp
+
+        self.misses += 1
+        if key not in self.seen:
+            if len(self.seen) >= self.maxStamps:
+                self.seen.clear()
+                self.stamps.clear()
+            self.seen.add(key)
+            return None
+        stamp = QImage(width + 3, height + 3, QImage.Format_ARGB32_Premultiplied)
+        stamp.fill(0)
+        qp = QPainter()
+        qp.begin(stamp)
+        qp.setRenderHint(QPainter.Antialiasing, antialias)
+        qp.setPen(col)
+        qp.setBrush(col if fill else QColor(0, 0, 0, 0))
+        qp.drawEllipse(QRect(1, 1, width, height))
+        qp.end()
+        self.stamps[key] = stamp
+        return stamp
+
+    def hitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
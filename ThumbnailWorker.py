@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from threading import Lock, Thread
+
+from PySide2.QtCore import (QObject, Signal)
+from PySide2.QtGui import (QColor, QImage, QPainter)
+
+from PaintBrush import PaintBrush
+from RenderList import RenderList
+from ListRenderer import ListRenderer
+import SoundAnalysis
+
+
+class ThumbnailWorker(QObject):
+    """
+    Draws small previews of the algorithms for the algorithm picker on a background
+    thread.  Thumbnails are asked for by (wav file, chunk size) and made only for the
+    algorithms not yet in the cache for that key.  The file is analyzed once per key and
+    each algorithm draws at most maxChunks chunks, evenly spread over the file, into a
+    low resolution image, so a thumbnail is quick to make.  The thread runs at a lower
+    OS priority where the platform allows it, waits while the busy function says the
+    program has other work, and gives up a request as soon as a newer one comes in, so
+    a change of file or chunk size drops the work for the old one.  Finished thumbnails
+    are handed to the GUI thread with the thumbnailReady signal as QImages.
+    """
+
+    thumbnailReady = Signal(object, int, object)
+
+    maxChunks = 256
+    # Number of analyzed files and of keys of thumbnails kept.
+    maxFiles = 4
+    maxKeys = 16
+
+    def __init__(self, width=64, height=40, backgroundcolor=QColor(255, 255, 255), busy=None):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.backgroundcolor = backgroundcolor
+        self.busy = busy
+
+        # Stand-in for the main window, the PaintBrush draws from these.
+        self.rl = RenderList()
+        self.freqlist = None
+        self.paintbrush = PaintBrush(self)
+        self.paintbrush.seed = 0
+
+        self.lock = Lock()
+        self.features = OrderedDict()
+        self.thumbnails = OrderedDict()
+        self.current = None
+        self.jobs = queue.Queue()
+
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def request(self, filename, chunk):
+        """
+        Asks for the thumbnails of all algorithms for a file and chunk size.  Those in the
+        cache are sent at once, the rest are queued.
+        """
+        key = (filename, chunk)
+        with self.lock:
+            self.current = key
+            cached = dict(self.thumbnails.get(key, {}))
+        for algorithm, image in cached.items():
+            self.thumbnailReady.emit(key, algorithm, image)
+        algorithms = [a for a in range(1, len(PaintBrush.algorithmNames) + 1)
+                      if a not in cached and chunk >= PaintBrush.minimumChunkSize(a)]
+        if algorithms:
+            self.jobs.put((key, algorithms))
+
+    def cancel(self):
+        with self.lock:
+            self.current = None
+
+    def stale(self, key):
+        with self.lock:
+            return key != self.current
+
+    def analysis(self, key):
+        """
+        Returns the frequency and spectrum lists of a key, reduced to at most maxChunks
+        chunks, analyzing the file the first time.
+        """
+        if key in self.features:
+            self.features.move_to_end(key)
+            return self.features[key]
+        freqlist, spectlist, samplingfreq = SoundAnalysis.analyzeWav(key[0], key[1])
+        step = max(1, -(-len(freqlist) // self.maxChunks))
+        self.features[key] = (freqlist[::step], spectlist[::step])
+        if len(self.features) > self.maxFiles:
+            self.features.popitem(last=False)
+        return self.features[key]
+
+    def render(self, algorithm, freqlist, spectlist):
+        brush = self.paintbrush
+        self.rl.clear()
+        self.freqlist = freqlist
+        brush.currentAlgorithm = algorithm
+        brush.resetAlgorithm(algorithm)
+        brush.resetlistlinks()
+        if PaintBrush.hasTrack(algorithm):
+            self.rl.extend(brush.drawTrack(freqlist, spectlist))
+        else:
+            for i in range(len(freqlist)):
+                brush.draw(freqlist[i], i, spectlist[i])
+
+        renderer = ListRenderer(self.width, self.height, backgroundcolor=self.backgroundcolor)
+        image = QImage(self.width, self.height, QImage.Format_ARGB32_Premultiplied)
+        qp = QPainter()
+        qp.begin(image)
+        renderer.renderAll(qp, self.rl)
+        qp.end()
+        self.rl.clear()
+        return image
+
+    def run(self):
+        if hasattr(os, 'setpriority'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+            except OSError:
+                pass
+
+        while True:
+            job = self.jobs.get()
+            # Only the newest request matters.
+            while True:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+            key, algorithms = job
+
+            for algorithm in algorithms:
+                while self.busy is not None and self.busy() and not self.stale(key):
+                    time.sleep(0.1)
+                if self.stale(key) or not self.jobs.empty():
+                    break
+                try:
+                    freqlist, spectlist = self.analysis(key)
+                    image = self.render(algorithm, freqlist, spectlist)
+                except Exception:
+                    break
+                with self.lock:
+                    self.thumbnails.setdefault(key, {})[algorithm] = image
+                    self.thumbnails.move_to_end(key)
+                    if len(self.thumbnails) > self.maxKeys:
+                        self.thumbnails.popitem(last=False)
+                self.thumbnailReady.emit(key, algorithm, image)
+                # Let the GUI thread have the interpreter between thumbnails.
+                time.sleep(0.01)
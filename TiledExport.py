@@ -0,0 +1,182 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from PySide2.QtCore import (QPoint)
+from PySide2.QtGui import (QImage, QPainter)
+
+from ListRenderer import ListRenderer
+from NumpyRasterizer import NumpyRasterizer
+from RenderList import boundsArray
+
+
+class PngWriter:
+    """
+    Writes an 8-bit RGBA PNG file a band of rows at a time, so the whole image never has
+    to be held in memory.  The rows are compressed as they arrive.
+    """
+
+    def __init__(self, filename, width, height):
+        self.width = width
+        self.height = height
+        self.file = open(filename, 'wb')
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.writeChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        self.compressor = zlib.compressobj(6)
+
+    def writeChunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def writeRows(self, rows):
+        """
+        Appends rows given as an array of shape (rows, width, 4).
+        """
+        filtered = np.zeros((rows.shape[0], self.width * 4 + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows.reshape(rows.shape[0], self.width * 4)
+        data = self.compressor.compress(filtered.tobytes())
+        if len(data) > 0:
+            self.writeChunk(b'IDAT', data)
+
+    def close(self):
+        self.writeChunk(b'IDAT', self.compressor.flush())
+        self.writeChunk(b'IEND', b'')
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.file.name)
+
+
+class TiledExport:
+    """
+    Rasterizes the render list at an arbitrary resolution one tile at a time.  The tiles
+    of a row are rendered in parallel threads, each with its own renderer and QImage, and
+    only the primitives whose bounding box touches a tile are drawn into it.  Finished rows
+    of tiles are streamed to a PNG file or to a painter, such as one for a printer, so
+    peak memory is about one row of tiles no matter how large the image is.  The tiles are
+    drawn with QPainter or, with the 'numpy' backend, with a NumpyRasterizer.
+    """
+
+    def __init__(self, rl, width, height, center=(0, 0), zoomfactor=1, backgroundcolor=None,
+                 detailerror=0, tilesize=1024, workers=None, backend='qpainter'):
+        self.rl = rl
+        self.width = width
+        self.height = height
+        self.center = center
+        self.zoomfactor = zoomfactor
+        self.backgroundcolor = backgroundcolor
+        self.detailerror = detailerror
+        self.tilesize = tilesize
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.boxes = None
+
+    def makeRenderer(self):
+        return ListRenderer(self.width, self.height, self.center, self.zoomfactor, self.backgroundcolor,
+                            self.detailerror)
+
+    def prepare(self):
+        """
+        Computes the device space bounding box of every primitive once for the tile culling.
+        """
+        self.boxes = self.makeRenderer().screenBoxes(boundsArray(self.rl.renderlist))
+
+    def tileIndices(self, x, y, w, h):
+        """
+        Returns the indices, in drawing order, of the primitives that touch a tile.  A two
+        pixel margin covers pens and rounding.
+        """
+        b = self.boxes
+        hit = (b[:, 2] >= x - 2) & (b[:, 0] <= x + w + 2) & (b[:, 3] >= y - 2) & (b[:, 1] <= y + h + 2)
+        return np.nonzero(hit)[0].tolist()
+
+    def renderTile(self, rect):
+        x, y, w, h = rect
+        if self.backend == 'numpy':
+            rasterizer = NumpyRasterizer(self.width, self.height, self.center, self.zoomfactor, self.backgroundcolor,
+                                         tile=rect)
+            rasterizer.drawBase(self.rl.base)
+            rasterizer.renderIndices(self.rl, self.tileIndices(x, y, w, h))
+            return rasterizer.toQImage()
+        renderer = self.makeRenderer()
+        renderer.setTile(x, y, w, h)
+        image = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+        image.fill(renderer.backgroundcolor)
+        qp = QPainter()
+        qp.begin(image)
+        renderer.renderBase(qp, self.rl)
+        renderer.renderIndices(qp, self.rl, self.tileIndices(x, y, w, h))
+        qp.end()
+        return image
+
+    def bands(self):
+        """
+        Yields the rows of tiles as lists of (x, y, width, height) rectangles.
+        """
+        for y in range(0, self.height, self.tilesize):
+            h = min(self.tilesize, self.height - y)
+            yield [(x, y, min(self.tilesize, self.width - x), h) for x in range(0, self.width, self.tilesize)]
+
+    def render(self, output, report=None):
+        """
+        Renders the rows of tiles in order and passes each row to output as a list of
+        (rectangle, image) pairs.  The optional report function is called with the number
+        of rows done and the total, and the export stops if it returns False.  Returns true
+        if the export was completed.
+        """
+        if self.boxes is None:
+            self.prepare()
+
+        total = (self.height + self.tilesize - 1) // self.tilesize
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for band in self.bands():
+                output(list(zip(band, executor.map(self.renderTile, band))))
+                done += 1
+                if report is not None and report(done, total) is False:
+                    return False
+        return True
+
+    def exportPng(self, filename, report=None):
+        """
+        Streams the image to a PNG file.  Returns true if the file was written.
+        """
+        writer = PngWriter(filename, self.width, self.height)
+
+        def writeBand(tiles):
+            h = tiles[0][0][3]
+            rows = np.empty((h, self.width, 4), dtype=np.uint8)
+            for (x, y, w, h), image in tiles:
+                image = image.convertToFormat(QImage.Format_RGBA8888)
+                pixels = np.frombuffer(image.constBits(), dtype=np.uint8)
+                pixels = pixels.reshape(h, image.bytesPerLine())[:, :w * 4]
+                rows[:, x:x + w] = pixels.reshape(h, w, 4)
+            writer.writeRows(rows)
+
+        try:
+            completed = self.render(writeBand, report)
+        except BaseException:
+            writer.abort()
+            raise
+        if completed:
+            writer.close()
+        else:
+            writer.abort()
+        return completed
+
+    def exportPainter(self, qp, report=None):
+        """
+        Draws the image tile by tile with a painter, for example one attached to a printer.
+        """
+
+        def drawBand(tiles):
+            for (x, y, w, h), image in tiles:
+                qp.drawImage(QPoint(x, y), image)
+
+        return self.render(drawBand, report)
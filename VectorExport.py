@@ -0,0 +1,197 @@
+import base64
+
+from PySide2.QtCore import (Qt, QLineF, QMarginsF, QPointF, QRectF, QSizeF)
+from PySide2.QtGui import (QBrush, QPageLayout, QPageSize, QPainter, QPdfWriter, QPen, QPolygonF)
+
+from ImageUtils import pngBytes
+from ListRenderer import ListRenderer, glowGradient, glowStops
+from Shape import expandInstances
+
+
+class VectorExport:
+    """
+    Streams the render list to a vector file, SVG or PDF, in a single pass.  Primitives
+    are written as they are read, so memory does not grow with the size of the render
+    list.  Consecutive primitives with the same style share one SVG group or one pen and
+    brush change in the PDF, and triangles are written as polygons.  The view (center,
+    zoom and aspect ratio) is the same as in the image, with one unit of the output per
+    pixel.  A raster base layer left by compacting the render list is embedded as an
+    image below the primitives.
+    """
+
+    # Drawing styles, a primitive is outlined, filled, or both in a single color, or
+    # filled with the radial gradient of a glow.
+    STROKE = 0
+    FILL = 1
+    BOTH = 2
+    GLOW = 3
+
+    def __init__(self, rl, width, height, center=(0, 0), zoomfactor=1, backgroundcolor=None):
+        self.rl = rl
+        self.width = width
+        self.height = height
+        self.renderer = ListRenderer(width, height, center, zoomfactor, backgroundcolor, 0)
+
+    def entries(self):
+        """
+        Yields the render list entries with instances of shapes replaced by their entries.
+        """
+        for i in range(self.rl.length()):
+            obj = self.rl.get(i)
+            if obj is None:
+                break
+            if obj[0] == 6:
+                yield from expandInstances([obj])
+            else:
+                yield obj
+
+    def primitives(self):
+        """
+        Yields (style, color, kind, points) for every primitive in the render list with the
+        points in output coordinates.  The kind is 'point', 'line', 'ellipse', 'rect',
+        'polygon' or 'glow'; an ellipse or rectangle is given by two opposite corners and a
+        glow by two opposite corners followed by its number of layers.
+        """
+        xy = self.renderer.XYtoScreen
+        for obj in self.entries():
+            if obj[0] == 0:
+                yield self.FILL, obj[3], 'point', [xy(obj[1], obj[2])]
+            elif obj[0] == 1:
+                yield self.STROKE, obj[5], 'line', [xy(obj[1], obj[2]), xy(obj[3], obj[4])]
+            elif obj[0] == 2:
+                style = self.BOTH if obj[4] else self.STROKE
+                yield style, obj[5], 'ellipse', [xy(obj[1] - obj[3], obj[2] + obj[3]),
+                                                 xy(obj[1] + obj[3], obj[2] - obj[3])]
+            elif obj[0] == 3:
+                style = self.FILL if obj[5] else self.STROKE
+                yield style, obj[6], 'rect', [xy(obj[1], obj[2]), xy(obj[3], obj[4])]
+            elif obj[0] == 4:
+                style = self.FILL if obj[7] else self.STROKE
+                yield style, obj[8], 'polygon', [xy(obj[1], obj[2]), xy(obj[3], obj[4]), xy(obj[5], obj[6])]
+            elif obj[0] == 5:
+                yield self.GLOW, obj[5], 'glow', [xy(obj[1] - obj[3], obj[2] + obj[3]),
+                                                  xy(obj[1] + obj[3], obj[2] - obj[3]), int(obj[4])]
+
+    def exportSvg(self, filename):
+        """
+        Writes the render list as an SVG file.
+        """
+        with open(filename, 'w') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">\n'
+                    % (self.width, self.height, self.width, self.height))
+            f.write('<rect width="100%%" height="100%%" %s/>\n' % self.svgPaint('fill', self.renderer.backgroundcolor))
+            if self.rl.base is not None:
+                f.write(self.svgImage(*self.rl.base))
+
+            group = None
+            glows = 0
+            for style, col, kind, pts in self.primitives():
+                key = (style, col.rgba())
+                if key != group:
+                    if group is not None:
+                        f.write('</g>\n')
+                    f.write('<g %s>\n' % self.svgStyle(style, col))
+                    group = key
+                if kind == 'glow':
+                    f.write(self.svgGlow('glow%d' % glows, col, pts))
+                    glows += 1
+                else:
+                    f.write(self.svgElement(kind, pts))
+            if group is not None:
+                f.write('</g>\n')
+            f.write('</svg>\n')
+
+    def svgImage(self, image, rect):
+        left, top, right, bottom = self.renderer.screenRect(rect)
+        return ('<image x="%.2f" y="%.2f" width="%.2f" height="%.2f" preserveAspectRatio="none" '
+                'href="data:image/png;base64,%s"/>\n' % (left, top, right - left, bottom - top,
+                                                         base64.b64encode(pngBytes(image)).decode('ascii')))
+
+    def svgPaint(self, attribute, col):
+        paint = '%s="%s"' % (attribute, col.name())
+        if col.alpha() < 255:
+            paint += ' %s-opacity="%.3f"' % (attribute, col.alphaF())
+        return paint
+
+    def svgStyle(self, style, col):
+        if style == self.GLOW:
+            return 'stroke="none"'
+        elif style == self.STROKE:
+            return 'fill="none" stroke-width="1" ' + self.svgPaint('stroke', col)
+        elif style == self.FILL:
+            return 'stroke="none" ' + self.svgPaint('fill', col)
+        return 'stroke-width="1" ' + self.svgPaint('fill', col) + ' ' + self.svgPaint('stroke', col)
+
+    def svgElement(self, kind, pts):
+        if kind == 'point':
+            return '<rect x="%.2f" y="%.2f" width="1" height="1"/>\n' % pts[0]
+        elif kind == 'line':
+            return '<line x1="%.2f" y1="%.2f" x2="%.2f" y2="%.2f"/>\n' % (pts[0] + pts[1])
+        elif kind == 'ellipse':
+            (x1, y1), (x2, y2) = pts
+            return '<ellipse cx="%.2f" cy="%.2f" rx="%.2f" ry="%.2f"/>\n' % (
+                (x1 + x2) / 2, (y1 + y2) / 2, abs(x2 - x1) / 2, abs(y2 - y1) / 2)
+        elif kind == 'rect':
+            (x1, y1), (x2, y2) = pts
+            return '<rect x="%.2f" y="%.2f" width="%.2f" height="%.2f"/>\n' % (
+                min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
+        return '<polygon points="%s"/>\n' % ' '.join('%.2f,%.2f' % p for p in pts)
+
+    def svgGlow(self, name, col, pts):
+        """
+        A glow as an ellipse filled with its own radial gradient.
+        """
+        (x1, y1), (x2, y2), layers = pts
+        cx, cy, r = (x1 + x2) / 2, (y1 + y2) / 2, abs(x2 - x1) / 2
+        stops = ''.join('<stop offset="%.6f" stop-color="%s" stop-opacity="%.3f"/>' % (position, col.name(), opacity)
+                        for position, opacity in glowStops(col.alpha(), layers))
+        return ('<radialGradient id="%s" gradientUnits="userSpaceOnUse" cx="%.2f" cy="%.2f" r="%.2f">%s'
+                '</radialGradient>\n<ellipse cx="%.2f" cy="%.2f" rx="%.2f" ry="%.2f" fill="url(#%s)"/>\n' % (
+                    name, cx, cy, r, stops, cx, cy, r, abs(y2 - y1) / 2, name))
+
+    def exportPdf(self, filename):
+        """
+        Writes the render list as a single page PDF file the size of the image.
+        """
+        writer = QPdfWriter(filename)
+        writer.setResolution(72)
+        writer.setPageLayout(QPageLayout(QPageSize(QSizeF(self.width, self.height), QPageSize.Point),
+                                         QPageLayout.Portrait, QMarginsF(0, 0, 0, 0)))
+        qp = QPainter()
+        qp.begin(writer)
+        qp.fillRect(QRectF(0, 0, self.width, self.height), self.renderer.backgroundcolor)
+        self.renderer.renderBase(qp, self.rl)
+
+        group = None
+        for style, col, kind, pts in self.primitives():
+            key = (style, col.rgba())
+            if key != group:
+                qp.setPen(Qt.NoPen if style == self.FILL or style == self.GLOW else QPen(col, 0))
+                qp.setBrush(Qt.NoBrush if style == self.STROKE else QBrush(col))
+                group = key
+
+            if kind == 'point':
+                qp.drawRect(QRectF(pts[0][0], pts[0][1], 1, 1))
+            elif kind == 'line':
+                qp.drawLine(QLineF(pts[0][0], pts[0][1], pts[1][0], pts[1][1]))
+            elif kind == 'ellipse':
+                qp.drawEllipse(QRectF(QPointF(*pts[0]), QPointF(*pts[1])).normalized())
+            elif kind == 'rect':
+                qp.drawRect(QRectF(QPointF(*pts[0]), QPointF(*pts[1])).normalized())
+            elif kind == 'glow':
+                rect = QRectF(QPointF(*pts[0]), QPointF(*pts[1])).normalized()
+                qp.setBrush(glowGradient(rect.center().x(), rect.center().y(), rect.width() / 2, pts[2], col))
+                qp.drawEllipse(rect)
+            else:
+                qp.drawPolygon(QPolygonF([QPointF(*p) for p in pts]))
+        qp.end()
+
+    def export(self, filename):
+        """
+        Exports to SVG or PDF depending on the extension of the file name.
+        """
+        if filename.lower().endswith(".pdf"):
+            self.exportPdf(filename)
+        else:
+            self.exportSvg(filename)